@@ -1,9 +1,36 @@
 
 # parameter_store.py
 # Theodor Harmse - University of Liverpool
-# Helper module for providing static database credentials in JSON format for all database types
+# Helper module for providing database credentials in JSON format for all database types,
+# from a static dict, a local JSON file or AWS Systems Manager Parameter Store
 
+import asyncio
 import json
+import logging
+import os
+import random
+import time
+from threading import Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+REGION = os.environ.get("AWS_REGION", "eu-west-1")
+
+# Credential source: 'static' (the dict below), 'json' (CREDENTIALS_FILE) or 'ssm'
+CREDENTIALS_SOURCE = os.environ.get("CREDENTIALS_SOURCE", "static").lower()
+CREDENTIALS_FILE = os.environ.get("CREDENTIALS_FILE", "credentials.json")
+
+# Seconds a fetched value is fresh; it is refreshed in the background after
+# CREDENTIALS_REFRESH_AHEAD of that time (jittered so keys do not refresh together)
+CREDENTIALS_TTL_SECONDS = float(os.environ.get("CREDENTIALS_TTL_SECONDS", "3600"))
+CREDENTIALS_REFRESH_AHEAD = float(os.environ.get("CREDENTIALS_REFRESH_AHEAD", "0.8"))
+
+# Seconds past expiry a value is served without waiting while it refreshes in the background
+# (stale-while-revalidate); after that a request fetches it, falling back to the stale value on errors
+CREDENTIALS_MAX_STALE_SECONDS = float(os.environ.get("CREDENTIALS_MAX_STALE_SECONDS", "3600"))
+
+# Seconds before a failed background refresh is retried
+CREDENTIALS_RETRY_SECONDS = float(os.environ.get("CREDENTIALS_RETRY_SECONDS", "30"))
 
 # Local static store of "Parameter Store" secrets
 _STATIC_CREDENTIALS = {
@@ -89,45 +116,230 @@ _STATIC_CREDENTIALS = {
 }
 
 
+
+class StaticSource:
+    """
+    Credentials from an in-memory dict of parameter name to JSON string (or dict).
+    """
+
+    def __init__(self, values: dict):
+        self._values = values
+
+    def fetch(self, param_name: str) -> str:
+        if param_name not in self._values:
+            raise KeyError(f"Parameter {param_name} not found in static configuration.")
+        value = self._values[param_name]
+        return value if isinstance(value, str) else json.dumps(value)
+
+
+class JsonFileSource:
+    """
+    Credentials from a local JSON file of parameter name to JSON string (or object).
+    The file is re-read on every fetch, so rotating it takes effect on the next refresh.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def fetch(self, param_name: str) -> str:
+        with open(self._path) as f:
+            values = json.load(f)
+        return StaticSource(values).fetch(param_name)
+
+
+class SSMSource:
+    """
+    Credentials from AWS Systems Manager Parameter Store (SecureString parameters).
+    The boto3 client is thread safe, so one client is created and shared.
+    """
+
+    def __init__(self, region: str = REGION):
+        self._region = region
+        self._client = None
+        self._lock = Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+                    self._client = boto3.client(
+                        "ssm", region_name=self._region, config=Config(retries={"mode": "adaptive", "max_attempts": 5})
+                    )
+        return self._client
+
+    def fetch(self, param_name: str) -> str:
+        response = self._get_client().get_parameter(Name=param_name, WithDecryption=True)
+        return response["Parameter"]["Value"]
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "refresh_at", "refreshing")
+
+    def __init__(self, value: str, ttl: float, refresh_ahead: float):
+        now = time.monotonic()
+        self.value = value
+        self.expires_at = now + ttl
+        self.refresh_at = now + ttl * refresh_ahead * random.uniform(0.9, 1.0)
+        self.refreshing = False
+
+
+class CredentialProvider:
+    """
+    Caches credential values from a source. Concurrent misses for one key share
+    a single fetch, values are refreshed in the background before they expire,
+    and an expired value keeps being served while its refresh fails, so a slow
+    or throttled source never stalls requests that already have credentials.
+    The shared lock only guards the cache dicts and is never held during a fetch.
+    """
+
+    def __init__(self, source, ttl: float = CREDENTIALS_TTL_SECONDS, refresh_ahead: float = CREDENTIALS_REFRESH_AHEAD,
+                 max_stale: float = CREDENTIALS_MAX_STALE_SECONDS, retry_seconds: float = CREDENTIALS_RETRY_SECONDS):
+        self._source = source
+        # Static values never change, so they are fetched once and never refreshed
+        self._ttl = float("inf") if isinstance(source, StaticSource) else ttl
+        self._refresh_ahead = min(max(refresh_ahead, 0.0), 1.0)
+        self._max_stale = max_stale
+        self._retry_seconds = retry_seconds
+        self._entries = {}
+        self._fetch_locks = {}
+        self._lock = Lock()
+
+    def _fetch_lock(self, param_name: str) -> Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault(param_name, Lock())
+
+    def _store(self, param_name: str, value: str):
+        with self._lock:
+            self._entries[param_name] = _Entry(value, self._ttl, self._refresh_ahead)
+
+    def _refresh(self, param_name: str):
+        """
+        Background refresh: keeps the current value on failure and retries later.
+        """
+        try:
+            with self._fetch_lock(param_name):
+                self._store(param_name, self._source.fetch(param_name))
+        except Exception as e:
+            logger.warning("Credential refresh for %s failed, serving the cached value: %s", param_name, e)
+            with self._lock:
+                entry = self._entries.get(param_name)
+                if entry is not None:
+                    entry.refresh_at = time.monotonic() + self._retry_seconds
+                    entry.refreshing = False
+
+    def _start_refresh(self, param_name: str, entry: _Entry):
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+        Thread(target=self._refresh, args=(param_name,), name=f"credential-refresh {param_name}", daemon=True).start()
+
+    def _fetch(self, param_name: str, stale: _Entry = None) -> str:
+        """
+        Single-flight fetch: the first caller fetches, concurrent callers wait for it and reuse its value.
+        """
+        with self._fetch_lock(param_name):
+            entry = self._entries.get(param_name)
+            if entry is not None and entry is not stale and time.monotonic() < entry.expires_at:
+                return entry.value
+            try:
+                value = self._source.fetch(param_name)
+            except KeyError:
+                raise
+            except Exception:
+                if stale is None:
+                    raise
+                logger.warning("Credential fetch for %s failed, serving the stale value", param_name, exc_info=True)
+                # Back into the stale window, so requests stop fetching until the retry interval passes
+                with self._lock:
+                    stale.expires_at = time.monotonic() - self._max_stale + self._retry_seconds
+                    stale.refresh_at = time.monotonic() + self._retry_seconds
+                return stale.value
+            self._store(param_name, value)
+            return value
+
+    def get(self, param_name: str) -> str:
+        entry = self._entries.get(param_name)
+        if entry is None:
+            return self._fetch(param_name)
+        now = time.monotonic()
+        if now >= entry.refresh_at:
+            if now < entry.expires_at + self._max_stale:
+                # Fresh, or expired but within the stale window: serve it and refresh in the background
+                self._start_refresh(param_name, entry)
+                return entry.value
+            return self._fetch(param_name, stale=entry)
+        return entry.value
+
+    def get_cached(self, param_name: str):
+        """
+        Never blocks on the source: returns the cached value, however stale, and
+        starts a background refresh when one is due. Returns None when nothing is cached yet.
+        """
+        entry = self._entries.get(param_name)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.refresh_at:
+            self._start_refresh(param_name, entry)
+        return entry.value
+
+    def reset_after_fork(self):
+        """
+        Locks and in-progress refreshes belong to the parent's threads; the cached values stay usable.
+        """
+        self._lock = Lock()
+        self._fetch_locks = {}
+        for entry in self._entries.values():
+            entry.refreshing = False
+
+    def invalidate(self, param_name: str = None):
+        """
+        Drops one cached value (or all of them) so the next get() fetches it again.
+        """
+        with self._lock:
+            if param_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(param_name, None)
+
+
+def _create_source():
+    if CREDENTIALS_SOURCE == "ssm":
+        return SSMSource(REGION)
+    if CREDENTIALS_SOURCE == "json":
+        return JsonFileSource(CREDENTIALS_FILE)
+    return StaticSource(_STATIC_CREDENTIALS)
+
+
+_provider = CredentialProvider(_create_source())
+
+os.register_at_fork(after_in_child=_provider.reset_after_fork)
+
+
 def get_db_credentials(param_name: str) -> str:
     """
-    Returns the credential JSON string for the given parameter name.
+    Returns the credential JSON string for the given parameter name from the cached provider.
     Raises KeyError if not found.
     """
-    if param_name in _STATIC_CREDENTIALS:
-        return _STATIC_CREDENTIALS[param_name]
-    raise KeyError(f"Parameter {param_name} not found in static configuration.")
-
-
-## parameter_store.py
-## Theodor Harmse - University of Liverpool
-## Helper module for reading and caching database credentials from AWS Systems Manager Parameter Store
-
-#import boto3
-#import os
-#from cachetools import TTLCache
-#from threading import Lock
-
-#REGION = os.environ.get("AWS_REGION", "eu-west-1")
-
-#_cache = TTLCache(maxsize=128, ttl=3600)  # 1 hour TTL
-#_lock = Lock()
-
-#def get_db_credentials(param_name: str) -> str:
-#    """
-#    Returns the cached value if present and not expired.
-#    Otherwise, fetches from Parameter Store, caches it in memory.
-#    Thread-safe.
-#    """
-#    with _lock:
-#        if param_name in _cache:
-#            return _cache[param_name]
-#
-#        ssm_client = boto3.client('ssm', region_name=REGION)
-#        response = ssm_client.get_parameter(
-#            Name=param_name,
-#            WithDecryption=True
-#        )
-#        value = response['Parameter']['Value']
-#        _cache[param_name] = value
-#        return value
+    return _provider.get(param_name)
+
+
+def get_cached_db_credentials(param_name: str):
+    """
+    Returns the cached credential JSON string without fetching (None when not cached yet).
+    Safe to call on the event loop.
+    """
+    return _provider.get_cached(param_name)
+
+
+async def get_db_credentials_async(param_name: str) -> str:
+    """
+    Event loop form of get_db_credentials: a cached value is returned directly,
+    a fetch from the source runs in a worker thread.
+    """
+    value = _provider.get_cached(param_name)
+    if value is None:
+        value = await asyncio.to_thread(_provider.get, param_name)
+    return value
@@ -1,18 +1,20 @@
+import asyncio
 import json
 import os
-import boto3
-import pyodbc
+import re
+import time
 import urllib.parse
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from contextlib import ExitStack
 from threading import Lock
 from urllib.parse import quote_plus
 
-import psycopg2
-import psycopg2.extras
-
 REGION = os.environ.get("AWS_REGION", "eu-west-1")
-from api_service.aws.parameter_store import get_db_credentials
+from api_service.aws.parameter_store import get_cached_db_credentials, get_db_credentials, get_db_credentials_async
+from api_service.db.pool_config import POOL_RECYCLE, get_pool_kwargs, get_worker_connections, track_engine
+from api_service.db.statement_cache import STATEMENT_CACHE_SIZE
 
 # Connection pool engines
 _mysql_engine = None
@@ -24,19 +26,231 @@ _mssql_engine_target = None
 _oracle_engine = None
 _ibmdb2_engine = None
 
-_lock = Lock()
-_mssql_lock = Lock()
+# Native asyncio engines (aiomysql), used when DB_ENGINE_MODE_<BACKEND>=async
+_mysql_async_engine = None
+_aurora_mysql_async_engine = None
+_mariadb_async_engine = None
+
+# asyncpg pools, used when DB_ENGINE_MODE_<BACKEND>=async for the PostgreSQL backends
+_postgresql_asyncpg_pool = None
+_aurora_postgresql_asyncpg_pool = None
+_asyncpg_lock = asyncio.Lock()
+
+# Prepared statements cached per asyncpg connection
+ASYNCPG_STATEMENT_CACHE_SIZE = int(os.environ.get("ASYNCPG_STATEMENT_CACHE_SIZE", "256"))
+
+class InstrumentedLock:
+    """
+    threading.Lock that records how often it was taken, how often a caller had
+    to wait for it, and the total time spent waiting.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            self.contended += 1
+            self.wait_seconds += time.perf_counter() - start
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def stats(self) -> dict:
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "wait_seconds": round(self.wait_seconds, 6)
+        }
+
+# One initialization lock per engine: a slow first-time creation (e.g. Oracle or Db2
+# loading client libraries) never blocks another backend. Once an engine exists the
+# getters return it without taking any lock.
+_ENGINE_KEYS = (
+    "mysql", "aurora_mysql", "mysql_async", "aurora_mysql_async",
+    "postgresql", "aurora_postgresql", "mariadb", "mariadb_async",
+    "mssql", "oracle", "ibmdb2"
+)
+_SQL_ENGINE_KEYS = ("mysql", "aurora_mysql", "postgresql", "aurora_postgresql", "mariadb", "mssql", "oracle", "ibmdb2")
+_ASYNC_ENGINE_KEYS = ("mysql_async", "aurora_mysql_async", "mariadb_async")
+_locks = {key: InstrumentedLock(key) for key in _ENGINE_KEYS}
+
+def get_lock_stats() -> dict:
+    """
+    Returns contention metrics for each engine initialization lock.
+    """
+    return {key: lock.stats() for key, lock in _locks.items()}
+
+def get_engine_mode(backend: str) -> str:
+    """
+    Returns the configured engine mode ('sync' or 'async') for the given backend.
+    Set with DB_ENGINE_MODE_<BACKEND>, e.g. DB_ENGINE_MODE_MYSQL=async.
+    """
+    return os.environ.get(f"DB_ENGINE_MODE_{backend.upper()}", "sync").lower()
+
+def use_async_engine(backend: str) -> bool:
+    return get_engine_mode(backend) == "async"
+
+# ----------------- Session initialization -----------------------
+# Session setup run once per physical connection from the pool's "connect" event,
+# configured with DB_SESSION_SCHEMA_<BACKEND>, DB_SESSION_ISOLATION_<BACKEND>,
+# DB_SESSION_STATEMENT_TIMEOUT_MS_<BACKEND> and DB_SESSION_AUTOCOMMIT_<BACKEND>.
+# Each entry is a SQL template or a function applying the value through the driver;
+# settings a backend has no entry for are ignored.
+_MYSQL_SESSION = {
+    "schema": "USE `{}`",
+    "isolation": "SET SESSION TRANSACTION ISOLATION LEVEL {}",
+    "statement_timeout_ms": "SET SESSION max_execution_time = {}"
+}
+_POSTGRESQL_SESSION = {
+    "schema": "SET search_path TO {}",
+    "isolation": "SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL {}",
+    "statement_timeout_ms": "SET statement_timeout = {}"
+}
+_SESSION_SETUP = {
+    "mysql": _MYSQL_SESSION,
+    "aurora_mysql": _MYSQL_SESSION,
+    "mariadb": {**_MYSQL_SESSION, "statement_timeout_ms": lambda conn, value: _execute(conn, f"SET SESSION max_statement_time = {int(value) / 1000}")},
+    "postgresql": _POSTGRESQL_SESSION,
+    "aurora_postgresql": _POSTGRESQL_SESSION,
+    "mssql": {
+        "isolation": "SET TRANSACTION ISOLATION LEVEL {}",
+        "statement_timeout_ms": lambda conn, value: setattr(conn, "timeout", max(1, int(value) // 1000))
+    },
+    "oracle": {
+        "schema": "ALTER SESSION SET CURRENT_SCHEMA = {}",
+        "isolation": "ALTER SESSION SET ISOLATION_LEVEL = {}",
+        "statement_timeout_ms": lambda conn, value: setattr(conn, "call_timeout", int(value))
+    },
+    "ibmdb2": {
+        "schema": "SET SCHEMA {}",
+        "isolation": "SET CURRENT ISOLATION = {}"
+    }
+}
+
+# Session state read once per connection after setup and kept in the pool's
+# connection info, so services do not query it on every request
+_SESSION_STATE_SQL = {
+    "ibmdb2": {"schema": "VALUES CURRENT SCHEMA"}
+}
+
+def _execute(dbapi_connection, sql: str):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(sql)
+        return cursor.fetchone() if cursor.description else None
+    finally:
+        cursor.close()
+
+def _set_driver_autocommit(backend: str, dbapi_connection, autocommit: bool):
+    if backend == "ibmdb2":
+        dbapi_connection.set_autocommit(autocommit)
+    elif backend in ("mysql", "aurora_mysql", "mariadb"):
+        dbapi_connection.autocommit(autocommit)
+    else:
+        dbapi_connection.autocommit = autocommit
+
+def _initialize_session(backend: str, dbapi_connection, connection_record):
+    """
+    Applies the configured session settings to a new physical connection and
+    caches its session state in connection_record.info.
+    """
+    info = connection_record.info
+    info["backend"] = backend
+    if backend == "oracle":
+        # Parsed statements cx_Oracle keeps per connection (the driver default is 20)
+        dbapi_connection.stmtcachesize = STATEMENT_CACHE_SIZE
+    for setting, apply in _SESSION_SETUP.get(backend, {}).items():
+        value = os.environ.get(f"DB_SESSION_{setting.upper()}_{backend.upper()}")
+        if value is None:
+            continue
+        if callable(apply):
+            apply(dbapi_connection, value)
+        else:
+            _execute(dbapi_connection, apply.format(value))
+    for key, sql in _SESSION_STATE_SQL.get(backend, {}).items():
+        info[key] = str(_execute(dbapi_connection, sql)[0]).strip()
+    autocommit = os.environ.get(f"DB_SESSION_AUTOCOMMIT_{backend.upper()}")
+    if autocommit is not None:
+        _set_driver_autocommit(backend, dbapi_connection, autocommit == "1")
+        info["autocommit"] = autocommit == "1"
+
+def install_session_initializer(engine: Engine, backend: str) -> Engine:
+    """
+    Runs the backend's session setup once per physical connection the pool opens.
+    """
+    event.listen(engine, "connect", lambda dbapi_connection, connection_record: _initialize_session(backend, dbapi_connection, connection_record))
+    return engine
+
+# Connect keyword arguments that carry the login, per DB-API driver spelling
+_CREDENTIAL_PARAMS = {"user": "username", "password": "password", "passwd": "password"}
+
+def _apply_credentials(backend: str, creds: dict, cargs: list, cparams: dict):
+    for param, key in _CREDENTIAL_PARAMS.items():
+        if param in cparams:
+            cparams[param] = creds[key]
+    if backend in ("mssql", "ibmdb2"):
+        # pyodbc and ibm_db take the login inside the connection string (the DSN
+        # wins over any separate user and password arguments)
+        cargs[0] = re.sub(r"(?i)\bUID=[^;]*", lambda m: f"UID={creds['username']}", cargs[0])
+        cargs[0] = re.sub(r"(?i)\bPWD=[^;]*", lambda m: f"PWD={creds['password']}", cargs[0])
+
+def install_credential_refresh(engine: Engine, backend: str, param_name: str, lookup=get_db_credentials) -> Engine:
+    """
+    Reads the login from the credential provider each time the pool opens a
+    physical connection, so rotated credentials reach new connections without
+    recreating the engine. Connections already open stay authenticated.
+    lookup returns the credential JSON, or None to keep the engine's own login.
+    """
+    def refresh(dialect, connection_record, cargs, cparams):
+        value = lookup(param_name)
+        if value is not None:
+            _apply_credentials(backend, json.loads(value), cargs, cparams)
+
+    event.listen(engine, "do_connect", refresh)
+    return engine
+
+def _register_engine(engine: Engine, backend: str, param_name: str) -> Engine:
+    install_credential_refresh(engine, backend, param_name)
+    return track_engine(install_session_initializer(engine, backend), backend)
+
+def get_session_state(conn, key: str):
+    """
+    Returns session state cached for a pooled connection (e.g. the Db2 'schema').
+    """
+    return conn.info.get(key)
+
+def set_session_autocommit(conn, autocommit: bool):
+    """
+    Switches a pooled connection's autocommit mode, skipping the driver call
+    when the physical connection is already in that mode.
+    """
+    if conn.info.get("autocommit") == autocommit:
+        return
+    _set_driver_autocommit(conn.info["backend"], conn.dbapi_connection, autocommit)
+    conn.info["autocommit"] = autocommit
 
 # ----------------- MYSQL -----------------------
 def _get_mysql_engine(param_name: str) -> Engine:
     global _mysql_engine
-    with _lock:
+    engine = _mysql_engine
+    if engine is not None:
+        return engine
+    with _locks["mysql"]:
         if _mysql_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _mysql_engine = create_engine(
+            _mysql_engine = _register_engine(create_engine(
                 f"mysql+pymysql://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds['port']}/{creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("mysql")
+            ), "mysql", param_name)
         return _mysql_engine
 
 def get_mysql_connection(param_name: str):
@@ -44,28 +258,68 @@ def get_mysql_connection(param_name: str):
 
 def _get_aurora_mysql_engine(param_name: str) -> Engine:
     global _aurora_mysql_engine
-    with _lock:
+    engine = _aurora_mysql_engine
+    if engine is not None:
+        return engine
+    with _locks["aurora_mysql"]:
         if _aurora_mysql_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _aurora_mysql_engine = create_engine(
+            _aurora_mysql_engine = _register_engine(create_engine(
                 f"mysql+pymysql://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds['port']}/{creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("aurora_mysql")
+            ), "aurora_mysql", param_name)
         return _aurora_mysql_engine
 
 def get_aurora_mysql_connection(param_name: str):
     return _get_aurora_mysql_engine(param_name).raw_connection()
 
+def _create_mysql_async_engine(creds, backend: str, param_name: str) -> AsyncEngine:
+    """
+    SQLAlchemy asyncio engine on the aiomysql driver for MySQL-compatible backends.
+    """
+    engine = create_async_engine(
+        f"mysql+aiomysql://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds['port']}/{creds['database']}",
+        **get_pool_kwargs(backend)
+    )
+    # Async connects run on the event loop, so they only read the cached credentials
+    install_credential_refresh(engine.sync_engine, backend, param_name, get_cached_db_credentials)
+    return engine
+
+async def get_mysql_async_engine(param_name: str) -> AsyncEngine:
+    global _mysql_async_engine
+    engine = _mysql_async_engine
+    if engine is not None:
+        return engine
+    creds = json.loads(await get_db_credentials_async(param_name))
+    with _locks["mysql_async"]:
+        if _mysql_async_engine is None:
+            _mysql_async_engine = _create_mysql_async_engine(creds, "mysql", param_name)
+        return _mysql_async_engine
+
+async def get_aurora_mysql_async_engine(param_name: str) -> AsyncEngine:
+    global _aurora_mysql_async_engine
+    engine = _aurora_mysql_async_engine
+    if engine is not None:
+        return engine
+    creds = json.loads(await get_db_credentials_async(param_name))
+    with _locks["aurora_mysql_async"]:
+        if _aurora_mysql_async_engine is None:
+            _aurora_mysql_async_engine = _create_mysql_async_engine(creds, "aurora_mysql", param_name)
+        return _aurora_mysql_async_engine
+
 # ----------------- POSTGRESQL -----------------------
 def _get_postgresql_engine(param_name: str) -> Engine:
     global _postgresql_engine
-    with _lock:
+    engine = _postgresql_engine
+    if engine is not None:
+        return engine
+    with _locks["postgresql"]:
         if _postgresql_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _postgresql_engine = create_engine(
+            _postgresql_engine = _register_engine(create_engine(
                 f"postgresql+psycopg2://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds['port']}/{creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("postgresql")
+            ), "postgresql", param_name)
         return _postgresql_engine
 
 def get_postgresql_connection(param_name: str):
@@ -73,38 +327,98 @@ def get_postgresql_connection(param_name: str):
 
 def _get_aurora_postgresql_engine(param_name: str) -> Engine:
     global _aurora_postgresql_engine
-    with _lock:
+    engine = _aurora_postgresql_engine
+    if engine is not None:
+        return engine
+    with _locks["aurora_postgresql"]:
         if _aurora_postgresql_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _aurora_postgresql_engine = create_engine(
+            _aurora_postgresql_engine = _register_engine(create_engine(
                 f"postgresql+psycopg2://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds['port']}/{creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("aurora_postgresql")
+            ), "aurora_postgresql", param_name)
         return _aurora_postgresql_engine
 
 def get_aurora_postgresql_connection(param_name: str):
     return _get_aurora_postgresql_engine(param_name).raw_connection()
 
+async def _create_asyncpg_pool(creds, backend: str, param_name: str):
+    """
+    asyncpg pool with automatic per-connection prepared statement caching.
+    Imported lazily so asyncpg is only required when the async mode is enabled.
+    The password is read from the credential provider on every new connection.
+    """
+    import asyncpg
+
+    async def password():
+        return json.loads(await get_db_credentials_async(param_name))['password']
+
+    return await asyncpg.create_pool(
+        user=creds['username'],
+        password=password,
+        host=creds['host'],
+        port=creds['port'],
+        database=creds['database'],
+        min_size=min(10, get_worker_connections(backend)),
+        max_size=get_worker_connections(backend),
+        max_inactive_connection_lifetime=POOL_RECYCLE,
+        statement_cache_size=ASYNCPG_STATEMENT_CACHE_SIZE
+    )
+
+async def get_postgresql_asyncpg_pool(param_name: str):
+    global _postgresql_asyncpg_pool
+    if _postgresql_asyncpg_pool is None:
+        async with _asyncpg_lock:
+            if _postgresql_asyncpg_pool is None:
+                creds = json.loads(await get_db_credentials_async(param_name))
+                _postgresql_asyncpg_pool = await _create_asyncpg_pool(creds, "postgresql", param_name)
+    return _postgresql_asyncpg_pool
+
+async def get_aurora_postgresql_asyncpg_pool(param_name: str):
+    global _aurora_postgresql_asyncpg_pool
+    if _aurora_postgresql_asyncpg_pool is None:
+        async with _asyncpg_lock:
+            if _aurora_postgresql_asyncpg_pool is None:
+                creds = json.loads(await get_db_credentials_async(param_name))
+                _aurora_postgresql_asyncpg_pool = await _create_asyncpg_pool(creds, "aurora_postgresql", param_name)
+    return _aurora_postgresql_asyncpg_pool
+
 # ----------------- MARIADB -----------------------
 def _get_mariadb_engine(param_name: str) -> Engine:
     global _mariadb_engine
-    with _lock:
+    engine = _mariadb_engine
+    if engine is not None:
+        return engine
+    with _locks["mariadb"]:
         if _mariadb_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _mariadb_engine = create_engine(
+            _mariadb_engine = _register_engine(create_engine(
                 f"mysql+pymysql://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds['port']}/{creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("mariadb")
+            ), "mariadb", param_name)
         return _mariadb_engine
 
 def get_mariadb_connection(param_name: str):
     return _get_mariadb_engine(param_name).raw_connection()
 
+async def get_mariadb_async_engine(param_name: str) -> AsyncEngine:
+    global _mariadb_async_engine
+    engine = _mariadb_async_engine
+    if engine is not None:
+        return engine
+    creds = json.loads(await get_db_credentials_async(param_name))
+    with _locks["mariadb_async"]:
+        if _mariadb_async_engine is None:
+            _mariadb_async_engine = _create_mysql_async_engine(creds, "mariadb", param_name)
+        return _mariadb_async_engine
+
 # ----------------- MSSQL -----------------------
 def get_mssqlserver_master_connection(param_name: str):
     """
     Direct pyodbc connection for master DB (no pooling), for CREATE DATABASE etc.
     """
+    import pyodbc
+
     creds = json.loads(get_db_credentials(param_name))
     conn_str = (
         f"DRIVER={{ODBC Driver 17 for SQL Server}};"
@@ -129,15 +443,18 @@ def _create_mssql_engine(creds) -> Engine:
     odbc_connect = urllib.parse.quote_plus(conn_str)
     return create_engine(
         f"mssql+pyodbc:///?odbc_connect={odbc_connect}",
-        pool_size=200, max_overflow=100, pool_recycle=3600
+        **get_pool_kwargs("mssql")
     )
 
 def _get_mssql_target_engine(param_name: str) -> Engine:
     global _mssql_engine_target
-    with _mssql_lock:
+    engine = _mssql_engine_target
+    if engine is not None:
+        return engine
+    with _locks["mssql"]:
         if _mssql_engine_target is None:
             creds = json.loads(get_db_credentials(param_name))
-            _mssql_engine_target = _create_mssql_engine(creds)
+            _mssql_engine_target = _register_engine(_create_mssql_engine(creds), "mssql", param_name)
         return _mssql_engine_target
 
 def get_mssqlserver_connection(param_name: str):
@@ -146,13 +463,16 @@ def get_mssqlserver_connection(param_name: str):
 # ----------------- ORACLE -----------------------
 def _get_oracle_engine(param_name: str) -> Engine:
     global _oracle_engine
-    with _lock:
+    engine = _oracle_engine
+    if engine is not None:
+        return engine
+    with _locks["oracle"]:
         if _oracle_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _oracle_engine = create_engine(
+            _oracle_engine = _register_engine(create_engine(
                 f"oracle+cx_oracle://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds.get('port', 1521)}/?service_name={creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("oracle")
+            ), "oracle", param_name)
         return _oracle_engine
 
 def get_oracle_connection(param_name: str):
@@ -161,13 +481,16 @@ def get_oracle_connection(param_name: str):
 # ----------------- IBM DB2 -----------------------
 def _get_ibmdb2_engine(param_name: str) -> Engine:
     global _ibmdb2_engine
-    with _lock:
+    engine = _ibmdb2_engine
+    if engine is not None:
+        return engine
+    with _locks["ibmdb2"]:
         if _ibmdb2_engine is None:
             creds = json.loads(get_db_credentials(param_name))
-            _ibmdb2_engine = create_engine(
+            _ibmdb2_engine = _register_engine(create_engine(
                 f"ibm_db_sa://{quote_plus(creds['username'])}:{quote_plus(creds['password'])}@{creds['host']}:{creds.get('port', 50000)}/{creds['database']}",
-                pool_size=200, max_overflow=100, pool_recycle=3600
-            )
+                **get_pool_kwargs("ibmdb2")
+            ), "ibmdb2", param_name)
         return _ibmdb2_engine
 
 def get_ibm_db2_connection(param_name: str):
@@ -175,4 +498,84 @@ def get_ibm_db2_connection(param_name: str):
 
 # ----------------- DynamoDB -----------------------
 def get_dynamodb_resource():
+    import boto3
     return boto3.resource('dynamodb', region_name=REGION)
+
+# ----------------- Shutdown -----------------------
+async def dispose_async_engines():
+    """
+    Closes the pooled connections of any asyncio engines and asyncpg pools that were created.
+    The globals are cleared before closing, so later requests build new ones with the
+    current pool allocation while requests already holding a connection finish on the old pool.
+    """
+    global _mysql_async_engine, _aurora_mysql_async_engine, _mariadb_async_engine
+    global _postgresql_asyncpg_pool, _aurora_postgresql_asyncpg_pool
+    with ExitStack() as stack:
+        for key in _ASYNC_ENGINE_KEYS:
+            stack.enter_context(_locks[key])
+        engines = (_mysql_async_engine, _aurora_mysql_async_engine, _mariadb_async_engine)
+        _mysql_async_engine = _aurora_mysql_async_engine = _mariadb_async_engine = None
+    async with _asyncpg_lock:
+        pools = (_postgresql_asyncpg_pool, _aurora_postgresql_asyncpg_pool)
+        _postgresql_asyncpg_pool = _aurora_postgresql_asyncpg_pool = None
+
+    for engine in engines:
+        if engine is not None:
+            await engine.dispose()
+    for pool in pools:
+        if pool is not None:
+            await pool.close()
+
+def reset_sql_engines():
+    """
+    Disposes the pooled SQL engines so they are recreated with the current pool
+    allocation on next use. Connections still checked out are discarded when returned.
+    """
+    global _mysql_engine, _aurora_mysql_engine, _postgresql_engine, _aurora_postgresql_engine
+    global _mariadb_engine, _mssql_engine_target, _oracle_engine, _ibmdb2_engine
+    with ExitStack() as stack:
+        for key in _SQL_ENGINE_KEYS:
+            stack.enter_context(_locks[key])
+        for engine in (_mysql_engine, _aurora_mysql_engine, _postgresql_engine, _aurora_postgresql_engine,
+                       _mariadb_engine, _mssql_engine_target, _oracle_engine, _ibmdb2_engine):
+            if engine is not None:
+                engine.dispose()
+        _mysql_engine = _aurora_mysql_engine = _postgresql_engine = _aurora_postgresql_engine = None
+        _mariadb_engine = _mssql_engine_target = _oracle_engine = _ibmdb2_engine = None
+
+async def reset_engines():
+    """
+    Disposes every pooled SQL engine, asyncio engine and asyncpg pool so each is
+    recreated with the current pool allocation on next use.
+    """
+    # Disposing the sync engines blocks on driver calls, so it runs off the event loop
+    await asyncio.to_thread(reset_sql_engines)
+    await dispose_async_engines()
+
+# ----------------- Fork safety -----------------------
+def _reset_after_fork():
+    """
+    Runs in a freshly forked worker process. Pooled connections inherited from
+    the parent must never be shared, so the engines are dropped without closing
+    the parent's sockets and are recreated lazily in the worker.
+    """
+    global _mysql_engine, _aurora_mysql_engine, _postgresql_engine, _aurora_postgresql_engine
+    global _mariadb_engine, _mssql_engine_target, _oracle_engine, _ibmdb2_engine
+    global _mysql_async_engine, _aurora_mysql_async_engine, _mariadb_async_engine
+    global _postgresql_asyncpg_pool, _aurora_postgresql_asyncpg_pool
+    global _locks, _asyncpg_lock
+
+    for engine in (_mysql_engine, _aurora_mysql_engine, _postgresql_engine, _aurora_postgresql_engine,
+                   _mariadb_engine, _mssql_engine_target, _oracle_engine, _ibmdb2_engine):
+        if engine is not None:
+            engine.dispose(close=False)
+
+    _mysql_engine = _aurora_mysql_engine = _postgresql_engine = _aurora_postgresql_engine = None
+    _mariadb_engine = _mssql_engine_target = _oracle_engine = _ibmdb2_engine = None
+    _mysql_async_engine = _aurora_mysql_async_engine = _mariadb_async_engine = None
+    _postgresql_asyncpg_pool = _aurora_postgresql_asyncpg_pool = None
+
+    _locks = {key: InstrumentedLock(key) for key in _ENGINE_KEYS}
+    _asyncpg_lock = asyncio.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,63 @@
+# batching.py
+# Theodor Harmse - University of Liverpool
+# Helpers for multi-row inserts: commit-size chunking and per-batch timing
+
+import os
+import time
+from itertools import islice
+
+# Rows written per commit for batch inserts, overridable per request
+DEFAULT_COMMIT_SIZE = int(os.environ.get("DB_BATCH_COMMIT_SIZE", "500"))
+
+
+def chunked(items, size: int):
+    """
+    Yields consecutive lists of at most size items from any iterable,
+    so generated rows are only materialized one chunk at a time.
+    """
+    iterator = iter(items)
+    size = max(1, size)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batches(rows, commit_size: int, write_batch) -> dict:
+    """
+    Calls write_batch(chunk) for each commit-size chunk of rows and returns the
+    timing of every batch together with the overall throughput.
+    """
+    batches = []
+    start = time.perf_counter()
+    for chunk in chunked(rows, commit_size or DEFAULT_COMMIT_SIZE):
+        batch_start = time.perf_counter()
+        write_batch(chunk)
+        batches.append({"rows": len(chunk), "seconds": round(time.perf_counter() - batch_start, 6)})
+    return _batch_report(batches, time.perf_counter() - start)
+
+
+async def arun_batches(rows, commit_size: int, write_batch) -> dict:
+    """
+    Async counterpart of run_batches: awaits write_batch(chunk) for each
+    commit-size chunk of rows and returns the same timing report.
+    """
+    batches = []
+    start = time.perf_counter()
+    for chunk in chunked(rows, commit_size or DEFAULT_COMMIT_SIZE):
+        batch_start = time.perf_counter()
+        await write_batch(chunk)
+        batches.append({"rows": len(chunk), "seconds": round(time.perf_counter() - batch_start, 6)})
+    return _batch_report(batches, time.perf_counter() - start)
+
+
+def _batch_report(batches: list, elapsed: float) -> dict:
+    inserted = sum(batch["rows"] for batch in batches)
+    return {
+        "inserted": inserted,
+        "batch_count": len(batches),
+        "seconds": round(elapsed, 6),
+        "rows_per_second": round(inserted / elapsed, 2) if elapsed > 0 else None,
+        "batches": batches
+    }
@@ -0,0 +1,24 @@
+# claiming.py
+# Theodor Harmse - University of Liverpool
+# Row claiming modes for update-random-status and delete-random, selectable per request
+
+import os
+
+# 'index' targets a random key from the key index (falling back to the first row);
+# 'skip_locked' claims a row no other transaction holds (SKIP LOCKED / READPAST),
+# so concurrent requests each get a different row instead of queueing on one lock
+CLAIM_MODES = ("index", "skip_locked")
+SKIP_LOCKED = "skip_locked"
+
+
+def resolve_claim_mode(backend: str, requested: str) -> str:
+    """
+    Returns the claiming mode for a request: the requested one, else
+    DB_CLAIM_MODE_<BACKEND>, else DB_CLAIM_MODE, else 'index'.
+    """
+    if requested:
+        if requested not in CLAIM_MODES:
+            raise ValueError(f"Unknown claim mode '{requested}', expected one of {', '.join(CLAIM_MODES)}.")
+        return requested
+    default = os.environ.get(f"DB_CLAIM_MODE_{backend.upper()}", os.environ.get("DB_CLAIM_MODE", "index"))
+    return default if default in CLAIM_MODES else "index"
@@ -0,0 +1,132 @@
+# copy_loader.py
+# Theodor Harmse - University of Liverpool
+# Streams generated transaction_records rows into PostgreSQL with COPY ... FROM STDIN
+
+import asyncio
+import io
+import time
+from threading import Lock
+
+from api_service.db.executor import run_blocking
+from api_service.db.sample_data import COLUMNS, generate_sample_rows
+
+# Rows per COPY statement (and commit) for the bulk loader
+DEFAULT_COPY_CHUNK_ROWS = 100000
+
+
+class RowStream(io.TextIOBase):
+    """
+    Read-only text stream producing tab-separated COPY rows on demand.
+    Only about one read() worth of rows is held in memory at any time.
+    """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += "\t".join(str(value) for value in row) + "\n"
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+
+def _tracked_rows(count: int, transaction_ids: list):
+    for row in generate_sample_rows(count):
+        transaction_ids.append(row[0])
+        yield row
+
+
+def copy_sample_data(conn, table_name: str, count: int, chunk_rows: int, progress: dict, key_index=None) -> dict:
+    """
+    Loads count generated rows through COPY FROM STDIN, one COPY and commit per
+    chunk_rows rows. progress is updated after every chunk so callers can report it,
+    and each committed chunk's keys are added to key_index (when given).
+    """
+    copy_sql = f"COPY {table_name} ({', '.join(COLUMNS)}) FROM STDIN"
+    chunk_rows = max(1, chunk_rows or DEFAULT_COPY_CHUNK_ROWS)
+
+    progress.update({"status": "running", "total": count, "loaded": 0, "seconds": 0.0, "rows_per_second": None})
+    start = time.perf_counter()
+    try:
+        with conn.cursor() as cursor:
+            while progress["loaded"] < count:
+                rows = min(chunk_rows, count - progress["loaded"])
+                transaction_ids = []
+                cursor.copy_expert(copy_sql, RowStream(_tracked_rows(rows, transaction_ids)))
+                conn.commit()
+                if key_index is not None:
+                    key_index.add_many(transaction_ids)
+
+                elapsed = time.perf_counter() - start
+                progress["loaded"] += rows
+                progress["seconds"] = round(elapsed, 3)
+                progress["rows_per_second"] = round(progress["loaded"] / elapsed, 2) if elapsed > 0 else None
+        progress["status"] = "completed"
+    except Exception as e:
+        progress.update({"status": "failed", "error": str(e)})
+        raise
+    return dict(progress)
+
+
+class CopyLoadJob:
+    """
+    Runs at most one COPY bulk load per backend, in the background on the
+    backend's thread pool, with its progress kept for the status endpoint.
+    """
+
+    def __init__(self, backend: str, label: str, table_name: str, get_connection, key_index=None):
+        self._backend = backend
+        self._label = label
+        self._table_name = table_name
+        self._get_connection = get_connection
+        self._key_index = key_index
+        self._lock = Lock()
+        self._task = None
+        self.progress = {}
+
+    def _load(self, count: int, chunk_rows: int) -> dict:
+        try:
+            conn = self._get_connection()
+            try:
+                return copy_sample_data(conn, self._table_name, count, chunk_rows, self.progress, self._key_index)
+            finally:
+                conn.close()
+        except Exception as e:
+            self.progress.update({"status": "failed", "error": str(e)})
+            raise
+        finally:
+            self._lock.release()
+
+    async def start(self, count: int, chunk_rows: int = None, wait: bool = False) -> dict:
+        """
+        Starts a load of count rows unless one is already running. Returns at once,
+        or when wait is set, after the load finishes (a client disconnect does not cancel it).
+        """
+        if not self._lock.acquire(blocking=False):
+            return {"message": "A bulk load is already running.", **self.report()}
+        self.progress.clear()
+        self.progress.update({"status": "running", "total": count, "loaded": 0})
+        self._task = asyncio.ensure_future(run_blocking(self._backend, self._load, count, chunk_rows))
+        # The outcome is recorded in progress, so an unawaited failure is not logged again
+        self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        if wait:
+            await asyncio.shield(self._task)
+            return {"message": f"{count} sample records bulk loaded successfully into {self._label}.", **self.report()}
+        return {"message": f"Bulk loading {count} sample records into {self._label} in the background.", **self.report()}
+
+    def report(self) -> dict:
+        return dict(self.progress) or {"status": "idle"}
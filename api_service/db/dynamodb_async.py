@@ -0,0 +1,225 @@
+# dynamodb_async.py
+# Theodor Harmse - University of Liverpool
+# Asyncio (aioboto3) implementation of DynamoDB operations for transaction_records table
+
+import asyncio
+import uuid
+import random
+from contextlib import AsyncExitStack
+from decimal import Decimal
+from typing import Optional
+from botocore.exceptions import ClientError
+
+from api_service.db.key_index import get_key_index
+from api_service.db.result_cache import get_result_cache
+from api_service.db.sample_data import generate_sample_record
+from api_service.db.sampling import INDEX_STRATEGY, SCAN_STRATEGIES, resolve_sampling, scan_sample_kwargs
+
+
+class AsyncDynamoDBService:
+    """
+    transaction_records operations on an aioboto3 DynamoDB resource.
+    The resource and its HTTP connection pool are opened once (normally in the
+    app lifespan) and shared by every request.
+    """
+
+    def __init__(self, creds_getter, max_pool_connections: int, keepalive_timeout: int, backend: str):
+        self._creds_getter = creds_getter
+        self._max_pool_connections = max_pool_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._key_index = get_key_index(backend)
+        self._result_cache = get_result_cache(backend)
+        self._backend = backend
+        self._stack = None
+        self._resource = None
+        self._table = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """
+        Opens the aioboto3 resource and Table. Imported lazily so aioboto3 is
+        only required when the async mode is enabled.
+        """
+        async with self._lock:
+            if self._table is not None:
+                return
+            import aioboto3
+            from aiobotocore.config import AioConfig
+
+            # The settings may come from SSM, so they are read off the event loop
+            creds = await asyncio.to_thread(self._creds_getter)
+            session = aioboto3.Session(region_name=creds["region"])
+            config = AioConfig(
+                max_pool_connections=self._max_pool_connections,
+                connector_args={"keepalive_timeout": self._keepalive_timeout}
+            )
+            stack = AsyncExitStack()
+            self._resource = await stack.enter_async_context(
+                session.resource("dynamodb", endpoint_url=creds.get("endpoint"), config=config)
+            )
+            self._table = await self._resource.Table(creds["table_name"])
+            self._stack = stack
+
+    async def close(self):
+        """
+        Closes the aioboto3 resource and its HTTP connection pool.
+        """
+        async with self._lock:
+            if self._stack is not None:
+                await self._stack.aclose()
+            self._stack = self._resource = self._table = None
+
+    async def get_table(self):
+        if self._table is None:
+            await self.start()
+        return self._table
+
+    async def _sample_transaction_id(self, table, strategy: str):
+        response = await table.scan(**scan_sample_kwargs(strategy))
+        items = response.get("Items", [])
+        if not items and strategy != "first":
+            response = await table.scan(**scan_sample_kwargs("first"))
+            items = response.get("Items", [])
+        return items[0]["transaction_id"] if items else None
+
+    async def _candidates(self, table, strategy: str, key=None):
+        if strategy == INDEX_STRATEGY:
+            async def first_transaction_id():
+                return await self._sample_transaction_id(table, "first")
+
+            async for transaction_id in self._key_index.acandidates(first_transaction_id, key):
+                yield transaction_id
+            return
+        transaction_id = await self._sample_transaction_id(table, strategy)
+        if transaction_id is not None:
+            yield transaction_id
+
+    async def initialize_table(self):
+        """
+        Checks if the table exists. If not, creates it.
+        """
+        table_name = self._creds_getter()["table_name"]
+        table = await self.get_table()
+
+        try:
+            await table.load()
+            return {"message": f"Table '{table_name}' already exists in DynamoDB."}
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ResourceNotFoundException':
+                return {"error": str(e)}
+            new_table = await self._resource.create_table(
+                TableName=table_name,
+                KeySchema=[{'AttributeName': 'transaction_id', 'KeyType': 'HASH'}],
+                AttributeDefinitions=[{'AttributeName': 'transaction_id', 'AttributeType': 'S'}],
+                BillingMode='PAY_PER_REQUEST'
+            )
+            await new_table.wait_until_exists()
+            return {"message": f"Table '{table_name}' created successfully in DynamoDB."}
+
+    async def insert_transaction(self, record: Optional[dict] = None):
+        """
+        Inserts a new transaction record into the table.
+        If no record is provided, generates a new random sample record.
+        """
+        if record is None:
+            record = generate_sample_record()
+        # DynamoDB does not support float, use Decimal instead
+        for key, value in record.items():
+            if isinstance(value, float):
+                record[key] = Decimal(str(value))
+
+        record["transaction_id"] = str(uuid.uuid4())
+
+        try:
+            table = await self.get_table()
+            await table.put_item(Item=record)
+            self._key_index.add(record["transaction_id"])
+            return {"message": "Record inserted successfully into DynamoDB.", "transaction_id": record["transaction_id"]}
+        except ClientError as e:
+            return {"error": str(e)}
+
+    async def select_transaction(self, sampling: Optional[str] = None):
+        """
+        Retrieves one random transaction record from the DynamoDB table.
+        sampling is 'index' (random key from the key index), 'first', 'segment' or 'seek'.
+        """
+        strategy = resolve_sampling(self._backend, sampling, SCAN_STRATEGIES, self._key_index)
+
+        key, record = self._result_cache.lookup(self._key_index, strategy)
+        if record is not None:
+            return {"record": record, "sampling": strategy, "cached": True}
+        version = self._result_cache.version()
+
+        try:
+            table = await self.get_table()
+            item = None
+            async for transaction_id in self._candidates(table, strategy, key):
+                response = await table.get_item(Key={"transaction_id": transaction_id})
+                item = response.get("Item")
+                if item:
+                    break
+            if not item:
+                return {"message": "No records found in the DynamoDB table."}
+            self._result_cache.put(item["transaction_id"], item, version)
+            return {"record": item, "sampling": strategy}
+        except ClientError as e:
+            return {"error": str(e)}
+
+    async def update_random_transaction_status(self, sampling: Optional[str] = None):
+        """
+        Updates the 'status' field of one random transaction record in DynamoDB.
+        Selects a new random status from predefined options.
+        sampling is 'index' (random key from the key index), 'first', 'segment' or 'seek'.
+        """
+        strategy = resolve_sampling(self._backend, sampling, SCAN_STRATEGIES, self._key_index)
+        statuses = ["Completed", "Pending", "Failed", "Refunded"]
+        new_status = random.choice(statuses)
+
+        try:
+            table = await self.get_table()
+            transaction_id = None
+            async for candidate in self._candidates(table, strategy):
+                try:
+                    await table.update_item(
+                        Key={"transaction_id": candidate},
+                        UpdateExpression="SET #s = :status",
+                        ConditionExpression="attribute_exists(transaction_id)",
+                        ExpressionAttributeNames={"#s": "status"},
+                        ExpressionAttributeValues={":status": new_status}
+                    )
+                except ClientError as e:
+                    if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                        continue
+                    raise
+                transaction_id = candidate
+                break
+
+            if transaction_id is None:
+                return {"message": "No records found to update in the DynamoDB table."}
+            self._result_cache.invalidate(transaction_id)
+            return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in DynamoDB."}
+        except ClientError as e:
+            return {"error": str(e)}
+
+    async def delete_random_transaction(self, sampling: Optional[str] = None):
+        """
+        Deletes one random transaction record from the DynamoDB table.
+        sampling is 'index' (random key from the key index), 'first', 'segment' or 'seek'.
+        """
+        strategy = resolve_sampling(self._backend, sampling, SCAN_STRATEGIES, self._key_index)
+        try:
+            table = await self.get_table()
+            transaction_id = None
+            async for candidate in self._candidates(table, strategy):
+                response = await table.delete_item(Key={"transaction_id": candidate}, ReturnValues="ALL_OLD")
+                if "Attributes" in response:
+                    transaction_id = candidate
+                    break
+
+            if transaction_id is None:
+                return {"message": "No records found to delete in the DynamoDB table."}
+            self._key_index.discard(transaction_id)
+            self._result_cache.invalidate(transaction_id)
+            return {"message": f"Deleted transaction with ID {transaction_id} from DynamoDB."}
+        except ClientError as e:
+            return {"error": str(e)}
@@ -0,0 +1,152 @@
+# dynamodb_loader.py
+# Theodor Harmse - University of Liverpool
+# Parallel BatchWriteItem bulk loader for the DynamoDB transaction_records table
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from threading import Lock
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+from api_service.db.sample_data import generate_sample_record
+
+# BatchWriteItem accepts at most 25 put requests per call
+BATCH_WRITE_LIMIT = 25
+
+# Retry tuning for UnprocessedItems and throttling errors (full-jitter exponential backoff)
+MAX_ATTEMPTS = int(os.environ.get("DYNAMODB_BATCH_MAX_ATTEMPTS", "10"))
+BACKOFF_BASE_SECONDS = float(os.environ.get("DYNAMODB_BATCH_BACKOFF_BASE", "0.05"))
+BACKOFF_CAP_SECONDS = float(os.environ.get("DYNAMODB_BATCH_BACKOFF_CAP", "5"))
+
+THROTTLING_ERRORS = (
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+)
+
+_serializer = TypeSerializer()
+
+
+def _backoff(attempt: int):
+    time.sleep(random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))))
+
+
+def _sample_put_request() -> dict:
+    record = generate_sample_record()
+    # DynamoDB does not support float, use Decimal instead
+    record["unit_price"] = Decimal(str(record["unit_price"]))
+    record["total_amount"] = Decimal(str(record["total_amount"]))
+    return {"PutRequest": {"Item": {key: _serializer.serialize(value) for key, value in record.items()}}}
+
+
+def _transaction_id(request: dict) -> str:
+    return request["PutRequest"]["Item"]["transaction_id"]["S"]
+
+
+class BatchWriteLoader:
+    """
+    Writes generated items in 25-item BatchWriteItem calls from several worker threads.
+    UnprocessedItems and throttling errors are retried with jittered exponential backoff;
+    consumed write capacity and throttling events are totalled for the report.
+    Written keys are added to key_index (when given) so random operations can find them.
+    """
+
+    def __init__(self, client, table_name: str, key_index=None):
+        self._client = client
+        self._table_name = table_name
+        self._key_index = key_index
+        self._lock = Lock()
+        self._remaining = 0
+        self.written = 0
+        self.consumed_wcu = 0.0
+        self.throttle_events = 0
+        self.unprocessed_retries = 0
+        self.failed = 0
+
+    def _next_batch_size(self) -> int:
+        with self._lock:
+            size = min(BATCH_WRITE_LIMIT, self._remaining)
+            self._remaining -= size
+            return size
+
+    def _record(self, written: int = 0, wcu: float = 0.0, throttles: int = 0, retries: int = 0, failed: int = 0):
+        with self._lock:
+            self.written += written
+            self.consumed_wcu += wcu
+            self.throttle_events += throttles
+            self.unprocessed_retries += retries
+            self.failed += failed
+
+    def _write_batch(self, requests: list):
+        attempt = 0
+        while requests:
+            try:
+                response = self._client.batch_write_item(
+                    RequestItems={self._table_name: requests},
+                    ReturnConsumedCapacity="TOTAL"
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in THROTTLING_ERRORS or attempt + 1 >= MAX_ATTEMPTS:
+                    self._record(failed=len(requests))
+                    raise
+                self._record(throttles=1)
+                _backoff(attempt)
+                attempt += 1
+                continue
+
+            wcu = sum(c.get("CapacityUnits", 0) for c in response.get("ConsumedCapacity", []))
+            unprocessed = response.get("UnprocessedItems", {}).get(self._table_name, [])
+            self._record(written=len(requests) - len(unprocessed), wcu=wcu)
+            if self._key_index is not None:
+                pending = {_transaction_id(request) for request in unprocessed}
+                self._key_index.add_many(
+                    key for key in map(_transaction_id, requests) if key not in pending
+                )
+
+            if not unprocessed:
+                return
+            if attempt + 1 >= MAX_ATTEMPTS:
+                self._record(failed=len(unprocessed))
+                return
+            self._record(retries=len(unprocessed), throttles=1)
+            _backoff(attempt)
+            attempt += 1
+            requests = unprocessed
+
+    def _worker(self):
+        while True:
+            size = self._next_batch_size()
+            if size == 0:
+                return
+            self._write_batch([_sample_put_request() for _ in range(size)])
+
+    def load(self, count: int, workers: int) -> dict:
+        """
+        Loads count generated items using workers concurrent writers and returns the report.
+        """
+        self._remaining = count
+        workers = max(1, workers)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dynamodb-loader") as pool:
+            futures = [pool.submit(self._worker) for _ in range(workers)]
+            errors = [str(f.exception()) for f in futures if f.exception() is not None]
+        elapsed = time.perf_counter() - start
+
+        report = {
+            "requested": count,
+            "written": self.written,
+            "failed": self.failed,
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "items_per_second": round(self.written / elapsed, 2) if elapsed > 0 else None,
+            "consumed_wcu": self.consumed_wcu,
+            "consumed_wcu_per_second": round(self.consumed_wcu / elapsed, 2) if elapsed > 0 else None,
+            "throttle_events": self.throttle_events,
+            "unprocessed_retries": self.unprocessed_retries
+        }
+        if errors:
+            report["error"] = errors[0]
+        return report
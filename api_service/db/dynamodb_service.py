@@ -2,6 +2,7 @@
 # Theodor Harmse - University of Liverpool
 # Implementation of DynamoDB operations for transaction_records table
 
+import os
 import uuid
 import random
 import json
@@ -10,41 +11,144 @@ from fastapi import Body
 from datetime import datetime, timedelta
 import boto3
 from decimal import Decimal
+from threading import Lock
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from api_service.db.base import get_db_credentials
+from api_service.db.batching import run_batches
+from api_service.db.key_index import get_key_index, reservoir_sample
+from api_service.db.result_cache import get_result_cache
+from api_service.db.load_jobs import get_load_job, run_load_job
+from api_service.db.sampling import INDEX_STRATEGY, SCAN_STRATEGIES, resolve_sampling, scan_sample_kwargs
+from api_service.db.executor import offload
+from api_service.db.base import get_db_credentials, use_async_engine
+from api_service.db.dynamodb_async import AsyncDynamoDBService
+from api_service.db.dynamodb_loader import BatchWriteLoader
 
 PARAM_NAME = "/Liverpool/DynamoDB/Credentials"
 
-# --------- Global session/resource/table reuse ---------
-_creds = json.loads(get_db_credentials(PARAM_NAME))
-_session = boto3.Session(region_name=_creds["region"])
-_dynamodb_resource = _session.resource(
-    "dynamodb",
-    endpoint_url=_creds.get("endpoint")
-)
-_table = _dynamodb_resource.Table(_creds["table_name"])
+# Backend key for the dedicated thread pool
+BACKEND = "dynamodb"
+
+# Random transaction_ids for point lookups, filled from inserts and key scans
+_key_index = get_key_index(BACKEND)
+
+# Optional read-through cache of select-random records (DB_RESULT_CACHE=1)
+_result_cache = get_result_cache(BACKEND)
+
+# HTTP connection pool tuning shared by the boto3 and async clients
+MAX_POOL_CONNECTIONS = int(os.environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", "100"))
+KEEPALIVE_TIMEOUT = int(os.environ.get("DYNAMODB_KEEPALIVE_TIMEOUT", "60"))
+
+# Concurrent BatchWriteItem writers for bulk loads
+LOADER_WORKERS = int(os.environ.get("DYNAMODB_LOADER_WORKERS", "8"))
+
+# --------- Lazily created session/resource/table reuse ---------
+_creds = None
+_dynamodb_resource = None
+_table = None
+_client = None
+_lock = Lock()
+
+# Async client (DB_ENGINE_MODE_DYNAMODB=async), started in the app lifespan
+_async_service = None
 # ------------------------------------------------------------
 
-async def get_table():
+def get_creds() -> dict:
+    """
+    Returns the parsed DynamoDB settings from the parameter store.
+    """
+    global _creds
+    if _creds is None:
+        _creds = json.loads(get_db_credentials(PARAM_NAME))
+    return _creds
+
+def get_resource():
+    """
+    Returns the shared boto3 DynamoDB resource, creating it on first use.
+    The HTTP pool is sized to serve every thread in the backend's executor.
+    """
+    global _dynamodb_resource
+    if _dynamodb_resource is None:
+        with _lock:
+            if _dynamodb_resource is None:
+                creds = get_creds()
+                session = boto3.Session(region_name=creds["region"])
+                _dynamodb_resource = session.resource(
+                    "dynamodb",
+                    endpoint_url=creds.get("endpoint"),
+                    config=Config(max_pool_connections=MAX_POOL_CONNECTIONS, tcp_keepalive=True)
+                )
+    return _dynamodb_resource
+
+def get_table():
     """
-    Returns the globally initialized boto3 Table resource.
+    Returns the shared boto3 Table resource, creating it on first use.
     """
+    global _table
+    if _table is None:
+        _table = get_resource().Table(get_creds()["table_name"])
     return _table
 
-async def initialize_table():
+def get_client():
+    """
+    Returns the shared low-level boto3 DynamoDB client used by the bulk loader.
+    Unlike resources, clients are thread safe and can be shared by the loader workers.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                creds = get_creds()
+                session = boto3.Session(region_name=creds["region"])
+                _client = session.client(
+                    "dynamodb",
+                    endpoint_url=creds.get("endpoint"),
+                    config=Config(max_pool_connections=MAX_POOL_CONNECTIONS, tcp_keepalive=True)
+                )
+    return _client
+
+def _reset_after_fork():
+    """
+    boto3 sessions are not fork safe: a forked worker builds its own resource on first use.
+    """
+    global _dynamodb_resource, _table, _client, _lock
+    _dynamodb_resource = None
+    _table = None
+    _client = None
+    _lock = Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+async def start_async_client():
+    """
+    Opens the asyncio DynamoDB client when DB_ENGINE_MODE_DYNAMODB=async.
+    Called from the application lifespan; a no-op in the default boto3 mode.
+    """
+    if _async_service is not None:
+        await _async_service.start()
+
+async def close_async_client():
+    """
+    Closes the asyncio DynamoDB client and its HTTP connection pool.
+    """
+    if _async_service is not None:
+        await _async_service.close()
+
+@offload(BACKEND)
+def initialize_table():
     """
     Checks if the table exists. If not, creates it.
     """
-    table_name = _creds["table_name"]
+    table_name = get_creds()["table_name"]
 
     try:
-        _table.load()
+        get_table().load()
         return {"message": f"Table '{table_name}' already exists in DynamoDB."}
     except ClientError as e:
         if e.response['Error']['Code'] != 'ResourceNotFoundException':
             return {"error": str(e)}
         # Create the table
-        new_table = _dynamodb_resource.create_table(
+        new_table = get_resource().create_table(
             TableName=table_name,
             KeySchema=[{'AttributeName': 'transaction_id', 'KeyType': 'HASH'}],
             AttributeDefinitions=[{'AttributeName': 'transaction_id', 'AttributeType': 'S'}],
@@ -53,14 +157,32 @@ async def initialize_table():
         new_table.wait_until_exists()
         return {"message": f"Table '{table_name}' created successfully in DynamoDB."}
 
-async def load_sample_data():
+async def load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Starts a background job inserting count random records through insert_transactions_batch(),
+    one commit per batch_size records, with up to parallelism batches in flight.
+    Progress, elapsed time and throughput are reported by get_load_sample_data_status().
+    """
+    return await run_load_job(BACKEND, "DynamoDB", insert_transactions_batch, count, batch_size, parallelism, wait)
+
+def get_load_sample_data_status():
     """
-    Inserts 1 random sample record into the transaction_records table.
+    Returns the progress of the current or most recent sample data load job.
     """
-    await insert_transaction(record=None)
-    return {"message": "1 sample record inserted successfully into DynamoDB."}
+    return get_load_job(BACKEND)
 
-async def insert_transaction(record: Optional[dict] = Body(None)):
+@offload(BACKEND)
+def bulk_load_sample_data(count: int, workers: Optional[int] = None):
+    """
+    Inserts count generated records with 25-item BatchWriteItem calls from
+    several concurrent workers. Reports consumed write capacity and throttling events.
+    """
+    loader = BatchWriteLoader(get_client(), get_creds()["table_name"], _key_index)
+    result = loader.load(count, min(workers or LOADER_WORKERS, MAX_POOL_CONNECTIONS))
+    return {"message": f"{result['written']} sample records bulk loaded successfully into DynamoDB.", **result}
+
+@offload(BACKEND)
+def insert_transaction(record: Optional[dict] = Body(None)):
     """
     Inserts a new transaction record into the table.
     If no record is provided, generates a new random sample record.
@@ -89,70 +211,187 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     record["transaction_id"] = str(uuid.uuid4())
 
     try:
-        table = await get_table()
+        table = get_table()
         table.put_item(Item=record)
+        _key_index.add(record["transaction_id"])
         return {"message": "Record inserted successfully into DynamoDB.", "transaction_id": record["transaction_id"]}
     except ClientError as e:
         return {"error": str(e)}
 
-async def select_transaction():
+@offload(BACKEND)
+def insert_transactions_batch(records: list, commit_size: Optional[int] = None):
+    """
+    Inserts a list of transaction records with the boto3 batch_writer, which sends
+    BatchWriteItem requests of up to 25 items and resubmits unprocessed items.
+    Each commit_size chunk is flushed before the next one; returns the timing of every batch.
+    """
+    for record in records:
+        record["transaction_id"] = str(uuid.uuid4())
+        # DynamoDB does not support float, use Decimal instead
+        for key, value in record.items():
+            if isinstance(value, float):
+                record[key] = Decimal(str(value))
+
+    try:
+        table = get_table()
+
+        def write_batch(chunk):
+            with table.batch_writer() as writer:
+                for item in chunk:
+                    writer.put_item(Item=item)
+
+        result = run_batches(records, commit_size, write_batch)
+        _key_index.add_many(record["transaction_id"] for record in records)
+        return {"message": f"{len(records)} records inserted successfully into DynamoDB.", **result}
+    except ClientError as e:
+        return {"error": str(e)}
+
+def _first_transaction_id():
+    """
+    Returns the transaction_id of the first scanned item, or None when the table is empty.
+    """
+    items = get_table().scan(Limit=1, ProjectionExpression="transaction_id").get("Items", [])
+    return items[0]["transaction_id"] if items else None
+
+def _sample_transaction_id(strategy: str):
+    """
+    Reads one transaction_id with a Scan strategy; an empty sample (a small
+    table, an empty segment or a seek past the end) falls back to 'first'.
+    """
+    table = get_table()
+    items = table.scan(**scan_sample_kwargs(strategy)).get("Items", [])
+    if not items and strategy != "first":
+        items = table.scan(**scan_sample_kwargs("first")).get("Items", [])
+    return items[0]["transaction_id"] if items else None
+
+def _candidates(strategy: str, key=None):
+    """
+    Yields the transaction_ids to try: key index candidates for 'index', else one sampled key.
+    """
+    if strategy == INDEX_STRATEGY:
+        yield from _key_index.candidates(_first_transaction_id, key)
+        return
+    transaction_id = _sample_transaction_id(strategy)
+    if transaction_id is not None:
+        yield transaction_id
+
+def _scan_transaction_ids():
+    table = get_table()
+    scan_kwargs = {"ProjectionExpression": "transaction_id"}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            yield item["transaction_id"]
+        if "LastEvaluatedKey" not in response:
+            return
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+@offload(BACKEND)
+def scan_keys(limit: int) -> list:
+    """
+    Returns a uniform random sample of up to limit transaction_ids to rebuild the
+    key index, from a full scan of only the key attribute.
+    """
+    return reservoir_sample(_scan_transaction_ids(), limit)
+
+@offload(BACKEND)
+def select_transaction(sampling: Optional[str] = None):
     """
     Retrieves one random transaction record from the DynamoDB table.
+    sampling is 'index' (random key from the key index), 'first', 'segment' or 'seek',
+    followed by a GetItem (or a conditional write) on the chosen key.
     """
+    strategy = resolve_sampling(BACKEND, sampling, SCAN_STRATEGIES, _key_index)
+
+    key, record = _result_cache.lookup(_key_index, strategy)
+    if record is not None:
+        return {"record": record, "sampling": strategy, "cached": True}
+    version = _result_cache.version()
+
     try:
-        table = await get_table()
-        scan_response = table.scan(Limit=1)
-        items = scan_response.get("Items", [])
-        if not items:
+        table = get_table()
+        item = None
+        for transaction_id in _candidates(strategy, key):
+            item = table.get_item(Key={"transaction_id": transaction_id}).get("Item")
+            if item:
+                break
+        if not item:
             return {"message": "No records found in the DynamoDB table."}
-        selected = random.choice(items)
-        return {"record": selected}
+        _result_cache.put(item["transaction_id"], item, version)
+        return {"record": item, "sampling": strategy}
     except ClientError as e:
         return {"error": str(e)}
 
-async def update_random_transaction_status():
+@offload(BACKEND)
+def update_random_transaction_status(sampling: Optional[str] = None):
     """
     Updates the 'status' field of one random transaction record in DynamoDB.
     Selects a new random status from predefined options.
+    sampling is 'index' (random key from the key index), 'first', 'segment' or 'seek',
+    followed by a GetItem (or a conditional write) on the chosen key.
     """
+    strategy = resolve_sampling(BACKEND, sampling, SCAN_STRATEGIES, _key_index)
     statuses = ["Completed", "Pending", "Failed", "Refunded"]
     new_status = random.choice(statuses)
 
     try:
-        table = await get_table()
-        scan_response = table.scan(Limit=1)
-        items = scan_response.get("Items", [])
-        if not items:
-            return {"message": "No records found to update in the DynamoDB table."}
+        table = get_table()
+        transaction_id = None
+        for candidate in _candidates(strategy):
+            try:
+                # The condition stops update_item from creating an item for a deleted key
+                table.update_item(
+                    Key={"transaction_id": candidate},
+                    UpdateExpression="SET #s = :status",
+                    ConditionExpression="attribute_exists(transaction_id)",
+                    ExpressionAttributeNames={"#s": "status"},
+                    ExpressionAttributeValues={":status": new_status}
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    continue
+                raise
+            transaction_id = candidate
+            break
 
-        selected = random.choice(items)
-        transaction_id = selected["transaction_id"]
-
-        table.update_item(
-            Key={"transaction_id": transaction_id},
-            UpdateExpression="SET #s = :status",
-            ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={":status": new_status}
-        )
+        if transaction_id is None:
+            return {"message": "No records found to update in the DynamoDB table."}
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in DynamoDB."}
     except ClientError as e:
         return {"error": str(e)}
 
-async def delete_random_transaction():
+@offload(BACKEND)
+def delete_random_transaction(sampling: Optional[str] = None):
     """
     Deletes one random transaction record from the DynamoDB table.
+    sampling is 'index' (random key from the key index), 'first', 'segment' or 'seek',
+    followed by a GetItem (or a conditional write) on the chosen key.
     """
+    strategy = resolve_sampling(BACKEND, sampling, SCAN_STRATEGIES, _key_index)
     try:
-        table = await get_table()
-        scan_response = table.scan(Limit=1)
-        items = scan_response.get("Items", [])
-        if not items:
-            return {"message": "No records found to delete in the DynamoDB table."}
+        table = get_table()
+        transaction_id = None
+        for candidate in _candidates(strategy):
+            response = table.delete_item(Key={"transaction_id": candidate}, ReturnValues="ALL_OLD")
+            if "Attributes" in response:
+                transaction_id = candidate
+                break
 
-        selected = random.choice(items)
-        transaction_id = selected["transaction_id"]
-
-        table.delete_item(Key={"transaction_id": transaction_id})
+        if transaction_id is None:
+            return {"message": "No records found to delete in the DynamoDB table."}
+        _key_index.discard(transaction_id)
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Deleted transaction with ID {transaction_id} from DynamoDB."}
     except ClientError as e:
         return {"error": str(e)}
+
+# Asyncio client mode (DB_ENGINE_MODE_DYNAMODB=async):
+# replace the thread-pool implementations with aioboto3 coroutines.
+if use_async_engine(BACKEND):
+    _async_service = AsyncDynamoDBService(get_creds, MAX_POOL_CONNECTIONS, KEEPALIVE_TIMEOUT, BACKEND)
+    initialize_table = _async_service.initialize_table
+    insert_transaction = _async_service.insert_transaction
+    select_transaction = _async_service.select_transaction
+    update_random_transaction_status = _async_service.update_random_transaction_status
+    delete_random_transaction = _async_service.delete_random_transaction
@@ -0,0 +1,112 @@
+# executor.py
+# Theodor Harmse - University of Liverpool
+# Bounded per-backend thread pools for running blocking database driver calls off the event loop
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+# Default number of worker threads per backend, overridable per backend with
+# DB_EXECUTOR_THREADS_<BACKEND> (e.g. DB_EXECUTOR_THREADS_ORACLE=16)
+DEFAULT_THREADS = int(os.environ.get("DB_EXECUTOR_THREADS", "64"))
+
+# Backend keys used throughout api_service.db (match the *_service.py module names)
+BACKENDS = (
+    "mysql",
+    "aurora_mysql",
+    "postgresql",
+    "aurora_postgresql",
+    "mariadb",
+    "mssql",
+    "oracle",
+    "dynamodb",
+    "ibmdb2",
+)
+
+_executors = {}
+_lock = Lock()
+
+
+def get_thread_count(backend: str) -> int:
+    """
+    Returns the configured thread pool size for the given backend.
+    """
+    return int(os.environ.get(f"DB_EXECUTOR_THREADS_{backend.upper()}", DEFAULT_THREADS))
+
+
+def get_executor(backend: str) -> ThreadPoolExecutor:
+    """
+    Returns the dedicated thread pool for the given backend, creating it on first use.
+    Each backend has its own pool so a slow database cannot starve the others.
+    """
+    executor = _executors.get(backend)
+    if executor is not None:
+        return executor
+    with _lock:
+        if backend not in _executors:
+            _executors[backend] = ThreadPoolExecutor(
+                max_workers=get_thread_count(backend),
+                thread_name_prefix=f"db-{backend}"
+            )
+        return _executors[backend]
+
+
+async def run_blocking(backend: str, func, *args, **kwargs):
+    """
+    Runs a blocking driver call on the backend's thread pool and awaits the result.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(backend),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def offload(backend: str):
+    """
+    Decorator turning a blocking service function into an awaitable that runs
+    on the backend's thread pool, keeping the event loop free for other requests.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_blocking(backend, func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_executor_stats() -> dict:
+    """
+    Returns the configured and started thread pools per backend.
+    """
+    return {
+        backend: {
+            "max_threads": get_thread_count(backend),
+            "started": backend in _executors
+        }
+        for backend in BACKENDS
+    }
+
+
+def shutdown_executors(wait: bool = True):
+    """
+    Shuts down all backend thread pools. Called from the application lifespan.
+    """
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
+
+
+def _reset_after_fork():
+    """
+    Worker threads do not survive fork, so a forked worker starts with no pools.
+    """
+    global _lock
+    _executors.clear()
+    _lock = Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,38 +2,87 @@
 # Theodor Harmse - University of Liverpool
 # Implementation of IBM Db2 database operations for transaction_records table
 
+import os
 import uuid
 import random
 from typing import Optional
 from fastapi import Body
 from datetime import datetime, timedelta
-from api_service.db.base import get_ibm_db2_connection
+from api_service.db.batching import chunked, run_batches
+from api_service.db.sample_data import generate_sample_record
+from api_service.db.key_index import get_key_index, sample_keys
+from api_service.db.result_cache import get_result_cache
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.load_jobs import get_load_job, run_load_job
+from api_service.db.statement_cache import execute_prepared, prepare_ibmdb2
+from api_service.db.sampling import INDEX_STRATEGY, resolve_sampling, sample_row
+from api_service.db.executor import offload
+from api_service.db.base import get_ibm_db2_connection, get_session_state, set_session_autocommit
 
 # Parameter Store name for IBM Db2 credentials
 PARAM_NAME = "/Liverpool/RDS/IBMDB2/Credentials"
 TABLE_NAME = "transaction_records"
 
+# Backend key for the dedicated thread pool
+BACKEND = "ibmdb2"
 
-async def get_connection(autocommit: bool = True):
+# Random transaction_ids for point lookups, filled from inserts and key scans
+_key_index = get_key_index(BACKEND)
+
+# Optional read-through cache of select-random records (DB_RESULT_CACHE=1)
+_result_cache = get_result_cache(BACKEND)
+
+# Database-side select-random strategies ('seek' range-seeks from a random UUID)
+SAMPLING_QUERIES = {
+    "first": "SELECT * FROM {table} FETCH FIRST 1 ROW ONLY",
+    "seek": "SELECT * FROM {table} WHERE transaction_id >= ? ORDER BY transaction_id FETCH FIRST 1 ROW ONLY",
+    "system": "SELECT * FROM {table} TABLESAMPLE SYSTEM ({percent}) FETCH FIRST 1 ROW ONLY",
+    "bernoulli": "SELECT * FROM {table} TABLESAMPLE BERNOULLI ({percent}) FETCH FIRST 1 ROW ONLY"
+}
+
+# Bulk insert tuning: 'array' sends each batch through ibm_db array execution,
+# 'multirow' sends INSERT ... VALUES (...), (...) statements of MULTIROW_ROWS rows
+BULK_METHODS = ("array", "multirow")
+DEFAULT_BULK_METHOD = os.environ.get("IBMDB2_BULK_METHOD", "array")
+BATCH_SIZE = int(os.environ.get("IBMDB2_BATCH_SIZE", "1000"))
+MULTIROW_ROWS = int(os.environ.get("IBMDB2_MULTIROW_ROWS", "100"))
+
+INSERT_COLUMNS = """
+    transaction_id, user_id, transaction_ts, product_id,
+    quantity, unit_price, total_amount, currency,
+    payment_method, status
+"""
+ROW_MARKERS = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def get_connection(autocommit: bool = True):
     """
     Returns a new ibm_db_dbi connection using the base utility function.
     By default, enables autocommit for stateless REST interactions.
     """
     conn = get_ibm_db2_connection(PARAM_NAME)
-    conn.autocommit = autocommit
+    set_session_autocommit(conn, autocommit)
     return conn
 
 
-async def initialize_table():
+def _current_schema(conn) -> str:
+    """
+    Returns the connection's CURRENT SCHEMA, read once per physical connection
+    by the session initializer in base.py instead of on every request.
+    """
+    return get_session_state(conn, "schema").upper()
+
+
+@offload(BACKEND)
+def initialize_table():
     """
     Ensures the connected user's schema exists, and creates the transaction_records table if it does not already exist.
     Designed to be idempotent and safe to run multiple times.
     """
-    conn = await get_connection(autocommit=False)
+    conn = get_connection(autocommit=False)
     try:
         with conn.cursor() as cursor:
-            cursor.execute("VALUES CURRENT SCHEMA")
-            schema = cursor.fetchone()[0].strip().upper()
+            schema = _current_schema(conn)
 
             cursor.execute("""
                 SELECT 1 FROM SYSCAT.SCHEMATA WHERE SCHEMANAME = ?
@@ -73,15 +122,24 @@ async def initialize_table():
         conn.close()
 
 
-async def load_sample_data():
+async def load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Inserts one random sample record into the transaction_records table.
+    Starts a background job inserting count random records through insert_transactions_batch(),
+    one commit per batch_size records, with up to parallelism batches in flight.
+    Progress, elapsed time and throughput are reported by get_load_sample_data_status().
     """
-    await insert_transaction(record=None)
-    return {"message": "1 sample record inserted successfully into IBM Db2."}
+    return await run_load_job(BACKEND, "IBM Db2", insert_transactions_batch, count, batch_size, parallelism, wait)
 
 
-async def insert_transaction(record: Optional[dict] = Body(None)):
+def get_load_sample_data_status():
+    """
+    Returns the progress of the current or most recent sample data load job.
+    """
+    return get_load_job(BACKEND)
+
+
+@offload(BACKEND)
+def insert_transaction(record: Optional[dict] = Body(None)):
     """
     Inserts a new transaction record into the table.
     Generates a random sample record if none is provided.
@@ -109,11 +167,10 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
 
     record["transaction_id"] = str(uuid.uuid4())
 
-    conn = await get_connection(autocommit=False)
+    conn = get_connection(autocommit=False)
     try:
         with conn.cursor() as cursor:
-            cursor.execute("VALUES CURRENT SCHEMA")
-            schema = cursor.fetchone()[0].strip().upper()
+            schema = _current_schema(conn)
 
             insert_sql = f"""
             INSERT INTO {schema}.{TABLE_NAME} (
@@ -124,7 +181,8 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
                 ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
             )
             """
-            cursor.execute(
+            execute_prepared(
+                conn, cursor, BACKEND,
                 insert_sql,
                 (
                     record["transaction_id"],
@@ -140,6 +198,7 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
                 )
             )
             conn.commit()
+        _key_index.add(record["transaction_id"])
 
         return {"message": "Record inserted successfully into IBM Db2.", "transaction_id": record["transaction_id"]}
     except Exception as e:
@@ -148,61 +207,267 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
         conn.close()
 
 
-async def select_transaction():
+def _to_bulk_row(record: dict) -> tuple:
+    return (
+        record["transaction_id"],
+        record["user_id"],
+        record["transaction_ts"],
+        record["product_id"],
+        record["quantity"],
+        record["unit_price"],
+        record["total_amount"],
+        record["currency"],
+        record["payment_method"],
+        record["status"]
+    )
+
+
+def _multirow_insert_sql(schema: str, rows: int) -> str:
+    return f"INSERT INTO {schema}.{TABLE_NAME} ({INSERT_COLUMNS}) VALUES " + ", ".join([ROW_MARKERS] * rows)
+
+
+def _check_bulk_method(method: Optional[str]) -> str:
+    method = method or DEFAULT_BULK_METHOD
+    if method not in BULK_METHODS:
+        raise ValueError(f"Unknown bulk method '{method}', expected one of {', '.join(BULK_METHODS)}.")
+    return method
+
+
+def _bulk_insert(rows, batch_size: Optional[int], method: str) -> dict:
     """
-    Retrieves a single transaction record from the table.
+    Writes rows (any iterable) in batches of batch_size rows, one commit per batch.
+    The schema is looked up once for the whole load rather than once per row, and
+    statement handles come from the connection's statement cache, so each INSERT
+    is prepared once per pooled connection instead of once per batch.
+    """
+    import ibm_db
+
+    conn = get_connection(autocommit=False)
+    try:
+        schema = _current_schema(conn)
+
+        if method == "multirow":
+            def write_batch(chunk):
+                for group in chunked(chunk, MULTIROW_ROWS):
+                    handle = prepare_ibmdb2(conn, BACKEND, _multirow_insert_sql(schema, len(group)))
+                    ibm_db.execute(handle, tuple(value for row in group for value in row))
+                conn.commit()
+        else:
+            handle = prepare_ibmdb2(conn, BACKEND, f"INSERT INTO {schema}.{TABLE_NAME} ({INSERT_COLUMNS}) VALUES {ROW_MARKERS}")
+
+            def write_batch(chunk):
+                # Array execution: the whole chunk is bound and sent in one call
+                ibm_db.execute_many(handle, tuple(chunk))
+                conn.commit()
+
+        result = run_batches(rows, batch_size or BATCH_SIZE, write_batch)
+        return {"method": method, **result}
+    finally:
+        conn.close()
+
+
+@offload(BACKEND)
+def insert_transactions_batch(records: list, commit_size: Optional[int] = None, method: Optional[str] = None):
+    """
+    Inserts a list of transaction records, committing once per commit_size rows
+    (default IBMDB2_BATCH_SIZE), using array execution or multi-row INSERT.
+    Returns the timing of every batch. Raises ValueError for an unknown method.
+    """
+    method = _check_bulk_method(method)
+    for record in records:
+        record["transaction_id"] = str(uuid.uuid4())
+
+    try:
+        result = _bulk_insert([_to_bulk_row(record) for record in records], commit_size, method)
+        _key_index.add_many(record["transaction_id"] for record in records)
+        return {"message": f"{len(records)} records inserted successfully into IBM Db2.", **result}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@offload(BACKEND)
+def bulk_load_sample_data(count: int, batch_size: Optional[int] = None, method: Optional[str] = None):
+    """
+    Inserts count generated records in batches of batch_size, one commit per batch.
+    Rows are generated one batch at a time, so memory does not grow with count.
+    Raises ValueError for an unknown method.
+    """
+    method = _check_bulk_method(method)
+    try:
+        rows = (_to_bulk_row(generate_sample_record()) for _ in range(count))
+        result = _bulk_insert(rows, batch_size, method)
+        return {"message": f"{count} sample records bulk loaded successfully into IBM Db2.", **result}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _first_transaction_id(cursor, schema: str):
+    """
+    Returns the transaction_id of the first row, or None when the table is empty.
     """
-    conn = await get_connection()
+    cursor.execute(f"SELECT transaction_id FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY")
+    row = cursor.fetchone()
+    return row[0] if row and row[0] else None
+
+
+def _update_first_transaction(cursor, schema: str, new_status: str):
+    """
+    Updates the first row and returns its transaction_id in a single
+    SELECT ... FROM FINAL TABLE (UPDATE ...) statement.
+    """
+    cursor.execute(f"""
+        SELECT transaction_id FROM FINAL TABLE (
+            UPDATE (SELECT * FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY) SET status = ?
+        )
+    """, (new_status,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _delete_first_transaction(cursor, schema: str):
+    """
+    Deletes the first row and returns its transaction_id in a single
+    SELECT ... FROM OLD TABLE (DELETE ...) statement.
+    """
+    cursor.execute(f"""
+        SELECT transaction_id FROM OLD TABLE (
+            DELETE FROM (SELECT * FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY)
+        )
+    """)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _claim_transaction_id(cursor, schema: str):
+    """
+    Locks and returns the first row no other transaction holds (SKIP LOCKED DATA).
+    """
+    cursor.execute(f"SELECT transaction_id FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY FOR UPDATE SKIP LOCKED DATA")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _claim_update(cursor, schema: str, new_status: str):
+    """
+    Claims an unlocked row and updates it by primary key in the same transaction.
+    """
+    transaction_id = _claim_transaction_id(cursor, schema)
+    if transaction_id is not None:
+        cursor.execute(f"UPDATE {schema}.{TABLE_NAME} SET status = ? WHERE transaction_id = ?", (new_status, transaction_id))
+    return transaction_id
+
+
+def _claim_delete(cursor, schema: str):
+    """
+    Claims an unlocked row and deletes it by primary key in the same transaction.
+    """
+    transaction_id = _claim_transaction_id(cursor, schema)
+    if transaction_id is not None:
+        cursor.execute(f"DELETE FROM {schema}.{TABLE_NAME} WHERE transaction_id = ?", (transaction_id,))
+    return transaction_id
+
+
+@offload(BACKEND)
+def scan_keys(limit: int) -> list:
+    """
+    Returns a uniform random sample of up to limit transaction_ids to rebuild the
+    key index, streamed from a full key scan so the sample is not the front of the table.
+    """
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute("VALUES CURRENT SCHEMA")
-            schema = cursor.fetchone()[0].strip().upper()
+            schema = _current_schema(conn)
 
-            select_sql = f"SELECT * FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY"
-            cursor.execute(select_sql)
-            row = cursor.fetchone()
+            cursor.execute(f"SELECT transaction_id FROM {schema}.{TABLE_NAME}")
+            return sample_keys(cursor, limit)
+    finally:
+        conn.close()
+
+
+@offload(BACKEND)
+def select_transaction(sampling: Optional[str] = None):
+    """
+    Retrieves a single transaction record from the table.
+    sampling chooses how the row is picked: 'index' (random key from the key index)
+    or one of SAMPLING_QUERIES; defaults to DB_SAMPLING_<BACKEND> / DB_SAMPLING.
+    """
+    strategy = resolve_sampling(BACKEND, sampling, SAMPLING_QUERIES)
+
+    key, record = _result_cache.lookup(_key_index, strategy)
+    if record is not None:
+        return {"record": record, "sampling": strategy, "cached": True}
+    version = _result_cache.version()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            schema = _current_schema(conn)
+
+            select_sql = f"SELECT * FROM {schema}.{TABLE_NAME} WHERE transaction_id = ?"
+            row = None
+            statement = cursor
+            if strategy == INDEX_STRATEGY:
+                for transaction_id in _key_index.candidates(lambda: _first_transaction_id(cursor, schema), key):
+                    statement = execute_prepared(conn, cursor, BACKEND, select_sql, (transaction_id,))
+                    row = statement.fetchone()
+                    if row:
+                        break
+            else:
+                row = sample_row(cursor, SAMPLING_QUERIES, strategy, f"{schema}.{TABLE_NAME}")
 
             if not row:
                 return {"message": "No records found in the IBM Db2 table."}
 
-            columns = [column[0].lower() for column in cursor.description]
+            columns = [column[0].lower() for column in statement.description]
             result = dict(zip(columns, row))
 
-            return {"record": result}
+            _result_cache.put(result["transaction_id"], result, version)
+            return {"record": result, "sampling": strategy}
     except Exception as e:
         return {"error": str(e)}
     finally:
         conn.close()
 
 
-async def update_random_transaction_status():
+@offload(BACKEND)
+def update_random_transaction_status(claim: Optional[str] = None):
     """
     Updates the 'status' field of one transaction record in IBM Db2.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
+    mode = resolve_claim_mode(BACKEND, claim)
     statuses = ["Completed", "Pending", "Failed", "Refunded"]
     new_status = random.choice(statuses)
 
-    conn = await get_connection(autocommit=False)
+    conn = get_connection(autocommit=False)
     try:
         with conn.cursor() as cursor:
-            cursor.execute("VALUES CURRENT SCHEMA")
-            schema = cursor.fetchone()[0].strip().upper()
-
-            cursor.execute(f"SELECT transaction_id FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY")
-            row = cursor.fetchone()
-
-            if not row or not row[0]:
-                return {"message": "No records found to update in the IBM Db2 table."}
-
-            transaction_id = row[0]
+            schema = _current_schema(conn)
 
             update_sql = f"""
             UPDATE {schema}.{TABLE_NAME}
             SET status = ?
             WHERE transaction_id = ?
             """
-            cursor.execute(update_sql, (new_status, transaction_id))
+
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_update(cursor, schema, new_status)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, update_sql, (new_status, candidate)).rowcount:
+                        transaction_id = candidate
+                        break
+
+                if transaction_id is None:
+                    # No live indexed key: update the first row and get its key back in the same statement
+                    transaction_id = _update_first_transaction(cursor, schema, new_status)
+
+            if transaction_id is None:
+                return {"message": "No records found to update in the IBM Db2 table."}
+
             conn.commit()
+            _result_cache.invalidate(transaction_id)
 
         return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in IBM Db2."}
     except Exception as e:
@@ -211,27 +476,39 @@ async def update_random_transaction_status():
         conn.close()
 
 
-async def delete_random_transaction():
+@offload(BACKEND)
+def delete_random_transaction(claim: Optional[str] = None):
     """
     Deletes one transaction record from the IBM Db2 table.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
-    conn = await get_connection(autocommit=False)
+    mode = resolve_claim_mode(BACKEND, claim)
+    conn = get_connection(autocommit=False)
     try:
         with conn.cursor() as cursor:
-            cursor.execute("VALUES CURRENT SCHEMA")
-            schema = cursor.fetchone()[0].strip().upper()
+            schema = _current_schema(conn)
 
-            cursor.execute(f"SELECT transaction_id FROM {schema}.{TABLE_NAME} FETCH FIRST 1 ROW ONLY")
-            row = cursor.fetchone()
+            delete_sql = f"DELETE FROM {schema}.{TABLE_NAME} WHERE transaction_id = ?"
 
-            if not row or not row[0]:
-                return {"message": "No records found to delete in the IBM Db2 table."}
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_delete(cursor, schema)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, delete_sql, (candidate,)).rowcount:
+                        transaction_id = candidate
+                        break
 
-            transaction_id = row[0]
+                if transaction_id is None:
+                    # No live indexed key: delete the first row and get its key back in the same statement
+                    transaction_id = _delete_first_transaction(cursor, schema)
+
+            if transaction_id is None:
+                return {"message": "No records found to delete in the IBM Db2 table."}
 
-            delete_sql = f"DELETE FROM {schema}.{TABLE_NAME} WHERE transaction_id = ?"
-            cursor.execute(delete_sql, (transaction_id,))
             conn.commit()
+        _key_index.discard(transaction_id)
+        _result_cache.invalidate(transaction_id)
 
         return {"message": f"Deleted transaction with ID {transaction_id} from IBM Db2."}
     except Exception as e:
@@ -0,0 +1,351 @@
+# key_index.py
+# Theodor Harmse - University of Liverpool
+# In-process transaction_id index per backend, so random operations look up uniformly random primary keys
+
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+
+from api_service.db.registry import add_load_listener, get_enabled_backends, get_service, is_loaded
+
+# Set DB_KEY_INDEX=0 to fall back to the first-row lookups
+KEY_INDEX_ENABLED = os.environ.get("DB_KEY_INDEX", "1") != "0"
+
+# Maximum keys held per backend (16 bytes each)
+KEY_INDEX_CAPACITY = int(os.environ.get("DB_KEY_INDEX_CAPACITY", "1000000"))
+
+# Seconds between background key scans. A scan streams the whole table through
+# every worker process, which competes with benchmark traffic, so by default
+# keys are scanned once at startup only; set a positive value to rescan
+KEY_INDEX_REFRESH_SECONDS = float(os.environ.get("DB_KEY_INDEX_REFRESH_SECONDS", "0"))
+
+# Each worker waits a random 0..N seconds before scanning, so workers do not scan together
+KEY_INDEX_STAGGER_SECONDS = float(os.environ.get("DB_KEY_INDEX_STAGGER_SECONDS", "10"))
+
+# Rows fetched per round trip while streaming a key scan
+KEY_SCAN_BATCH_SIZE = int(os.environ.get("DB_KEY_SCAN_BATCH_SIZE", "10000"))
+
+_UUID_BYTES = 16
+
+# Slots of the most recently drawn keys, so discard() can tell whether a key is in the array
+_DRAWN_TRACKED = 4096
+
+
+class KeyIndex:
+    """
+    Compact array of 16-byte transaction_ids. Inserts append, deletes leave a
+    tombstone that is compacted away once tombstones reach a quarter of the
+    array, and a key scan replaces the whole array. When full, a new key
+    replaces a random slot, so the index stays a uniform sample of the table.
+    Keys added or discarded while a scan runs (between begin_scan() and
+    replace()) are merged into the scanned keys, since the scan may have missed them.
+    """
+
+    def __init__(self, capacity: int = KEY_INDEX_CAPACITY):
+        self._capacity = max(1, capacity)
+        self._keys = bytearray()
+        self._deleted = set()
+        self._drawn = OrderedDict()
+        # Keys added and discarded since begin_scan(), or None when no scan is running
+        self._added_since_scan = None
+        self._discarded_since_scan = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.scanned_at = None
+        self.scan_seconds = None
+
+    def __len__(self):
+        return len(self._keys) // _UUID_BYTES - len(self._deleted)
+
+    def _append(self, key: bytes):
+        if len(self._keys) < self._capacity * _UUID_BYTES:
+            self._keys += key
+        else:
+            slot = random.randrange(self._capacity) * _UUID_BYTES
+            self._deleted.discard(bytes(self._keys[slot:slot + _UUID_BYTES]))
+            self._keys[slot:slot + _UUID_BYTES] = key
+
+    def _compact(self):
+        # Drawn keys move to their new slots, so they can still be discarded after compaction
+        drawn = {offset: key for key, offset in self._drawn.items()}
+        keys = bytearray()
+        for offset in range(0, len(self._keys), _UUID_BYTES):
+            key = bytes(self._keys[offset:offset + _UUID_BYTES])
+            if key in self._deleted:
+                if drawn.get(offset) == key:
+                    del self._drawn[key]
+                continue
+            if drawn.get(offset) == key:
+                self._drawn[key] = len(keys)
+            keys += key
+        self._keys = keys
+        self._deleted.clear()
+
+    def add(self, transaction_id):
+        self.add_many((transaction_id,))
+
+    def add_many(self, transaction_ids):
+        keys = [uuid.UUID(str(transaction_id)).bytes for transaction_id in transaction_ids]
+        with self._lock:
+            for key in keys:
+                self._append(key)
+            if self._added_since_scan is not None:
+                self._added_since_scan.update(keys)
+
+    def discard(self, transaction_id):
+        """
+        Tombstones transaction_id when it was drawn from the index and is still in
+        its slot. Keys that were never indexed (e.g. first-row fallbacks) are ignored.
+        """
+        key = uuid.UUID(str(transaction_id)).bytes
+        with self._lock:
+            if self._discarded_since_scan is not None:
+                self._added_since_scan.discard(key)
+                self._discarded_since_scan.add(key)
+            offset = self._drawn.pop(key, None)
+            if offset is None or key in self._deleted or self._keys[offset:offset + _UUID_BYTES] != key:
+                return
+            self._deleted.add(key)
+            if len(self._deleted) * 4 >= len(self._keys) // _UUID_BYTES:
+                self._compact()
+
+    def begin_scan(self):
+        """
+        Starts tracking keys added and discarded until the next replace() or end_scan().
+        """
+        with self._lock:
+            self._added_since_scan = set()
+            self._discarded_since_scan = set()
+
+    def end_scan(self):
+        """
+        Stops tracking keys for a scan that failed, leaving the index as it is.
+        """
+        with self._lock:
+            self._added_since_scan = self._discarded_since_scan = None
+
+    def replace(self, transaction_ids):
+        """
+        Replaces the index contents with the keys from a full key scan, plus the keys
+        added since begin_scan() and minus the keys discarded since then.
+        """
+        scanned = [uuid.UUID(str(transaction_id)).bytes for transaction_id in transaction_ids]
+        with self._lock:
+            added = self._added_since_scan or set()
+            skipped = added | (self._discarded_since_scan or set())
+            keys = bytearray()
+            for key in scanned:
+                if len(keys) >= self._capacity * _UUID_BYTES:
+                    break
+                if key not in skipped:
+                    keys += key
+            self._keys = keys
+            self._deleted.clear()
+            self._drawn.clear()
+            for key in added:
+                self._append(key)
+            self._added_since_scan = self._discarded_since_scan = None
+
+    def random_key(self):
+        """
+        Returns a uniformly random live transaction_id as a string, or None when empty.
+        """
+        with self._lock:
+            slots = len(self._keys) // _UUID_BYTES
+            # Tombstones are at most a quarter of the slots, so a few draws are enough
+            for _ in range(8):
+                if slots == 0 or len(self._deleted) >= slots:
+                    break
+                offset = random.randrange(slots) * _UUID_BYTES
+                key = bytes(self._keys[offset:offset + _UUID_BYTES])
+                if key not in self._deleted:
+                    self._drawn[key] = offset
+                    if len(self._drawn) > _DRAWN_TRACKED:
+                        self._drawn.popitem(last=False)
+                    self.hits += 1
+                    return str(uuid.UUID(bytes=key))
+            self.misses += 1
+            return None
+
+    def candidates(self, first_transaction_id=None, key=None):
+        """
+        Yields a random indexed transaction_id (or key, when the caller already
+        drew one), then the id returned by first_transaction_id() (when given) as
+        a fallback. A caller that resumes the generator found no row for the
+        indexed key, so it is pruned.
+        """
+        if KEY_INDEX_ENABLED:
+            transaction_id = key if key is not None else self.random_key()
+            if transaction_id is not None:
+                yield transaction_id
+                self.discard(transaction_id)
+        if first_transaction_id is None:
+            return
+        transaction_id = first_transaction_id()
+        if transaction_id is not None:
+            yield transaction_id
+
+    async def acandidates(self, first_transaction_id=None, key=None):
+        """
+        Async form of candidates() for the asyncio services; first_transaction_id is a coroutine function.
+        """
+        if KEY_INDEX_ENABLED:
+            transaction_id = key if key is not None else self.random_key()
+            if transaction_id is not None:
+                yield transaction_id
+                self.discard(transaction_id)
+        if first_transaction_id is None:
+            return
+        transaction_id = await first_transaction_id()
+        if transaction_id is not None:
+            yield transaction_id
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self),
+            "capacity": self._capacity,
+            "memory_bytes": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "scanned_at": self.scanned_at,
+            "scan_seconds": self.scan_seconds
+        }
+
+
+def reservoir_sample(values, limit: int) -> list:
+    """
+    Returns up to limit values chosen uniformly at random from an iterable of any
+    length in one pass, so every value is equally likely to be kept regardless
+    of its position in the table.
+    """
+    limit = max(0, int(limit))
+    sample = []
+    for seen, value in enumerate(values, 1):
+        if len(sample) < limit:
+            sample.append(value)
+        else:
+            slot = random.randrange(seen)
+            if slot < limit:
+                sample[slot] = value
+    return sample
+
+
+def _fetch_column(cursor, batch_size: int):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield row[0]
+
+
+def sample_keys(cursor, limit: int, batch_size: int = KEY_SCAN_BATCH_SIZE) -> list:
+    """
+    Reservoir-samples up to limit first-column values from a cursor over a full
+    key scan, fetching batch_size rows at a time.
+    """
+    return reservoir_sample(_fetch_column(cursor, batch_size), limit)
+
+
+_indexes = {}
+_indexes_lock = Lock()
+_refresh_report = {}
+
+# Event loop of the refresher, which runs the first scan of backends imported later
+_loop = None
+_scans = set()
+
+
+def get_key_index(backend: str) -> KeyIndex:
+    index = _indexes.get(backend)
+    if index is not None:
+        return index
+    with _indexes_lock:
+        if backend not in _indexes:
+            _indexes[backend] = KeyIndex()
+        return _indexes[backend]
+
+
+async def _refresh_backend(backend: str) -> dict:
+    start = time.perf_counter()
+    try:
+        service = get_service(backend)
+        index = get_key_index(backend)
+        index.begin_scan()
+        try:
+            keys = await service.scan_keys(KEY_INDEX_CAPACITY)
+        except BaseException:
+            index.end_scan()
+            raise
+        index.replace(keys)
+        index.scanned_at = time.time()
+        index.scan_seconds = round(time.perf_counter() - start, 3)
+        return {"keys": len(index), "seconds": index.scan_seconds}
+    except Exception as e:
+        return {"keys": 0, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+
+
+async def _refresh_loaded_backend(backend: str):
+    _refresh_report[backend] = await _refresh_backend(backend)
+
+
+def _on_backend_loaded(backend: str):
+    # Runs in the importing thread: schedules the backend's first key scan on the event loop
+    loop = _loop
+    if loop is None or loop.is_closed():
+        return
+
+    def start():
+        task = loop.create_task(_refresh_loaded_backend(backend))
+        _scans.add(task)
+        task.add_done_callback(_scans.discard)
+
+    loop.call_soon_threadsafe(start)
+
+
+add_load_listener(_on_backend_loaded)
+
+
+async def refresh_key_indexes() -> dict:
+    """
+    Rebuilds the key index of every enabled backend that is already imported,
+    in parallel across backends. Backends imported later are scanned when they load.
+    """
+    global _refresh_report
+    backends = tuple(backend for backend in get_enabled_backends() if is_loaded(backend))
+    results = await asyncio.gather(*(_refresh_backend(backend) for backend in backends))
+    _refresh_report = {**_refresh_report, **dict(zip(backends, results))}
+    return _refresh_report
+
+
+async def run_key_index_refresher():
+    """
+    Background task: after a random stagger, scans the backends imported so far
+    (backends imported later are scanned as they load), then rescans every
+    KEY_INDEX_REFRESH_SECONDS when that is positive.
+    """
+    global _loop
+    if not KEY_INDEX_ENABLED:
+        return
+    await asyncio.sleep(random.uniform(0, max(0.0, KEY_INDEX_STAGGER_SECONDS)))
+    _loop = asyncio.get_running_loop()
+    while True:
+        await refresh_key_indexes()
+        if KEY_INDEX_REFRESH_SECONDS <= 0:
+            return
+        await asyncio.sleep(KEY_INDEX_REFRESH_SECONDS)
+
+
+def get_key_index_report() -> dict:
+    return {
+        "enabled": KEY_INDEX_ENABLED,
+        "refresh_seconds": KEY_INDEX_REFRESH_SECONDS,
+        "stagger_seconds": KEY_INDEX_STAGGER_SECONDS,
+        "backends": {backend: index.stats() for backend, index in _indexes.items()},
+        "last_refresh": _refresh_report
+    }
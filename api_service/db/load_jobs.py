@@ -0,0 +1,94 @@
+# load_jobs.py
+# Theodor Harmse - University of Liverpool
+# Background sample-data load jobs: count records in batches, several batches in flight, tracked per backend
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from api_service.db.sample_data import generate_sample_record
+
+# Records per batch (and commit) when the request does not set batch_size
+DEFAULT_LOAD_BATCH_SIZE = int(os.environ.get("DB_LOAD_BATCH_SIZE", "500"))
+
+# Upper bound on batches in flight for one job
+MAX_LOAD_PARALLELISM = int(os.environ.get("DB_LOAD_MAX_PARALLELISM", "32"))
+
+# backend -> progress of its current or most recent job, and the task running it
+_jobs = {}
+_tasks = {}
+
+
+def get_load_job(backend: str) -> dict:
+    """
+    Returns the progress of the current or most recent load job for a backend.
+    """
+    return dict(_jobs.get(backend, {})) or {"status": "idle"}
+
+
+async def _run_job(job: dict, write_batch):
+    remaining = job["count"]
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal remaining
+        # Workers share one event loop, so claiming a batch needs no lock
+        while remaining > 0 and job["status"] == "running":
+            size = min(job["batch_size"], remaining)
+            remaining -= size
+            result = await write_batch([generate_sample_record() for _ in range(size)], size)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+
+            elapsed = time.perf_counter() - start
+            job["loaded"] += result.get("inserted", size)
+            job["batches"] += 1
+            job["seconds"] = round(elapsed, 3)
+            job["rows_per_second"] = round(job["loaded"] / elapsed, 2) if elapsed > 0 else None
+
+    try:
+        # A failing worker cancels the others, so no batch is started after the job has failed
+        async with asyncio.TaskGroup() as workers:
+            for _ in range(job["parallelism"]):
+                workers.create_task(worker())
+        job["status"] = "completed"
+    except* Exception as group:
+        job.update({"status": "failed", "error": str(group.exceptions[0])})
+    finally:
+        elapsed = time.perf_counter() - start
+        job["seconds"] = round(elapsed, 3)
+        job["rows_per_second"] = round(job["loaded"] / elapsed, 2) if elapsed > 0 else None
+        job["finished_at"] = datetime.utcnow().isoformat()
+
+
+async def run_load_job(backend: str, label: str, write_batch, count: int, batch_size: int = None,
+                       parallelism: int = 1, wait: bool = False) -> dict:
+    """
+    Starts a background job inserting count generated records through
+    write_batch(records, commit_size), one commit per batch of batch_size records,
+    with up to parallelism batches in flight. Only one job runs per backend.
+    Returns the job immediately, or its final report when wait is set.
+    """
+    if _jobs.get(backend, {}).get("status") == "running":
+        return {"message": f"A sample data load is already running for {label}.", **get_load_job(backend)}
+
+    job = {
+        "status": "running",
+        "count": max(0, count),
+        "batch_size": max(1, batch_size or DEFAULT_LOAD_BATCH_SIZE),
+        "parallelism": min(max(1, parallelism), MAX_LOAD_PARALLELISM),
+        "loaded": 0,
+        "batches": 0,
+        "seconds": 0.0,
+        "rows_per_second": None,
+        "started_at": datetime.utcnow().isoformat()
+    }
+    _jobs[backend] = job
+    _tasks[backend] = asyncio.create_task(_run_job(job, write_batch))
+
+    if wait:
+        # A client disconnect cancels this request only, never the job itself
+        await asyncio.shield(_tasks[backend])
+        return {"message": f"{job['loaded']} sample records loaded into {label}.", **get_load_job(backend)}
+    return {"message": f"Loading {job['count']} sample records into {label} in the background.", **get_load_job(backend)}
@@ -6,12 +6,36 @@ import uuid
 import random
 from typing import Optional
 from fastapi import Body
+from pymysql.cursors import SSCursor
 from datetime import datetime, timedelta
-from api_service.db.base import get_mariadb_connection
+from api_service.db.batching import run_batches
+from api_service.db.key_index import get_key_index, sample_keys
+from api_service.db.result_cache import get_result_cache
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.load_jobs import get_load_job, run_load_job
+from api_service.db.sampling import INDEX_STRATEGY, resolve_sampling, sample_row
+from api_service.db.executor import offload
+from api_service.db.base import get_mariadb_connection, get_mariadb_async_engine, use_async_engine
+from api_service.db.mysql_async import AsyncMySQLService
 
 # Parameter Store name for MariaDB credentials
 PARAM_NAME = "/Liverpool/RDS/MariaDB/Credentials"
 
+# Backend key for the dedicated thread pool
+BACKEND = "mariadb"
+
+# Random transaction_ids for point lookups, filled from inserts and key scans
+_key_index = get_key_index(BACKEND)
+
+# Optional read-through cache of select-random records (DB_RESULT_CACHE=1)
+_result_cache = get_result_cache(BACKEND)
+
+# Database-side select-random strategies ('seek' range-seeks from a random UUID)
+SAMPLING_QUERIES = {
+    "first": "SELECT * FROM {table} LIMIT 1",
+    "seek": "SELECT * FROM {table} WHERE transaction_id >= %s ORDER BY transaction_id LIMIT 1"
+}
+
 # Table name
 TABLE_NAME = "transaction_records"
 
@@ -31,17 +55,18 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
 );
 """
 
-async def get_connection():
+def get_connection():
     """
     Returns a new PyMySQL connection to MariaDB using the shared base utility.
     """
     return get_mariadb_connection(PARAM_NAME)
 
-async def initialize_table():
+@offload(BACKEND)
+def initialize_table():
     """
     Creates the transaction_records table in MariaDB if it does not exist.
     """
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute(CREATE_TABLE_SQL)
@@ -50,15 +75,22 @@ async def initialize_table():
     finally:
         conn.close()
 
-async def load_sample_data():
+async def load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Inserts 1 random sample record into the transaction_records table.
+    Starts a background job inserting count random records through insert_transactions_batch(),
+    one commit per batch_size records, with up to parallelism batches in flight.
+    Progress, elapsed time and throughput are reported by get_load_sample_data_status().
     """
-    for _ in range(1):
-        await insert_transaction(record=None)
-    return {"message": "1 sample record inserted successfully into MariaDB."}
+    return await run_load_job(BACKEND, "MariaDB", insert_transactions_batch, count, batch_size, parallelism, wait)
 
-async def insert_transaction(record: Optional[dict] = Body(None)):
+def get_load_sample_data_status():
+    """
+    Returns the progress of the current or most recent sample data load job.
+    """
+    return get_load_job(BACKEND)
+
+@offload(BACKEND)
+def insert_transaction(record: Optional[dict] = Body(None)):
     """
     Inserts a new transaction record into the MariaDB table.
     Generates a random sample record if none is provided.
@@ -98,11 +130,12 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     )
     """
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute(insert_sql, record)
         conn.commit()
+        _key_index.add(record["transaction_id"])
         return {
             "message": "Record inserted successfully into MariaDB.",
             "record": {k.lower(): v for k, v in record.items()}
@@ -110,18 +143,127 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     finally:
         conn.close()
 
-async def select_transaction():
+@offload(BACKEND)
+def insert_transactions_batch(records: list, commit_size: Optional[int] = None):
+    """
+    Inserts a list of transaction records, committing once per commit_size rows.
+    pymysql's executemany rewrites each chunk into one multi-row INSERT ... VALUES statement.
+    Returns the timing of every batch.
+    """
+    for record in records:
+        record["transaction_id"] = str(uuid.uuid4())
+
+    insert_sql = f"""
+    INSERT INTO {TABLE_NAME} (
+        transaction_id, user_id, transaction_ts, product_id,
+        quantity, unit_price, total_amount, currency,
+        payment_method, status
+    ) VALUES (
+        %(transaction_id)s, %(user_id)s, %(transaction_ts)s, %(product_id)s,
+        %(quantity)s, %(unit_price)s, %(total_amount)s, %(currency)s,
+        %(payment_method)s, %(status)s
+    )
+    """
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            def write_batch(chunk):
+                cursor.executemany(insert_sql, chunk)
+                conn.commit()
+
+            result = run_batches(records, commit_size, write_batch)
+        _key_index.add_many(record["transaction_id"] for record in records)
+        return {"message": f"{len(records)} records inserted successfully into MariaDB.", **result}
+    finally:
+        conn.close()
+
+def _first_transaction_id(cursor):
+    """
+    Returns the transaction_id of the first row, or None when the table is empty.
+    """
+    cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _delete_first_transaction(cursor):
+    """
+    Deletes the first row and returns its transaction_id in a single DELETE ... RETURNING.
+    """
+    cursor.execute(f"DELETE FROM {TABLE_NAME} LIMIT 1 RETURNING transaction_id")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_transaction_id(cursor):
+    """
+    Locks and returns the first row no other transaction holds (FOR UPDATE SKIP LOCKED, MariaDB 10.6+).
+    """
+    cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1 FOR UPDATE SKIP LOCKED")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_update(cursor, new_status: str):
+    """
+    Claims an unlocked row and updates it by primary key in the same transaction.
+    """
+    transaction_id = _claim_transaction_id(cursor)
+    if transaction_id is not None:
+        cursor.execute(f"UPDATE {TABLE_NAME} SET status = %s WHERE transaction_id = %s", (new_status, transaction_id))
+    return transaction_id
+
+def _claim_delete(cursor):
+    """
+    Claims an unlocked row and deletes it by primary key in the same transaction.
+    """
+    transaction_id = _claim_transaction_id(cursor)
+    if transaction_id is not None:
+        cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE transaction_id = %s", (transaction_id,))
+    return transaction_id
+
+@offload(BACKEND)
+def scan_keys(limit: int) -> list:
+    """
+    Returns a uniform random sample of up to limit transaction_ids to rebuild the
+    key index, streamed from a full key scan so the sample is not the front of the table.
+    """
+    conn = get_connection()
+    try:
+        # Unbuffered cursor, so rows arrive as they are read instead of all at once
+        with conn.cursor(SSCursor) as cursor:
+            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME}")
+            return sample_keys(cursor, limit)
+    finally:
+        conn.close()
+
+@offload(BACKEND)
+def select_transaction(sampling: Optional[str] = None):
     """
     Retrieves a single random transaction record from the MariaDB table.
     Returns JSON with column names as keys (lowercase).
+    sampling chooses how the row is picked: 'index' (random key from the key index)
+    or one of SAMPLING_QUERIES; defaults to DB_SAMPLING_<BACKEND> / DB_SAMPLING.
     """
-    select_sql = f"SELECT * FROM {TABLE_NAME} LIMIT 1"
+    strategy = resolve_sampling(BACKEND, sampling, SAMPLING_QUERIES)
 
-    conn = await get_connection()
+    key, record = _result_cache.lookup(_key_index, strategy)
+    if record is not None:
+        return {"record": record, "sampling": strategy, "cached": True}
+    version = _result_cache.version()
+
+    select_sql = f"SELECT * FROM {TABLE_NAME} WHERE transaction_id = %s"
+
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(select_sql)
-            row = cursor.fetchone()
+            row = None
+            if strategy == INDEX_STRATEGY:
+                for transaction_id in _key_index.candidates(lambda: _first_transaction_id(cursor), key):
+                    cursor.execute(select_sql, (transaction_id,))
+                    row = cursor.fetchone()
+                    if row:
+                        break
+            else:
+                row = sample_row(cursor, SAMPLING_QUERIES, strategy, TABLE_NAME)
 
             if not row:
                 return {"message": "No records found in the MariaDB table."}
@@ -129,65 +271,98 @@ async def select_transaction():
             columns = [col[0] for col in cursor.description]
             result = {col.lower(): val for col, val in zip(columns, row)}
 
-            return {"record": result}
+            _result_cache.put(result["transaction_id"], result, version)
+            return {"record": result, "sampling": strategy}
     finally:
         conn.close()
 
-async def update_random_transaction_status():
+@offload(BACKEND)
+def update_random_transaction_status(claim: Optional[str] = None):
     """
     Updates the 'status' field of one random transaction record in MariaDB.
     Selects a new random status from predefined options.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
+    mode = resolve_claim_mode(BACKEND, claim)
     statuses = ["Completed", "Pending", "Failed", "Refunded"]
     new_status = random.choice(statuses)
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1")
-            row = cursor.fetchone()
-
-            if not row:
-                return {"message": "No records found to update in the MariaDB table."}
-
-            columns = [col[0] for col in cursor.description]
-            result = {col.lower(): val for col, val in zip(columns, row)}
-            transaction_id = result["transaction_id"]
-
             update_sql = f"""
             UPDATE {TABLE_NAME}
             SET status = %s
             WHERE transaction_id = %s
             """
-            cursor.execute(update_sql, (new_status, transaction_id))
+
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_update(cursor, new_status)
+            else:
+                for candidate in _key_index.candidates():
+                    cursor.execute(update_sql, (new_status, candidate))
+                    if cursor.rowcount:
+                        transaction_id = candidate
+                        break
+
+                if transaction_id is None:
+                    # No live indexed key: there is no UPDATE ... RETURNING, so claim
+                    # an unlocked row and update it by primary key (two round trips)
+                    transaction_id = _claim_update(cursor, new_status)
+
+            if transaction_id is None:
+                return {"message": "No records found to update in the MariaDB table."}
 
         conn.commit()
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in MariaDB."}
     finally:
         conn.close()
 
-async def delete_random_transaction():
+@offload(BACKEND)
+def delete_random_transaction(claim: Optional[str] = None):
     """
     Deletes one random transaction record from the MariaDB table.
     No parameters required.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
-    conn = await get_connection()
+    mode = resolve_claim_mode(BACKEND, claim)
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1")
-            row = cursor.fetchone()
+            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = %s"
 
-            if not row:
-                return {"message": "No records found to delete in the MariaDB table."}
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_delete(cursor)
+            else:
+                for candidate in _key_index.candidates():
+                    cursor.execute(delete_sql, (candidate,))
+                    if cursor.rowcount:
+                        transaction_id = candidate
+                        break
 
-            columns = [col[0] for col in cursor.description]
-            result = {col.lower(): val for col, val in zip(columns, row)}
-            transaction_id = result["transaction_id"]
+                if transaction_id is None:
+                    # No live indexed key: delete the first row and get its key back in the same statement
+                    transaction_id = _delete_first_transaction(cursor)
 
-            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = %s"
-            cursor.execute(delete_sql, (transaction_id,))
+            if transaction_id is None:
+                return {"message": "No records found to delete in the MariaDB table."}
 
         conn.commit()
+        _key_index.discard(transaction_id)
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Deleted transaction with ID {transaction_id} from MariaDB."}
     finally:
         conn.close()
+
+# Native asyncio engine mode (DB_ENGINE_MODE_MARIADB=async):
+# replace the thread-pool implementations with aiomysql-backed coroutines.
+if use_async_engine(BACKEND):
+    _async_service = AsyncMySQLService(get_mariadb_async_engine, PARAM_NAME, TABLE_NAME, CREATE_TABLE_SQL, "MariaDB", BACKEND)
+    initialize_table = _async_service.initialize_table
+    insert_transaction = _async_service.insert_transaction
+    select_transaction = _async_service.select_transaction
+    update_random_transaction_status = _async_service.update_random_transaction_status
+    delete_random_transaction = _async_service.delete_random_transaction
@@ -2,12 +2,22 @@
 # Theodor Harmse - University of Liverpool
 # Implementation of Microsoft SQL Server database operations for transaction_records table
 
+import os
 import uuid
 import random
 import json
 from typing import Optional
 from fastapi import Body
 from datetime import datetime, timedelta
+from api_service.db.batching import run_batches
+from api_service.db.sample_data import generate_sample_record
+from api_service.db.key_index import get_key_index, sample_keys
+from api_service.db.result_cache import get_result_cache
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.load_jobs import get_load_job, run_load_job
+from api_service.db.statement_cache import execute_prepared
+from api_service.db.sampling import INDEX_STRATEGY, resolve_sampling, sample_row
+from api_service.db.executor import offload
 from api_service.db.base import (
     get_mssqlserver_connection,
     get_mssqlserver_master_connection,
@@ -17,6 +27,22 @@ from api_service.db.base import (
 # Parameter Store name for SQL Server credentials
 PARAM_NAME = "/Liverpool/RDS/MSSQLServer/Credentials"
 
+# Backend key for the dedicated thread pool
+BACKEND = "mssql"
+
+# Random transaction_ids for point lookups, filled from inserts and key scans
+_key_index = get_key_index(BACKEND)
+
+# Optional read-through cache of select-random records (DB_RESULT_CACHE=1)
+_result_cache = get_result_cache(BACKEND)
+
+# Database-side select-random strategies ('seek' range-seeks from a random UUID)
+SAMPLING_QUERIES = {
+    "first": "SELECT TOP 1 * FROM {table}",
+    "seek": "SELECT TOP 1 * FROM {table} WHERE transaction_id >= ? ORDER BY transaction_id",
+    "system": "SELECT TOP 1 * FROM {table} TABLESAMPLE SYSTEM ({percent} PERCENT)"
+}
+
 # Table name
 TABLE_NAME = "transaction_records"
 
@@ -39,13 +65,68 @@ BEGIN
 END
 """
 
-async def get_connection():
+# Bulk insert strategies: 'fast_executemany' (pyodbc parameter arrays) or 'tvp' (table-valued parameter)
+BULK_STRATEGIES = ("fast_executemany", "tvp")
+DEFAULT_BULK_STRATEGY = os.environ.get("MSSQL_BULK_STRATEGY", "fast_executemany")
+
+BULK_INSERT_SQL = f"""
+INSERT INTO {TABLE_NAME} (
+    transaction_id, user_id, transaction_ts, product_id,
+    quantity, unit_price, total_amount, currency,
+    payment_method, status
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+)
+"""
+
+# Table type and procedure used by the TVP strategy: a whole chunk is one parameter
+TVP_TYPE_NAME = "transaction_records_tvp"
+TVP_PROCEDURE_NAME = "insert_transaction_records_tvp"
+
+CREATE_TVP_TYPE_SQL = f"""
+IF TYPE_ID(N'dbo.{TVP_TYPE_NAME}') IS NULL
+    CREATE TYPE dbo.{TVP_TYPE_NAME} AS TABLE (
+        transaction_id UNIQUEIDENTIFIER,
+        user_id NVARCHAR(36),
+        transaction_ts DATETIME,
+        product_id NVARCHAR(36),
+        quantity INT,
+        unit_price DECIMAL(10,2),
+        total_amount DECIMAL(12,2),
+        currency NVARCHAR(3),
+        payment_method NVARCHAR(20),
+        status NVARCHAR(20)
+    )
+"""
+
+CREATE_TVP_PROCEDURE_SQL = f"""
+CREATE OR ALTER PROCEDURE dbo.{TVP_PROCEDURE_NAME} @rows dbo.{TVP_TYPE_NAME} READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    INSERT INTO {TABLE_NAME} (
+        transaction_id, user_id, transaction_ts, product_id,
+        quantity, unit_price, total_amount, currency,
+        payment_method, status
+    )
+    SELECT
+        transaction_id, user_id, transaction_ts, product_id,
+        quantity, unit_price, total_amount, currency,
+        payment_method, status
+    FROM @rows
+END
+"""
+
+_tvp_objects_created = False
+
+def get_connection():
     """
     Returns a new pyodbc connection using the base utility function.
     """
     return get_mssqlserver_connection(PARAM_NAME)
 
-async def initialize_table():
+@offload(BACKEND)
+def initialize_table():
     """
     Creates the database if it does not exist, then creates the transaction_records table in SQL Server if it does not exist.
     """
@@ -63,24 +144,32 @@ async def initialize_table():
         master_conn.close()
 
     # connect to the target database to create the table if needed
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute(CREATE_TABLE_SQL)
+            _create_tvp_objects(cursor)
         conn.commit()
         return {"message": f"Database '{database_name}' and table '{TABLE_NAME}' initialized successfully in SQL Server."}
     finally:
         conn.close()
 
-async def load_sample_data():
+async def load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Starts a background job inserting count random records through insert_transactions_batch(),
+    one commit per batch_size records, with up to parallelism batches in flight.
+    Progress, elapsed time and throughput are reported by get_load_sample_data_status().
+    """
+    return await run_load_job(BACKEND, "SQL Server", insert_transactions_batch, count, batch_size, parallelism, wait)
+
+def get_load_sample_data_status():
     """
-    Calls insert_transaction() to insert 1 random record.
+    Returns the progress of the current or most recent sample data load job.
     """
-    for _ in range(1):
-        await insert_transaction(record=None)
-    return {"message": "1 sample record inserted successfully into SQL Server."}
+    return get_load_job(BACKEND)
 
-async def insert_transaction(record: Optional[dict] = Body(None)):
+@offload(BACKEND)
+def insert_transaction(record: Optional[dict] = Body(None)):
     """
     Inserts a new transaction record into the table.
     If no record is provided, generates a new random sample record.
@@ -119,10 +208,11 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     )
     """
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(
+            execute_prepared(
+                conn, cursor, BACKEND,
                 insert_sql,
                 (
                     record["transaction_id"],
@@ -138,6 +228,7 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
                 )
             )
         conn.commit()
+        _key_index.add(record["transaction_id"])
         return {
             "message": "Record inserted successfully into SQL Server.",
             "record": {k.lower(): v for k, v in record.items()}
@@ -145,84 +236,280 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     finally:
         conn.close()
 
-async def select_transaction():
+def _create_tvp_objects(cursor):
+    """
+    Creates the table type and insert procedure used by the TVP strategy.
+    """
+    global _tvp_objects_created
+    cursor.execute(CREATE_TVP_TYPE_SQL)
+    cursor.execute(CREATE_TVP_PROCEDURE_SQL)
+    _tvp_objects_created = True
+
+def _to_bulk_row(record: dict) -> tuple:
+    return (
+        record["transaction_id"],
+        record["user_id"],
+        record["transaction_ts"],
+        record["product_id"],
+        record["quantity"],
+        record["unit_price"],
+        record["total_amount"],
+        record["currency"],
+        record["payment_method"],
+        record["status"]
+    )
+
+def _bulk_insert(rows, batch_size: Optional[int], strategy: Optional[str]) -> dict:
+    """
+    Writes rows (any iterable) in chunks of batch_size, one commit per chunk.
+    'fast_executemany' sends each chunk as a pyodbc parameter array;
+    'tvp' sends each chunk as one table-valued parameter to an INSERT ... SELECT procedure.
+    """
+    strategy = strategy or DEFAULT_BULK_STRATEGY
+    if strategy not in BULK_STRATEGIES:
+        raise ValueError(f"Unknown bulk strategy '{strategy}', expected one of {', '.join(BULK_STRATEGIES)}.")
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            if strategy == "tvp":
+                if not _tvp_objects_created:
+                    _create_tvp_objects(cursor)
+                    conn.commit()
+
+                def write_batch(chunk):
+                    cursor.execute(f"{{CALL dbo.{TVP_PROCEDURE_NAME} (?)}}", (chunk,))
+                    conn.commit()
+            else:
+                cursor.fast_executemany = True
+
+                def write_batch(chunk):
+                    cursor.executemany(BULK_INSERT_SQL, chunk)
+                    conn.commit()
+
+            result = run_batches(rows, batch_size, write_batch)
+        return {"strategy": strategy, **result}
+    finally:
+        conn.close()
+
+@offload(BACKEND)
+def insert_transactions_batch(records: list, commit_size: Optional[int] = None, strategy: Optional[str] = None):
+    """
+    Inserts a list of transaction records, committing once per commit_size rows,
+    using the selected bulk strategy. Returns the timing of every batch.
+    """
+    for record in records:
+        record["transaction_id"] = str(uuid.uuid4())
+
+    result = _bulk_insert([_to_bulk_row(record) for record in records], commit_size, strategy)
+    _key_index.add_many(record["transaction_id"] for record in records)
+    return {"message": f"{len(records)} records inserted successfully into SQL Server.", **result}
+
+@offload(BACKEND)
+def bulk_load_sample_data(count: int, batch_size: Optional[int] = None, strategy: Optional[str] = None):
+    """
+    Inserts count generated records using the selected bulk strategy.
+    Rows are generated one batch at a time, so memory does not grow with count.
+    """
+    rows = (_to_bulk_row(generate_sample_record()) for _ in range(count))
+    result = _bulk_insert(rows, batch_size, strategy)
+    return {"message": f"{count} sample records bulk loaded successfully into SQL Server.", **result}
+
+@offload(BACKEND)
+def benchmark_bulk_strategies(count: int, batch_size: Optional[int] = None):
+    """
+    Loads count generated records with each bulk strategy in turn and returns
+    their timings side by side.
+    """
+    results = {}
+    for strategy in BULK_STRATEGIES:
+        rows = (_to_bulk_row(generate_sample_record()) for _ in range(count))
+        result = _bulk_insert(rows, batch_size, strategy)
+        results[strategy] = {
+            "seconds": result["seconds"],
+            "rows_per_second": result["rows_per_second"],
+            "batch_count": result["batch_count"]
+        }
+    return {"count": count, "batch_size": batch_size, "results": results}
+
+def _first_transaction_id(cursor):
+    """
+    Returns the transaction_id of the first row, or None when the table is empty.
+    """
+    cursor.execute(f"SELECT TOP 1 transaction_id FROM {TABLE_NAME}")
+    # fetchall ends the result, so the connection is free for the prepared statement cursors
+    rows = cursor.fetchall()
+    return rows[0][0] if rows else None
+
+def _update_first_transaction(cursor, new_status: str):
+    """
+    Updates one row and returns its transaction_id in a single UPDATE TOP (1) ... OUTPUT.
+    """
+    cursor.execute(f"UPDATE TOP (1) {TABLE_NAME} SET status = ? OUTPUT inserted.transaction_id", (new_status,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _delete_first_transaction(cursor):
+    """
+    Deletes one row and returns its transaction_id in a single DELETE TOP (1) ... OUTPUT.
+    """
+    cursor.execute(f"DELETE TOP (1) FROM {TABLE_NAME} OUTPUT deleted.transaction_id")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_update(cursor, new_status: str):
+    """
+    Updates a row no other transaction holds and returns its transaction_id.
+    READPAST skips locked rows and UPDLOCK keeps two requests from claiming the same one.
+    """
+    cursor.execute(f"""
+        WITH claimed AS (SELECT TOP 1 transaction_id, status FROM {TABLE_NAME} WITH (ROWLOCK, UPDLOCK, READPAST))
+        UPDATE claimed SET status = ? OUTPUT inserted.transaction_id
+    """, (new_status,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_delete(cursor):
+    """
+    Deletes a row no other transaction holds and returns its transaction_id (READPAST, UPDLOCK).
+    """
+    cursor.execute(f"""
+        WITH claimed AS (SELECT TOP 1 transaction_id FROM {TABLE_NAME} WITH (ROWLOCK, UPDLOCK, READPAST))
+        DELETE FROM claimed OUTPUT deleted.transaction_id
+    """)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+@offload(BACKEND)
+def scan_keys(limit: int) -> list:
+    """
+    Returns a uniform random sample of up to limit transaction_ids to rebuild the
+    key index, streamed from a full key scan so the sample is not the front of the table.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME}")
+            return sample_keys(cursor, limit)
+    finally:
+        conn.close()
+
+@offload(BACKEND)
+def select_transaction(sampling: Optional[str] = None):
     """
     Retrieves a single random transaction record from the table.
     Returns JSON with column names as keys (lowercase).
+    sampling chooses how the row is picked: 'index' (random key from the key index)
+    or one of SAMPLING_QUERIES; defaults to DB_SAMPLING_<BACKEND> / DB_SAMPLING.
     """
-    select_sql = f"SELECT TOP 1 * FROM {TABLE_NAME}"
+    strategy = resolve_sampling(BACKEND, sampling, SAMPLING_QUERIES)
+
+    key, record = _result_cache.lookup(_key_index, strategy)
+    if record is not None:
+        return {"record": record, "sampling": strategy, "cached": True}
+    version = _result_cache.version()
+
+    select_sql = f"SELECT * FROM {TABLE_NAME} WHERE transaction_id = ?"
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(select_sql)
-            row = cursor.fetchone()
+            row = None
+            statement = cursor
+            if strategy == INDEX_STRATEGY:
+                for transaction_id in _key_index.candidates(lambda: _first_transaction_id(cursor), key):
+                    statement = execute_prepared(conn, cursor, BACKEND, select_sql, (transaction_id,))
+                    row = statement.fetchone()
+                    if row:
+                        break
+            else:
+                row = sample_row(cursor, SAMPLING_QUERIES, strategy, TABLE_NAME)
 
             if not row:
                 return {"message": "No records found in the SQL Server table."}
 
-            columns = [col[0] for col in cursor.description]
+            columns = [col[0] for col in statement.description]
             result = {col.lower(): val for col, val in zip(columns, row)}
 
-            return {"record": result}
+            _result_cache.put(result["transaction_id"], result, version)
+            return {"record": result, "sampling": strategy}
     finally:
         conn.close()
 
-async def update_random_transaction_status():
+@offload(BACKEND)
+def update_random_transaction_status(claim: Optional[str] = None):
     """
     Updates the 'status' field of one random transaction record in SQL Server.
     Selects a new random status from predefined options.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
+    mode = resolve_claim_mode(BACKEND, claim)
     statuses = ["Completed", "Pending", "Failed", "Refunded"]
     new_status = random.choice(statuses)
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"SELECT TOP 1 transaction_id FROM {TABLE_NAME}")
-            row = cursor.fetchone()
-
-            if not row:
-                return {"message": "No records found to update in the SQL Server table."}
-
-            columns = [col[0] for col in cursor.description]
-            result = {col.lower(): val for col, val in zip(columns, row)}
-            transaction_id = result["transaction_id"]
-
             update_sql = f"""
             UPDATE {TABLE_NAME}
             SET status = ?
             WHERE transaction_id = ?
             """
-            cursor.execute(update_sql, (new_status, transaction_id))
+
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_update(cursor, new_status)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, update_sql, (new_status, candidate)).rowcount:
+                        transaction_id = candidate
+                        break
+
+                if transaction_id is None:
+                    # No live indexed key: update the first row and get its key back in the same statement
+                    transaction_id = _update_first_transaction(cursor, new_status)
+
+            if transaction_id is None:
+                return {"message": "No records found to update in the SQL Server table."}
 
         conn.commit()
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in SQL Server."}
     finally:
         conn.close()
 
-async def delete_random_transaction():
+@offload(BACKEND)
+def delete_random_transaction(claim: Optional[str] = None):
     """
     Deletes one random transaction record from the SQL Server table.
     No parameters required.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
-    conn = await get_connection()
+    mode = resolve_claim_mode(BACKEND, claim)
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"SELECT TOP 1 transaction_id FROM {TABLE_NAME}")
-            row = cursor.fetchone()
+            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = ?"
 
-            if not row:
-                return {"message": "No records found to delete in the SQL Server table."}
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_delete(cursor)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, delete_sql, (candidate,)).rowcount:
+                        transaction_id = candidate
+                        break
 
-            columns = [col[0] for col in cursor.description]
-            result = {col.lower(): val for col, val in zip(columns, row)}
-            transaction_id = result["transaction_id"]
+                if transaction_id is None:
+                    # No live indexed key: delete the first row and get its key back in the same statement
+                    transaction_id = _delete_first_transaction(cursor)
 
-            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = ?"
-            cursor.execute(delete_sql, (transaction_id,))
+            if transaction_id is None:
+                return {"message": "No records found to delete in the SQL Server table."}
 
         conn.commit()
+        _key_index.discard(transaction_id)
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Deleted transaction with ID {transaction_id} from SQL Server."}
     finally:
         conn.close()
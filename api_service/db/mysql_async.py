@@ -0,0 +1,232 @@
+# mysql_async.py
+# Theodor Harmse - University of Liverpool
+# Native asyncio (aiomysql) implementation of transaction_records operations shared by MySQL, MariaDB and Aurora MySQL
+
+import asyncio
+import uuid
+import random
+from typing import Optional
+from sqlalchemy import text
+
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.key_index import get_key_index
+from api_service.db.result_cache import get_result_cache
+from api_service.db.sample_data import generate_sample_record
+from api_service.db.sampling import INDEX_STRATEGY, resolve_sampling
+
+
+class AsyncMySQLService:
+    """
+    transaction_records operations on a SQLAlchemy asyncio engine.
+    Handlers await network I/O directly, so no worker thread is held per request.
+    """
+
+    def __init__(self, engine_getter, param_name: str, table_name: str, create_table_sql: str, label: str, backend: str):
+        self._engine_getter = engine_getter
+        self._param_name = param_name
+        self._table_name = table_name
+        self._create_table_sql = create_table_sql
+        self._label = label
+        self._key_index = get_key_index(backend)
+        self._result_cache = get_result_cache(backend)
+        self._backend = backend
+
+        # Database-side select-random strategies ('seek' range-seeks from a random UUID)
+        self._sampling_queries = {
+            "first": f"SELECT * FROM {table_name} LIMIT 1",
+            "seek": f"SELECT * FROM {table_name} WHERE transaction_id >= :key ORDER BY transaction_id LIMIT 1"
+        }
+
+    async def _engine(self):
+        return await self._engine_getter(self._param_name)
+
+    def _candidates(self, conn, key=None):
+        async def first_transaction_id():
+            result = await conn.execute(text(f"SELECT transaction_id FROM {self._table_name} LIMIT 1"))
+            row = result.first()
+            return row[0] if row else None
+
+        return self._key_index.acandidates(first_transaction_id, key)
+
+    async def _claim_transaction_id(self, conn):
+        """
+        Locks and returns the first row no other transaction holds (FOR UPDATE SKIP LOCKED).
+        """
+        result = await conn.execute(text(f"SELECT transaction_id FROM {self._table_name} LIMIT 1 FOR UPDATE SKIP LOCKED"))
+        row = result.first()
+        return row[0] if row else None
+
+    async def _delete_first_transaction(self, conn, delete_sql):
+        """
+        Deletes one row and returns its transaction_id: a single DELETE ... LIMIT 1 RETURNING
+        on MariaDB; MySQL has no RETURNING, so it claims an unlocked row and deletes it by
+        primary key (two round trips).
+        """
+        if self._backend == "mariadb":
+            row = (await conn.execute(text(f"DELETE FROM {self._table_name} LIMIT 1 RETURNING transaction_id"))).first()
+            return row[0] if row else None
+        transaction_id = await self._claim_transaction_id(conn)
+        if transaction_id is not None:
+            await conn.execute(delete_sql, {"transaction_id": transaction_id})
+        return transaction_id
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Opens the given number of pooled connections at once and returns them to the pool.
+        """
+        engine = await self._engine()
+        results = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+        held = [conn for conn in results if not isinstance(conn, Exception)]
+        for conn in held:
+            await conn.close()
+        return len(held)
+
+    async def initialize_table(self):
+        """
+        Creates the transaction_records table if it does not exist.
+        """
+        async with (await self._engine()).begin() as conn:
+            await conn.execute(text(self._create_table_sql))
+        return {"message": f"Table '{self._table_name}' initialized successfully in {self._label}."}
+
+    async def insert_transaction(self, record: Optional[dict] = None):
+        """
+        Inserts a new transaction record into the table.
+        If no record is provided, generates a new random sample record.
+        Automatically assigns a unique transaction_id.
+        """
+        if record is None:
+            record = generate_sample_record()
+        record["transaction_id"] = str(uuid.uuid4())
+
+        insert_sql = f"""
+        INSERT INTO {self._table_name} (
+            transaction_id, user_id, transaction_ts, product_id,
+            quantity, unit_price, total_amount, currency,
+            payment_method, status
+        ) VALUES (
+            :transaction_id, :user_id, :transaction_ts, :product_id,
+            :quantity, :unit_price, :total_amount, :currency,
+            :payment_method, :status
+        )
+        """
+
+        async with (await self._engine()).begin() as conn:
+            await conn.execute(text(insert_sql), record)
+        self._key_index.add(record["transaction_id"])
+        return {
+            "message": f"Record inserted successfully into {self._label}.",
+            "record": {k.lower(): v for k, v in record.items()}
+        }
+
+    async def _sample_row(self, conn, strategy: str):
+        if strategy == "seek":
+            result = await conn.execute(text(self._sampling_queries[strategy]), {"key": str(uuid.uuid4())})
+        else:
+            result = await conn.execute(text(self._sampling_queries[strategy]))
+        row = result.mappings().first()
+        if not row and strategy != "first":
+            result = await conn.execute(text(self._sampling_queries["first"]))
+            row = result.mappings().first()
+        return row
+
+    async def select_transaction(self, sampling: Optional[str] = None):
+        """
+        Retrieves a single random transaction record from the table.
+        sampling is 'index' (random key from the key index), 'first' or 'seek'.
+        Returns JSON with column names as keys (lowercase).
+        """
+        strategy = resolve_sampling(self._backend, sampling, self._sampling_queries)
+
+        key, record = self._result_cache.lookup(self._key_index, strategy)
+        if record is not None:
+            return {"record": record, "sampling": strategy, "cached": True}
+        version = self._result_cache.version()
+        select_sql = text(f"SELECT * FROM {self._table_name} WHERE transaction_id = :transaction_id")
+
+        row = None
+        async with (await self._engine()).connect() as conn:
+            if strategy == INDEX_STRATEGY:
+                async for transaction_id in self._candidates(conn, key):
+                    result = await conn.execute(select_sql, {"transaction_id": transaction_id})
+                    row = result.mappings().first()
+                    if row:
+                        break
+            else:
+                row = await self._sample_row(conn, strategy)
+
+        if not row:
+            return {"message": f"No records found in the {self._label} table."}
+
+        record = {col.lower(): val for col, val in row.items()}
+        self._result_cache.put(record["transaction_id"], record, version)
+        return {"record": record, "sampling": strategy}
+
+    async def update_random_transaction_status(self, claim: Optional[str] = None):
+        """
+        Updates the 'status' field of one random transaction record.
+        Selects a new random status from predefined options.
+        claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
+        """
+        mode = resolve_claim_mode(self._backend, claim)
+        statuses = ["Completed", "Pending", "Failed", "Refunded"]
+        new_status = random.choice(statuses)
+
+        update_sql = text(f"UPDATE {self._table_name} SET status = :status WHERE transaction_id = :transaction_id")
+
+        transaction_id = None
+        async with (await self._engine()).begin() as conn:
+            if mode == SKIP_LOCKED:
+                transaction_id = await self._claim_transaction_id(conn)
+                if transaction_id is not None:
+                    await conn.execute(update_sql, {"status": new_status, "transaction_id": transaction_id})
+            else:
+                async for candidate in self._key_index.acandidates():
+                    result = await conn.execute(update_sql, {"status": new_status, "transaction_id": candidate})
+                    if result.rowcount:
+                        transaction_id = candidate
+                        break
+
+                if transaction_id is None:
+                    # No live indexed key: there is no UPDATE ... RETURNING, so claim
+                    # an unlocked row and update it by primary key (two round trips)
+                    transaction_id = await self._claim_transaction_id(conn)
+                    if transaction_id is not None:
+                        await conn.execute(update_sql, {"status": new_status, "transaction_id": transaction_id})
+
+            if transaction_id is None:
+                return {"message": f"No records found to update in the {self._label} table."}
+
+        self._result_cache.invalidate(transaction_id)
+        return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in {self._label}."}
+
+    async def delete_random_transaction(self, claim: Optional[str] = None):
+        """
+        Deletes one random transaction record from the table.
+        claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
+        """
+        mode = resolve_claim_mode(self._backend, claim)
+        delete_sql = text(f"DELETE FROM {self._table_name} WHERE transaction_id = :transaction_id")
+
+        transaction_id = None
+        async with (await self._engine()).begin() as conn:
+            if mode == SKIP_LOCKED:
+                transaction_id = await self._claim_transaction_id(conn)
+                if transaction_id is not None:
+                    await conn.execute(delete_sql, {"transaction_id": transaction_id})
+            else:
+                async for candidate in self._key_index.acandidates():
+                    result = await conn.execute(delete_sql, {"transaction_id": candidate})
+                    if result.rowcount:
+                        transaction_id = candidate
+                        break
+
+                if transaction_id is None:
+                    transaction_id = await self._delete_first_transaction(conn, delete_sql)
+
+            if transaction_id is None:
+                return {"message": f"No records found to delete in the {self._label} table."}
+
+        self._key_index.discard(transaction_id)
+        self._result_cache.invalidate(transaction_id)
+        return {"message": f"Deleted transaction with ID {transaction_id} from {self._label}."}
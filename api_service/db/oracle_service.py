@@ -2,16 +2,44 @@
 # Theodor Harmse - University of Liverpool
 # Implementation of Oracle database operations for transaction_records table
 
+import os
 import uuid
 import random
+import cx_Oracle
 from typing import Optional
 from fastapi import Body
 from datetime import datetime, timedelta
+from api_service.db.batching import run_batches
+from api_service.db.sample_data import generate_sample_record
+from api_service.db.key_index import KEY_SCAN_BATCH_SIZE, get_key_index, sample_keys
+from api_service.db.result_cache import get_result_cache
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.load_jobs import get_load_job, run_load_job
+from api_service.db.statement_cache import execute_prepared
+from api_service.db.sampling import INDEX_STRATEGY, resolve_sampling, sample_row
+from api_service.db.executor import offload
 from api_service.db.base import get_oracle_connection
 
 # Parameter Store name for Oracle credentials
 PARAM_NAME = "/Liverpool/RDS/OracleDB/Credentials"
 
+# Backend key for the dedicated thread pool
+BACKEND = "oracle"
+
+# Random transaction_ids for point lookups, filled from inserts and key scans
+_key_index = get_key_index(BACKEND)
+
+# Optional read-through cache of select-random records (DB_RESULT_CACHE=1)
+_result_cache = get_result_cache(BACKEND)
+
+# Database-side select-random strategies ('seek' range-seeks from a random UUID)
+SAMPLING_QUERIES = {
+    "first": "SELECT * FROM {table} WHERE ROWNUM = 1",
+    "seek": "SELECT * FROM (SELECT * FROM {table} WHERE transaction_id >= :1 ORDER BY transaction_id) WHERE ROWNUM = 1",
+    "sample": "SELECT * FROM {table} SAMPLE ({percent}) WHERE ROWNUM = 1",
+    "sample_block": "SELECT * FROM {table} SAMPLE BLOCK ({percent}) WHERE ROWNUM = 1"
+}
+
 # Table name
 TABLE_NAME = "transaction_records"
 
@@ -39,17 +67,38 @@ EXCEPTION
 END;
 """
 
-async def get_connection():
+# Rows per array DML execution for batch inserts and bulk loads
+ARRAY_SIZE = int(os.environ.get("ORACLE_ARRAY_SIZE", "1000"))
+
+ARRAY_INSERT_SQL = f"""
+INSERT INTO {TABLE_NAME} (
+    transaction_id, user_id, transaction_ts, product_id,
+    quantity, unit_price, total_amount, currency,
+    payment_method, status
+) VALUES (
+    :1, :2, :3, :4, :5, :6, :7, :8, :9, :10
+)
+"""
+
+# Bind types/maximum lengths declared once per array execution
+ARRAY_INPUT_SIZES = (
+    36, 36, cx_Oracle.TIMESTAMP, 36,
+    cx_Oracle.NUMBER, cx_Oracle.NUMBER, cx_Oracle.NUMBER, 3,
+    20, 20
+)
+
+def get_connection():
     """
     Returns a new cx_Oracle connection using the base utility function.
     """
     return get_oracle_connection(PARAM_NAME)
 
-async def initialize_table():
+@offload(BACKEND)
+def initialize_table():
     """
     Creates the transaction_records table in Oracle if it does not exist.
     """
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute(CREATE_TABLE_PLSQL)
@@ -58,14 +107,22 @@ async def initialize_table():
     finally:
         conn.close()
 
-async def load_sample_data():
+async def load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Starts a background job inserting count random records through insert_transactions_batch(),
+    one commit per batch_size records, with up to parallelism batches in flight.
+    Progress, elapsed time and throughput are reported by get_load_sample_data_status().
+    """
+    return await run_load_job(BACKEND, "Oracle", insert_transactions_batch, count, batch_size, parallelism, wait)
+
+def get_load_sample_data_status():
     """
-    Inserts 1 random sample record into the transaction_records table.
+    Returns the progress of the current or most recent sample data load job.
     """
-    await insert_transaction(record=None)
-    return {"message": "1 sample record inserted successfully into Oracle."}
+    return get_load_job(BACKEND)
 
-async def insert_transaction(record: Optional[dict] = Body(None)):
+@offload(BACKEND)
+def insert_transaction(record: Optional[dict] = Body(None)):
     """
     Inserts a new transaction record into the table.
     If no record is provided, generates a random sample record.
@@ -104,10 +161,11 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     )
     """
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(
+            execute_prepared(
+                conn, cursor, BACKEND,
                 insert_sql,
                 (
                     record["transaction_id"],
@@ -123,6 +181,7 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
                 )
             )
         conn.commit()
+        _key_index.add(record["transaction_id"])
         return {
             "message": "Record inserted successfully into Oracle.",
             "record": {k.lower(): v for k, v in record.items()}
@@ -130,89 +189,283 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     finally:
         conn.close()
 
-async def select_transaction():
+def _to_array_row(record: dict) -> tuple:
+    """
+    Converts a record into a bind row matching ARRAY_INPUT_SIZES.
+    Raises ValueError if transaction_ts is not an ISO 8601 timestamp.
+    """
+    transaction_ts = record["transaction_ts"]
+    if isinstance(transaction_ts, str):
+        try:
+            transaction_ts = datetime.fromisoformat(transaction_ts)
+        except ValueError:
+            raise ValueError(f"transaction_ts must be an ISO 8601 timestamp, got '{transaction_ts}'.")
+    return (
+        record["transaction_id"],
+        record["user_id"],
+        transaction_ts,
+        record["product_id"],
+        record["quantity"],
+        record["unit_price"],
+        record["total_amount"],
+        record["currency"],
+        record["payment_method"],
+        record["status"]
+    )
+
+def _execute_array_insert(conn, cursor, rows: list) -> list:
+    """
+    Inserts rows in one round trip with array DML and commits.
+    Input sizes are declared up front so cx_Oracle does not rebind per row, and
+    batcherrors lets valid rows succeed while failed rows are reported by offset.
+    """
+    cursor.setinputsizes(*ARRAY_INPUT_SIZES)
+    cursor.executemany(ARRAY_INSERT_SQL, rows, batcherrors=True)
+    errors = [{"offset": error.offset, "message": error.message} for error in cursor.getbatcherrors()]
+    conn.commit()
+    return errors
+
+def _array_load(rows, batch_size: Optional[int]) -> dict:
+    """
+    Writes rows (any iterable) in array DML batches of batch_size.
+    Returns per-batch timing, rows per second and any row errors with their overall offset.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            errors = []
+            written = 0
+
+            def write_batch(chunk):
+                nonlocal written
+                for error in _execute_array_insert(conn, cursor, chunk):
+                    errors.append({"offset": written + error["offset"], "message": error["message"]})
+                written += len(chunk)
+
+            result = run_batches(rows, batch_size or ARRAY_SIZE, write_batch)
+        result["inserted"] -= len(errors)
+        result["errors"] = errors
+        return result
+    finally:
+        conn.close()
+
+@offload(BACKEND)
+def insert_transactions_batch(records: list, commit_size: Optional[int] = None):
+    """
+    Inserts a list of transaction records using array DML, committing once per
+    commit_size rows (default ORACLE_ARRAY_SIZE). Returns the timing of every batch.
+    """
+    # Rows are converted before the first batch, so a malformed record fails the request before anything is committed
+    rows = []
+    for record in records:
+        record["transaction_id"] = str(uuid.uuid4())
+        rows.append(_to_array_row(record))
+
+    result = _array_load(rows, commit_size)
+    failed = {error["offset"] for error in result["errors"]}
+    _key_index.add_many(record["transaction_id"] for offset, record in enumerate(records) if offset not in failed)
+    return {"message": f"{result['inserted']} records inserted successfully into Oracle.", **result}
+
+@offload(BACKEND)
+def bulk_load_sample_data(count: int, batch_size: Optional[int] = None):
+    """
+    Inserts count generated records using array DML in batches of batch_size.
+    Rows are generated one batch at a time, so memory does not grow with count.
+    """
+    rows = (_to_array_row(generate_sample_record()) for _ in range(count))
+    result = _array_load(rows, batch_size)
+    return {"message": f"{result['inserted']} sample records bulk loaded successfully into Oracle.", **result}
+
+def _first_transaction_id(cursor):
+    """
+    Returns the transaction_id of the first row, or None when the table is empty.
+    """
+    cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} WHERE ROWNUM = 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _update_first_transaction(cursor, new_status: str):
+    """
+    Updates the first row and returns its transaction_id in a single UPDATE ... RETURNING INTO.
+    """
+    transaction_id = cursor.var(str)
+    cursor.execute(
+        f"UPDATE {TABLE_NAME} SET status = :1 WHERE ROWNUM = 1 RETURNING transaction_id INTO :2",
+        (new_status, transaction_id)
+    )
+    return transaction_id.getvalue()[0] if cursor.rowcount else None
+
+def _delete_first_transaction(cursor):
+    """
+    Deletes the first row and returns its transaction_id in a single DELETE ... RETURNING INTO.
+    """
+    transaction_id = cursor.var(str)
+    cursor.execute(
+        f"DELETE FROM {TABLE_NAME} WHERE ROWNUM = 1 RETURNING transaction_id INTO :1",
+        (transaction_id,)
+    )
+    return transaction_id.getvalue()[0] if cursor.rowcount else None
+
+def _claim_transaction_id(cursor):
+    """
+    Locks and returns the first row no other transaction holds (FOR UPDATE SKIP LOCKED).
+    Oracle locks SKIP LOCKED rows as they are fetched, so only one row is fetched.
+    """
+    cursor.prefetchrows = 1
+    cursor.arraysize = 1
+    cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} FOR UPDATE SKIP LOCKED")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_update(cursor, new_status: str):
+    """
+    Claims an unlocked row and updates it by primary key in the same transaction.
+    """
+    transaction_id = _claim_transaction_id(cursor)
+    if transaction_id is not None:
+        cursor.execute(f"UPDATE {TABLE_NAME} SET status = :1 WHERE transaction_id = :2", (new_status, transaction_id))
+    return transaction_id
+
+def _claim_delete(cursor):
+    """
+    Claims an unlocked row and deletes it by primary key in the same transaction.
+    """
+    transaction_id = _claim_transaction_id(cursor)
+    if transaction_id is not None:
+        cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE transaction_id = :1", (transaction_id,))
+    return transaction_id
+
+@offload(BACKEND)
+def scan_keys(limit: int) -> list:
+    """
+    Returns a uniform random sample of up to limit transaction_ids to rebuild the
+    key index, streamed from a full key scan so the sample is not the front of the table.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.arraysize = KEY_SCAN_BATCH_SIZE
+            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME}")
+            return sample_keys(cursor, limit)
+    finally:
+        conn.close()
+
+@offload(BACKEND)
+def select_transaction(sampling: Optional[str] = None):
     """
     Retrieves a single random transaction record from the table.
     Returns JSON with column names as lowercase keys.
+    sampling chooses how the row is picked: 'index' (random key from the key index)
+    or one of SAMPLING_QUERIES; defaults to DB_SAMPLING_<BACKEND> / DB_SAMPLING.
     """
+    strategy = resolve_sampling(BACKEND, sampling, SAMPLING_QUERIES)
+
+    key, record = _result_cache.lookup(_key_index, strategy)
+    if record is not None:
+        return {"record": record, "sampling": strategy, "cached": True}
+    version = _result_cache.version()
 
-    select_sql = f"""
-        SELECT * FROM {TABLE_NAME} WHERE ROWNUM = 1
-        """
+    select_sql = f"SELECT * FROM {TABLE_NAME} WHERE transaction_id = :1"
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(select_sql)
-            row = cursor.fetchone()
+            row = None
+            statement = cursor
+            if strategy == INDEX_STRATEGY:
+                for transaction_id in _key_index.candidates(lambda: _first_transaction_id(cursor), key):
+                    statement = execute_prepared(conn, cursor, BACKEND, select_sql, (transaction_id,))
+                    row = statement.fetchone()
+                    if row:
+                        break
+            else:
+                row = sample_row(cursor, SAMPLING_QUERIES, strategy, TABLE_NAME)
 
             if not row:
                 return {"message": "No records found in the Oracle table."}
 
-            columns = [col[0].lower() for col in cursor.description]
+            columns = [col[0].lower() for col in statement.description]
             result = dict(zip(columns, row))
 
-            return {"record": result}
+            _result_cache.put(result["transaction_id"], result, version)
+            return {"record": result, "sampling": strategy}
     finally:
         conn.close()
 
-async def update_random_transaction_status():
+@offload(BACKEND)
+def update_random_transaction_status(claim: Optional[str] = None):
     """
     Updates the 'status' field of one random transaction record in Oracle.
     Selects a new random status from predefined options.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
+    mode = resolve_claim_mode(BACKEND, claim)
     statuses = ["Completed", "Pending", "Failed", "Refunded"]
     new_status = random.choice(statuses)
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"""
-                SELECT transaction_id FROM {TABLE_NAME} WHERE ROWNUM = 1
-                """)
+            update_sql = f"""
+            UPDATE {TABLE_NAME}
+            SET status = :1
+            WHERE transaction_id = :2
+            """
 
-            row = cursor.fetchone()
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_update(cursor, new_status)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, update_sql, (new_status, candidate)).rowcount:
+                        transaction_id = candidate
+                        break
 
-            if not row:
-                return {"message": "No records found to update in the Oracle table."}
+                if transaction_id is None:
+                    # No live indexed key: update the first row and get its key back in the same statement
+                    transaction_id = _update_first_transaction(cursor, new_status)
 
-            transaction_id = row[0]
-
-            cursor.execute(f"""
-                UPDATE {TABLE_NAME}
-                SET status = :1
-                WHERE transaction_id = :2
-            """, (new_status, transaction_id))
+            if transaction_id is None:
+                return {"message": "No records found to update in the Oracle table."}
 
         conn.commit()
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in Oracle."}
     finally:
         conn.close()
 
-async def delete_random_transaction():
+@offload(BACKEND)
+def delete_random_transaction(claim: Optional[str] = None):
     """
     Deletes one random transaction record from the Oracle table.
     No parameters required.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
-    conn = await get_connection()
+    mode = resolve_claim_mode(BACKEND, claim)
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"""
-                SELECT transaction_id FROM {TABLE_NAME} WHERE ROWNUM = 1
-                """)
-            row = cursor.fetchone()
+            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = :1"
 
-            if not row:
-                return {"message": "No records found to delete in the Oracle table."}
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_delete(cursor)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, delete_sql, (candidate,)).rowcount:
+                        transaction_id = candidate
+                        break
 
-            transaction_id = row[0]
+                if transaction_id is None:
+                    # No live indexed key: delete the first row and get its key back in the same statement
+                    transaction_id = _delete_first_transaction(cursor)
 
-            cursor.execute(
-                f"DELETE FROM {TABLE_NAME} WHERE transaction_id = :1",
-                (transaction_id,)
-            )
+            if transaction_id is None:
+                return {"message": "No records found to delete in the Oracle table."}
 
         conn.commit()
+        _key_index.discard(transaction_id)
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Deleted transaction with ID {transaction_id} from Oracle."}
     finally:
         conn.close()
@@ -0,0 +1,206 @@
+# pool_config.py
+# Theodor Harmse - University of Liverpool
+# Connection pool sizing for the SQL engines: per-backend settings, and an allocator that
+# splits a total connection budget across the enabled backends and all server workers
+
+import os
+from threading import Lock
+from sqlalchemy import event
+
+from api_service.db.registry import get_enabled_backends
+
+# SQL backends with pooled engines in base.py (DynamoDB is HTTP based and not budgeted)
+SQL_BACKENDS = (
+    "mysql",
+    "aurora_mysql",
+    "postgresql",
+    "aurora_postgresql",
+    "mariadb",
+    "mssql",
+    "oracle",
+    "ibmdb2",
+)
+
+# Number of server worker processes sharing each database's connection budget.
+# start.sh exports this from UVICORN_WORKERS; uvicorn/gunicorn also set WEB_CONCURRENCY.
+WORKERS = int(os.environ.get("DB_WORKERS", os.environ.get("WEB_CONCURRENCY", "1")))
+
+# Maximum connections one backend may receive from the whole API (all workers together).
+# Defaults to 300, i.e. the previous pool_size=200 + max_overflow=100 for a single worker.
+# Override per backend with DB_MAX_CONNECTIONS_<BACKEND>, e.g. DB_MAX_CONNECTIONS_IBMDB2=100.
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", "300"))
+
+# Optional total connection budget for all SQL backends together (all workers).
+# When set, it is split across the enabled backends and replaces the per-backend limits above.
+TOTAL_CONNECTION_BUDGET = int(os.environ.get("DB_TOTAL_CONNECTION_BUDGET", "0"))
+
+# How the total budget is split: 'weight' uses DB_POOL_WEIGHT_<BACKEND> (default 1),
+# 'demand' uses the peak concurrent checkouts observed since the last rebalance.
+ALLOCATION_MODE = os.environ.get("DB_POOL_ALLOCATION", "weight").lower()
+
+# Seconds after which pooled connections are recycled
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "3600"))
+
+# Observed pool demand per backend, updated from SQLAlchemy checkout/checkin events
+_demand = {backend: {"in_use": 0, "peak_in_use": 0, "checkouts": 0} for backend in SQL_BACKENDS}
+_demand_weights = None
+_lock = Lock()
+
+
+def get_weight(backend: str) -> float:
+    """
+    Returns the configured share weight of the backend in the total budget.
+    """
+    return float(os.environ.get(f"DB_POOL_WEIGHT_{backend.upper()}", "1"))
+
+
+def allocate_budget(total: int, weights: dict) -> dict:
+    """
+    Splits total connections across backends proportionally to their weights.
+    Every backend receives at least one connection; remainders go to the
+    largest fractional shares so the allocation always sums to the total.
+    """
+    if not weights:
+        return {}
+    weight_sum = sum(weights.values())
+    if weight_sum <= 0:
+        weights = {backend: 1 for backend in weights}
+        weight_sum = len(weights)
+    total = max(total, len(weights))
+    remaining = total - len(weights)
+    shares = {backend: remaining * weight / weight_sum for backend, weight in weights.items()}
+    allocation = {backend: 1 + int(share) for backend, share in shares.items()}
+    leftover = total - sum(allocation.values())
+    for backend in sorted(shares, key=lambda b: shares[b] - int(shares[b]), reverse=True)[:leftover]:
+        allocation[backend] += 1
+    return allocation
+
+
+def get_allocation() -> dict:
+    """
+    Returns the total connections (all workers) allocated to each enabled backend.
+    """
+    enabled = get_enabled_backends(SQL_BACKENDS)
+    if not TOTAL_CONNECTION_BUDGET:
+        return {
+            backend: int(os.environ.get(f"DB_MAX_CONNECTIONS_{backend.upper()}", DEFAULT_MAX_CONNECTIONS))
+            for backend in enabled
+        }
+    if ALLOCATION_MODE == "demand" and _demand_weights is not None:
+        weights = {backend: _demand_weights.get(backend, 0) for backend in enabled}
+    else:
+        weights = {backend: get_weight(backend) for backend in enabled}
+    return allocate_budget(TOTAL_CONNECTION_BUDGET, weights)
+
+
+def get_connection_budget(backend: str) -> int:
+    """
+    Returns the total number of connections all workers may open to the backend.
+    """
+    return get_allocation().get(backend, 0)
+
+
+def get_worker_connections(backend: str) -> int:
+    """
+    Returns the number of connections this worker process may open to the backend.
+    Every worker needs at least one connection, so a budget smaller than the
+    number of workers cannot be honoured; get_budget_violations() reports it.
+    """
+    return max(1, get_connection_budget(backend) // max(1, WORKERS))
+
+
+def get_budget_violations() -> dict:
+    """
+    Returns the backends whose budget is smaller than one connection per worker,
+    with the budget and the number of connections all workers will actually open.
+    """
+    return {
+        backend: {"budget": budget, "opened_by_all_workers": max(1, WORKERS)}
+        for backend, budget in get_allocation().items()
+        if budget < max(1, WORKERS)
+    }
+
+
+def get_pool_kwargs(backend: str) -> dict:
+    """
+    Returns SQLAlchemy pool arguments for the backend in this worker.
+    The per-worker allowance is split two thirds persistent pool, one third overflow,
+    unless DB_POOL_SIZE_<BACKEND>, DB_MAX_OVERFLOW_<BACKEND> or DB_POOL_RECYCLE_<BACKEND> are set.
+    """
+    key = backend.upper()
+    connections = get_worker_connections(backend)
+    # Overrides are clamped so pool_size + max_overflow never exceeds the worker's allowance
+    pool_size = min(connections, max(1, int(os.environ.get(f"DB_POOL_SIZE_{key}", (connections * 2) // 3))))
+    max_overflow = min(connections - pool_size, max(0, int(os.environ.get(f"DB_MAX_OVERFLOW_{key}", connections))))
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": int(os.environ.get(f"DB_POOL_RECYCLE_{key}", POOL_RECYCLE))
+    }
+
+
+def _on_checkout(backend: str):
+    with _lock:
+        stats = _demand[backend]
+        stats["checkouts"] += 1
+        stats["in_use"] += 1
+        stats["peak_in_use"] = max(stats["peak_in_use"], stats["in_use"])
+
+
+def _on_checkin(backend: str):
+    with _lock:
+        stats = _demand[backend]
+        stats["in_use"] = max(0, stats["in_use"] - 1)
+
+
+def track_engine(engine, backend: str):
+    """
+    Records connection checkouts and checkins of the engine's pool as observed demand.
+    """
+    event.listen(engine, "checkout", lambda *args: _on_checkout(backend))
+    event.listen(engine, "checkin", lambda *args: _on_checkin(backend))
+    return engine
+
+
+def rebalance() -> dict:
+    """
+    Takes the peak concurrent demand observed since the last rebalance as the new
+    weights (used when DB_POOL_ALLOCATION=demand) and resets the peaks.
+    Engines created afterwards are sized from the new allocation.
+
+    Demand is tracked per worker process and the rebalance only resizes the
+    worker that runs it. Each worker's pools still add up to at most
+    1/WORKERS of the total budget, so the total is kept, but the split
+    across backends can differ between workers until each is rebalanced.
+    """
+    global _demand_weights
+    with _lock:
+        _demand_weights = {backend: stats["peak_in_use"] for backend, stats in _demand.items()}
+        for stats in _demand.values():
+            stats["peak_in_use"] = stats["in_use"]
+    return get_allocation()
+
+
+def get_pool_report() -> dict:
+    """
+    Returns the current allocation, per-worker pool settings and observed demand.
+    """
+    allocation = get_allocation()
+    with _lock:
+        demand = {backend: dict(stats) for backend, stats in _demand.items()}
+    return {
+        "workers": WORKERS,
+        "worker_pid": os.getpid(),
+        "rebalance_scope": "worker",
+        "total_budget": TOTAL_CONNECTION_BUDGET or None,
+        "budget_violations": get_budget_violations(),
+        "allocation_mode": ALLOCATION_MODE if TOTAL_CONNECTION_BUDGET else "per-backend",
+        "backends": {
+            backend: {
+                "budget": allocation[backend],
+                "worker_pool": get_pool_kwargs(backend),
+                "demand": demand[backend]
+            }
+            for backend in allocation
+        }
+    }
@@ -0,0 +1,276 @@
+# postgresql_async.py
+# Theodor Harmse - University of Liverpool
+# asyncpg implementation of transaction_records operations shared by PostgreSQL and Aurora PostgreSQL
+
+import asyncio
+import uuid
+import random
+from decimal import Decimal
+from typing import Optional
+from datetime import datetime
+
+from api_service.db.batching import arun_batches
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.key_index import get_key_index
+from api_service.db.result_cache import get_result_cache
+from api_service.db.sample_data import generate_sample_record
+from api_service.db.sampling import INDEX_STRATEGY, SAMPLE_PERCENT, resolve_sampling
+
+
+def _to_row(record: dict) -> tuple:
+    """
+    Converts a record to insert parameters in column order.
+    asyncpg binds native types only: the key as UUID, timestamps as datetime, NUMERIC as Decimal.
+    """
+    transaction_ts = record["transaction_ts"]
+    if isinstance(transaction_ts, str):
+        try:
+            transaction_ts = datetime.fromisoformat(transaction_ts)
+        except ValueError:
+            raise ValueError(f"transaction_ts must be an ISO 8601 timestamp, got '{transaction_ts}'.")
+    return (
+        uuid.UUID(record["transaction_id"]),
+        record["user_id"],
+        transaction_ts,
+        record["product_id"],
+        record["quantity"],
+        Decimal(str(record["unit_price"])),
+        Decimal(str(record["total_amount"])),
+        record["currency"],
+        record["payment_method"],
+        record["status"]
+    )
+
+
+class AsyncPostgreSQLService:
+    """
+    transaction_records operations on an asyncpg pool.
+    SQL text is built once per service, so asyncpg's per-connection statement
+    cache reuses the server-side prepared statement on every call.
+    """
+
+    def __init__(self, pool_getter, param_name: str, table_name: str, create_table_sql: str, label: str, backend: str):
+        self._pool_getter = pool_getter
+        self._param_name = param_name
+        self._table_name = table_name
+        self._create_table_sql = create_table_sql
+        self._label = label
+        self._key_index = get_key_index(backend)
+        self._result_cache = get_result_cache(backend)
+        self._backend = backend
+
+        self._insert_sql = f"""
+        INSERT INTO {table_name} (
+            transaction_id, user_id, transaction_ts, product_id,
+            quantity, unit_price, total_amount, currency,
+            payment_method, status
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+        """
+        self._select_sql = f"SELECT * FROM {table_name} WHERE transaction_id = $1"
+        self._select_id_sql = f"SELECT transaction_id FROM {table_name} LIMIT 1"
+        self._update_sql = f"UPDATE {table_name} SET status = $1 WHERE transaction_id = $2"
+        self._delete_sql = f"DELETE FROM {table_name} WHERE transaction_id = $1"
+        self._update_first_sql = f"""
+        UPDATE {table_name} SET status = $1
+        WHERE transaction_id = (SELECT transaction_id FROM {table_name} LIMIT 1)
+        RETURNING transaction_id
+        """
+        self._delete_first_sql = f"""
+        DELETE FROM {table_name}
+        WHERE transaction_id = (SELECT transaction_id FROM {table_name} LIMIT 1)
+        RETURNING transaction_id
+        """
+        self._claim_update_sql = f"""
+        UPDATE {table_name} SET status = $1
+        WHERE transaction_id = (SELECT transaction_id FROM {table_name} LIMIT 1 FOR UPDATE SKIP LOCKED)
+        RETURNING transaction_id
+        """
+        self._claim_delete_sql = f"""
+        DELETE FROM {table_name}
+        WHERE transaction_id = (SELECT transaction_id FROM {table_name} LIMIT 1 FOR UPDATE SKIP LOCKED)
+        RETURNING transaction_id
+        """
+
+        # Database-side select-random strategies ('seek' range-seeks from a random UUID)
+        self._sampling_queries = {
+            "first": f"SELECT * FROM {table_name} LIMIT 1",
+            "seek": f"SELECT * FROM {table_name} WHERE transaction_id >= $1 ORDER BY transaction_id LIMIT 1",
+            "system": f"SELECT * FROM {table_name} TABLESAMPLE SYSTEM ({SAMPLE_PERCENT}) LIMIT 1",
+            "bernoulli": f"SELECT * FROM {table_name} TABLESAMPLE BERNOULLI ({SAMPLE_PERCENT}) LIMIT 1"
+        }
+
+    async def _pool(self):
+        return await self._pool_getter(self._param_name)
+
+    def _candidates(self, conn, key=None):
+        async def first_transaction_id():
+            return await conn.fetchval(self._select_id_sql)
+
+        return self._key_index.acandidates(first_transaction_id, key)
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Acquires the given number of pooled connections at once and releases them back to the pool.
+        """
+        pool = await self._pool()
+        results = await asyncio.gather(*(pool.acquire() for _ in range(connections)), return_exceptions=True)
+        held = [conn for conn in results if not isinstance(conn, Exception)]
+        for conn in held:
+            await pool.release(conn)
+        return len(held)
+
+    async def initialize_table(self):
+        """
+        Creates the transaction_records table if it does not exist.
+        """
+        pool = await self._pool()
+        async with pool.acquire() as conn:
+            await conn.execute(self._create_table_sql)
+        return {"message": f"Table '{self._table_name}' initialized successfully in {self._label}."}
+
+    async def insert_transaction(self, record: Optional[dict] = None):
+        """
+        Inserts a new transaction record into the table.
+        If no record is provided, generates a new random sample record.
+        Automatically assigns a unique transaction_id.
+        """
+        if record is None:
+            record = generate_sample_record()
+        record["transaction_id"] = str(uuid.uuid4())
+        row = _to_row(record)
+
+        pool = await self._pool()
+        async with pool.acquire() as conn:
+            await conn.execute(self._insert_sql, *row)
+        self._key_index.add(record["transaction_id"])
+        return {
+            "message": f"Record inserted successfully into {self._label}.",
+            "record": {k.lower(): v for k, v in record.items()}
+        }
+
+    async def insert_transactions_batch(self, records: list, commit_size: Optional[int] = None):
+        """
+        Inserts a list of transaction records, committing once per commit_size rows.
+        Each chunk is sent with executemany() on one prepared statement.
+        Returns the timing of every batch.
+        """
+        rows = []
+        for record in records:
+            record["transaction_id"] = str(uuid.uuid4())
+            rows.append(_to_row(record))
+
+        pool = await self._pool()
+        async with pool.acquire() as conn:
+            async def write_batch(chunk):
+                async with conn.transaction():
+                    await conn.executemany(self._insert_sql, chunk)
+
+            result = await arun_batches(rows, commit_size, write_batch)
+        self._key_index.add_many(str(row[0]) for row in rows)
+        return {"message": f"{len(rows)} records inserted successfully into {self._label}.", **result}
+
+    async def _sample_row(self, conn, strategy: str):
+        if strategy == "seek":
+            row = await conn.fetchrow(self._sampling_queries[strategy], uuid.uuid4())
+        else:
+            row = await conn.fetchrow(self._sampling_queries[strategy])
+        if not row and strategy != "first":
+            row = await conn.fetchrow(self._sampling_queries["first"])
+        return row
+
+    async def select_transaction(self, sampling: Optional[str] = None):
+        """
+        Retrieves a single random transaction record from the table.
+        sampling is 'index' (random key from the key index) or one of 'first',
+        'seek', 'system' and 'bernoulli'.
+        Returns JSON with column names as keys (lowercase).
+        """
+        strategy = resolve_sampling(self._backend, sampling, self._sampling_queries)
+
+        key, record = self._result_cache.lookup(self._key_index, strategy)
+        if record is not None:
+            return {"record": record, "sampling": strategy, "cached": True}
+        version = self._result_cache.version()
+
+        row = None
+        pool = await self._pool()
+        async with pool.acquire() as conn:
+            if strategy == INDEX_STRATEGY:
+                async for transaction_id in self._candidates(conn, key):
+                    row = await conn.fetchrow(self._select_sql, uuid.UUID(str(transaction_id)))
+                    if row:
+                        break
+            else:
+                row = await self._sample_row(conn, strategy)
+
+        if not row:
+            return {"message": f"No records found in the {self._label} table."}
+
+        record = {col.lower(): val for col, val in row.items()}
+        self._result_cache.put(record["transaction_id"], record, version)
+        return {"record": record, "sampling": strategy}
+
+    async def update_random_transaction_status(self, claim: Optional[str] = None):
+        """
+        Updates the 'status' field of one random transaction record.
+        Selects a new random status from predefined options.
+        claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
+        """
+        mode = resolve_claim_mode(self._backend, claim)
+        statuses = ["Completed", "Pending", "Failed", "Refunded"]
+        new_status = random.choice(statuses)
+
+        pool = await self._pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                transaction_id = None
+                if mode == SKIP_LOCKED:
+                    transaction_id = await conn.fetchval(self._claim_update_sql, new_status)
+                else:
+                    async for candidate in self._key_index.acandidates():
+                        status = await conn.execute(self._update_sql, new_status, uuid.UUID(str(candidate)))
+                        # execute() returns the command tag, e.g. "UPDATE 1"
+                        if not status.endswith(" 0"):
+                            transaction_id = candidate
+                            break
+
+                    if transaction_id is None:
+                        # No live indexed key: update the first row and get its key back in the same statement
+                        transaction_id = await conn.fetchval(self._update_first_sql, new_status)
+
+                if transaction_id is None:
+                    return {"message": f"No records found to update in the {self._label} table."}
+
+        self._result_cache.invalidate(transaction_id)
+        return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in {self._label}."}
+
+    async def delete_random_transaction(self, claim: Optional[str] = None):
+        """
+        Deletes one random transaction record from the table.
+        claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
+        """
+        mode = resolve_claim_mode(self._backend, claim)
+        pool = await self._pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                transaction_id = None
+                if mode == SKIP_LOCKED:
+                    transaction_id = await conn.fetchval(self._claim_delete_sql)
+                else:
+                    async for candidate in self._key_index.acandidates():
+                        status = await conn.execute(self._delete_sql, uuid.UUID(str(candidate)))
+                        # execute() returns the command tag, e.g. "DELETE 1"
+                        if not status.endswith(" 0"):
+                            transaction_id = candidate
+                            break
+
+                    if transaction_id is None:
+                        # No live indexed key: delete the first row and get its key back in the same statement
+                        transaction_id = await conn.fetchval(self._delete_first_sql)
+
+                if transaction_id is None:
+                    return {"message": f"No records found to delete in the {self._label} table."}
+
+        self._key_index.discard(transaction_id)
+        self._result_cache.invalidate(transaction_id)
+        return {"message": f"Deleted transaction with ID {transaction_id} from {self._label}."}
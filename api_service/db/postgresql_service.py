@@ -7,10 +7,36 @@ import random
 from typing import Optional
 from fastapi import Body
 from datetime import datetime, timedelta
-from api_service.db.base import get_postgresql_connection
+from psycopg2.extras import execute_values
+from api_service.db.batching import run_batches
+from api_service.db.copy_loader import CopyLoadJob
+from api_service.db.key_index import get_key_index, sample_keys
+from api_service.db.result_cache import get_result_cache
+from api_service.db.claiming import SKIP_LOCKED, resolve_claim_mode
+from api_service.db.load_jobs import get_load_job, run_load_job
+from api_service.db.statement_cache import execute_prepared
+from api_service.db.sampling import INDEX_STRATEGY, resolve_sampling, sample_row
+from api_service.db.executor import offload
+from api_service.db.base import get_postgresql_connection, get_postgresql_asyncpg_pool, get_session_state, set_session_autocommit, use_async_engine
+from api_service.db.postgresql_async import AsyncPostgreSQLService
 
 PARAM_NAME = "/Liverpool/RDS/PostgreSQL/Credentials"
 TABLE_NAME = "transaction_records"
+BACKEND = "postgresql"
+
+# Random transaction_ids for point lookups, filled from inserts and key scans
+_key_index = get_key_index(BACKEND)
+
+# Optional read-through cache of select-random records (DB_RESULT_CACHE=1)
+_result_cache = get_result_cache(BACKEND)
+
+# Database-side select-random strategies ('seek' range-seeks from a random UUID)
+SAMPLING_QUERIES = {
+    "first": "SELECT * FROM {table} LIMIT 1",
+    "seek": "SELECT * FROM {table} WHERE transaction_id >= %s ORDER BY transaction_id LIMIT 1",
+    "system": "SELECT * FROM {table} TABLESAMPLE SYSTEM ({percent}) LIMIT 1",
+    "bernoulli": "SELECT * FROM {table} TABLESAMPLE BERNOULLI ({percent}) LIMIT 1"
+}
 
 CREATE_TABLE_SQL = f"""
 CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
@@ -27,17 +53,18 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
 );
 """
 
-async def get_connection():
+def get_connection():
     """
     Returns a new psycopg2 connection using the base utility function.
     """
     return get_postgresql_connection(PARAM_NAME)
 
-async def initialize_table():
+@offload(BACKEND)
+def initialize_table():
     """
     Creates the transaction_records table if it does not exist.
     """
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute(CREATE_TABLE_SQL)
@@ -46,15 +73,40 @@ async def initialize_table():
     finally:
         conn.close()
 
-async def load_sample_data():
+async def load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Starts a background job inserting count random records through insert_transactions_batch(),
+    one commit per batch_size records, with up to parallelism batches in flight.
+    Progress, elapsed time and throughput are reported by get_load_sample_data_status().
+    """
+    return await run_load_job(BACKEND, "PostgreSQL", insert_transactions_batch, count, batch_size, parallelism, wait)
+
+def get_load_sample_data_status():
+    """
+    Returns the progress of the current or most recent sample data load job.
+    """
+    return get_load_job(BACKEND)
+
+# The current or most recent COPY bulk load
+_bulk_load = CopyLoadJob(BACKEND, "PostgreSQL", TABLE_NAME, get_connection, _key_index)
+
+async def bulk_load_sample_data(count: int, chunk_rows: Optional[int] = None, wait: bool = False):
     """
-    Calls insert_transaction() to insert 1 random record.
+    Streams count generated records into the table with COPY ... FROM STDIN in a
+    background job (wait=True returns when it finishes). Rows are generated while
+    the server reads them, so memory use does not grow with count; each chunk_rows
+    chunk is one COPY and one commit. Only one bulk load runs at a time.
     """
-    for _ in range(1):
-        await insert_transaction(record=None)
-    return {"message": "1 sample record inserted successfully."}
+    return await _bulk_load.start(count, chunk_rows, wait)
 
-async def insert_transaction(record: Optional[dict] = Body(None)):
+def get_bulk_load_progress():
+    """
+    Returns the progress of the current or most recent bulk load.
+    """
+    return _bulk_load.report()
+
+@offload(BACKEND)
+def insert_transaction(record: Optional[dict] = Body(None)):
     """
     Inserts a new transaction record into the table.
     If no record is provided, generates a new random sample record.
@@ -95,10 +147,11 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     )
     """
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(
+            execute_prepared(
+                conn, cursor, BACKEND,
                 insert_sql,
                 (
                     record["transaction_id"],
@@ -114,6 +167,7 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
                 )
             )
         conn.commit()
+        _key_index.add(record["transaction_id"])
         return {
             "message": "Record inserted successfully.",
             "record": {k.lower(): v for k, v in record.items()}
@@ -121,84 +175,256 @@ async def insert_transaction(record: Optional[dict] = Body(None)):
     finally:
         conn.close()
 
-async def select_transaction():
+@offload(BACKEND)
+def insert_transactions_batch(records: list, commit_size: Optional[int] = None):
+    """
+    Inserts a list of transaction records, committing once per commit_size rows.
+    Each chunk is sent as a single multi-row INSERT ... VALUES statement via execute_values.
+    Returns the timing of every batch.
+    """
+    rows = []
+    for record in records:
+        record["transaction_id"] = str(uuid.uuid4())
+        rows.append((
+            record["transaction_id"],
+            record["user_id"],
+            record["transaction_ts"],
+            record["product_id"],
+            record["quantity"],
+            record["unit_price"],
+            record["total_amount"],
+            record["currency"],
+            record["payment_method"],
+            record["status"]
+        ))
+
+    insert_sql = f"""
+    INSERT INTO {TABLE_NAME} (
+        transaction_id, user_id, transaction_ts, product_id,
+        quantity, unit_price, total_amount, currency,
+        payment_method, status
+    ) VALUES %s
+    """
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            def write_batch(chunk):
+                execute_values(cursor, insert_sql, chunk, page_size=len(chunk))
+                conn.commit()
+
+            result = run_batches(rows, commit_size, write_batch)
+        _key_index.add_many(row[0] for row in rows)
+        return {"message": f"{len(rows)} records inserted successfully into PostgreSQL.", **result}
+    finally:
+        conn.close()
+
+def _first_transaction_id(cursor):
+    """
+    Returns the transaction_id of the first row, or None when the table is empty.
+    """
+    cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _update_first_transaction(cursor, new_status: str):
+    """
+    Updates the first row and returns its transaction_id in a single UPDATE ... RETURNING.
+    """
+    cursor.execute(f"""
+        UPDATE {TABLE_NAME} SET status = %s
+        WHERE transaction_id = (SELECT transaction_id FROM {TABLE_NAME} LIMIT 1)
+        RETURNING transaction_id
+    """, (new_status,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _delete_first_transaction(cursor):
+    """
+    Deletes the first row and returns its transaction_id in a single DELETE ... RETURNING.
+    """
+    cursor.execute(f"""
+        DELETE FROM {TABLE_NAME}
+        WHERE transaction_id = (SELECT transaction_id FROM {TABLE_NAME} LIMIT 1)
+        RETURNING transaction_id
+    """)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_update(cursor, new_status: str):
+    """
+    Updates a row no other transaction holds and returns its transaction_id,
+    in a single UPDATE ... RETURNING over a FOR UPDATE SKIP LOCKED subquery.
+    """
+    cursor.execute(f"""
+        UPDATE {TABLE_NAME} SET status = %s
+        WHERE transaction_id = (SELECT transaction_id FROM {TABLE_NAME} LIMIT 1 FOR UPDATE SKIP LOCKED)
+        RETURNING transaction_id
+    """, (new_status,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _claim_delete(cursor):
+    """
+    Deletes a row no other transaction holds and returns its transaction_id,
+    in a single DELETE ... RETURNING over a FOR UPDATE SKIP LOCKED subquery.
+    """
+    cursor.execute(f"""
+        DELETE FROM {TABLE_NAME}
+        WHERE transaction_id = (SELECT transaction_id FROM {TABLE_NAME} LIMIT 1 FOR UPDATE SKIP LOCKED)
+        RETURNING transaction_id
+    """)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+@offload(BACKEND)
+def scan_keys(limit: int) -> list:
+    """
+    Returns a uniform random sample of up to limit transaction_ids to rebuild the
+    key index, streamed from a full key scan so the sample is not the front of the table.
+    """
+    conn = get_connection()
+    # Named cursors live in a transaction, also on sessions configured for autocommit
+    autocommit = get_session_state(conn, "autocommit")
+    try:
+        set_session_autocommit(conn, False)
+        # Named (server-side) cursor, so rows arrive in batches instead of all at once
+        with conn.cursor(name="transaction_id_scan") as cursor:
+            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME}")
+            return sample_keys(cursor, limit)
+    finally:
+        conn.rollback()
+        if autocommit:
+            set_session_autocommit(conn, True)
+        conn.close()
+
+@offload(BACKEND)
+def select_transaction(sampling: Optional[str] = None):
     """
     Retrieves a single random transaction record from the table.
     Returns JSON with column names as keys (lowercase).
+    sampling chooses how the row is picked: 'index' (random key from the key index)
+    or one of SAMPLING_QUERIES; defaults to DB_SAMPLING_<BACKEND> / DB_SAMPLING.
     """
-    select_sql = f"SELECT * FROM {TABLE_NAME} LIMIT 1"
+    strategy = resolve_sampling(BACKEND, sampling, SAMPLING_QUERIES)
+
+    key, record = _result_cache.lookup(_key_index, strategy)
+    if record is not None:
+        return {"record": record, "sampling": strategy, "cached": True}
+    version = _result_cache.version()
+
+    select_sql = f"SELECT * FROM {TABLE_NAME} WHERE transaction_id = %s"
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(select_sql)
-            row = cursor.fetchone()
+            row = None
+            statement = cursor
+            if strategy == INDEX_STRATEGY:
+                for transaction_id in _key_index.candidates(lambda: _first_transaction_id(cursor), key):
+                    statement = execute_prepared(conn, cursor, BACKEND, select_sql, (transaction_id,))
+                    row = statement.fetchone()
+                    if row:
+                        break
+            else:
+                row = sample_row(cursor, SAMPLING_QUERIES, strategy, TABLE_NAME)
 
             if not row:
                 return {"message": "No records found in the table."}
 
-            columns = [col[0] for col in cursor.description]
+            columns = [col[0] for col in statement.description]
             result = {col.lower(): val for col, val in zip(columns, row)}
 
-            return {"record": result}
+            _result_cache.put(result["transaction_id"], result, version)
+            return {"record": result, "sampling": strategy}
     finally:
         conn.close()
 
-async def update_random_transaction_status():
+@offload(BACKEND)
+def update_random_transaction_status(claim: Optional[str] = None):
     """
     Updates the 'status' field of one random transaction record in PostgreSQL.
     Selects a new random status from predefined options.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
+    mode = resolve_claim_mode(BACKEND, claim)
     statuses = ["Completed", "Pending", "Failed", "Refunded"]
     new_status = random.choice(statuses)
 
-    conn = await get_connection()
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1")
-            row = cursor.fetchone()
-
-            if not row:
-                return {"message": "No records found to update in the PostgreSQL table."}
-
-            columns = [col[0] for col in cursor.description]
-            result = {col.lower(): val for col, val in zip(columns, row)}
-            transaction_id = result["transaction_id"]
-
             update_sql = f"""
             UPDATE {TABLE_NAME}
             SET status = %s
             WHERE transaction_id = %s
             """
-            cursor.execute(update_sql, (new_status, transaction_id))
+
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_update(cursor, new_status)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, update_sql, (new_status, candidate)).rowcount:
+                        transaction_id = candidate
+                        break
+
+                if transaction_id is None:
+                    # No live indexed key: update the first row and get its key back in the same statement
+                    transaction_id = _update_first_transaction(cursor, new_status)
+
+            if transaction_id is None:
+                return {"message": "No records found to update in the PostgreSQL table."}
 
         conn.commit()
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Updated status to '{new_status}' for transaction_id {transaction_id} in PostgreSQL."}
     finally:
         conn.close()
 
-async def delete_random_transaction():
+@offload(BACKEND)
+def delete_random_transaction(claim: Optional[str] = None):
     """
     Deletes one random transaction record from the PostgreSQL table.
     No parameters required.
+    claim 'skip_locked' claims a row no other transaction holds instead of a random indexed key.
     """
-    conn = await get_connection()
+    mode = resolve_claim_mode(BACKEND, claim)
+    conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute(f"SELECT transaction_id FROM {TABLE_NAME} LIMIT 1")
-            row = cursor.fetchone()
+            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = %s"
 
-            if not row:
-                return {"message": "No records found to delete in the PostgreSQL table."}
+            transaction_id = None
+            if mode == SKIP_LOCKED:
+                transaction_id = _claim_delete(cursor)
+            else:
+                for candidate in _key_index.candidates():
+                    if execute_prepared(conn, cursor, BACKEND, delete_sql, (candidate,)).rowcount:
+                        transaction_id = candidate
+                        break
 
-            columns = [col[0] for col in cursor.description]
-            result = {col.lower(): val for col, val in zip(columns, row)}
-            transaction_id = result["transaction_id"]
+                if transaction_id is None:
+                    # No live indexed key: delete the first row and get its key back in the same statement
+                    transaction_id = _delete_first_transaction(cursor)
 
-            delete_sql = f"DELETE FROM {TABLE_NAME} WHERE transaction_id = %s"
-            cursor.execute(delete_sql, (transaction_id,))
+            if transaction_id is None:
+                return {"message": "No records found to delete in the PostgreSQL table."}
 
         conn.commit()
+        _key_index.discard(transaction_id)
+        _result_cache.invalidate(transaction_id)
         return {"message": f"Deleted transaction with ID {transaction_id} from PostgreSQL."}
     finally:
         conn.close()
+
+# asyncpg mode (DB_ENGINE_MODE_POSTGRESQL=async):
+# replace the thread-pool implementations with asyncpg coroutines using prepared statement caching.
+if use_async_engine(BACKEND):
+    _async_service = AsyncPostgreSQLService(get_postgresql_asyncpg_pool, PARAM_NAME, TABLE_NAME, CREATE_TABLE_SQL, "PostgreSQL", BACKEND)
+    initialize_table = _async_service.initialize_table
+    insert_transaction = _async_service.insert_transaction
+    insert_transactions_batch = _async_service.insert_transactions_batch
+    select_transaction = _async_service.select_transaction
+    update_random_transaction_status = _async_service.update_random_transaction_status
+    delete_random_transaction = _async_service.delete_random_transaction
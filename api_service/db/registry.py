@@ -0,0 +1,119 @@
+# registry.py
+# Theodor Harmse - University of Liverpool
+# Lazy backend registry: service modules (and their drivers) are imported on first use, for enabled backends only
+
+import asyncio
+import importlib
+import inspect
+import os
+import time
+from threading import Lock
+
+from api_service.db.executor import BACKENDS
+
+# Set DB_PRELOAD_BACKENDS=1 to import every enabled backend during startup instead of on first request
+PRELOAD_BACKENDS = os.environ.get("DB_PRELOAD_BACKENDS", "0") == "1"
+
+_services = {}
+_import_report = {}
+_load_listeners = []
+_lock = Lock()
+
+
+class BackendDisabledError(LookupError):
+    pass
+
+
+def get_enabled_backends(backends: tuple = BACKENDS) -> tuple:
+    """
+    Returns the given backends (default all) that are listed in DB_ENABLED_BACKENDS
+    (comma separated, case insensitive), or all of them when it is unset. This is
+    the only parser of DB_ENABLED_BACKENDS.
+    """
+    configured = os.environ.get("DB_ENABLED_BACKENDS", "").strip()
+    if not configured:
+        return tuple(backends)
+    enabled = {name.strip().lower() for name in configured.split(",") if name.strip()}
+    return tuple(backend for backend in backends if backend in enabled)
+
+
+def is_enabled(backend: str) -> bool:
+    return backend in get_enabled_backends()
+
+
+def is_loaded(backend: str) -> bool:
+    return backend in _services
+
+
+def get_service(backend: str):
+    """
+    Returns the backend's service module, importing it (and its database driver) on first use.
+    """
+    service = _services.get(backend)
+    if service is not None:
+        return service
+    if not is_enabled(backend):
+        raise BackendDisabledError(f"Backend '{backend}' is not enabled (DB_ENABLED_BACKENDS).")
+    with _lock:
+        if backend in _services:
+            return _services[backend]
+        start = time.perf_counter()
+        try:
+            service = _services[backend] = importlib.import_module(f"api_service.db.{backend}_service")
+        except Exception as e:
+            _import_report[backend] = {"seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+            raise
+        _import_report[backend] = {"seconds": round(time.perf_counter() - start, 3)}
+    for listener in _load_listeners:
+        listener(backend)
+    return service
+
+
+def add_load_listener(listener):
+    """
+    Registers listener(backend), called once after a backend is imported (in the importing thread).
+    """
+    _load_listeners.append(listener)
+
+
+def service_function(backend: str, name: str):
+    """
+    Async stand-in for <backend>_service.<name> that imports the backend on its
+    first call, in a worker thread so the import never blocks the event loop.
+    The attribute is looked up on every call, so async engine rebinding is
+    honoured; sync functions are called directly and their result returned.
+    """
+    async def call(*args, **kwargs):
+        service = _services.get(backend)
+        if service is None:
+            service = await asyncio.to_thread(get_service, backend)
+        result = getattr(service, name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    call.__name__ = name
+    call.__qualname__ = f"{backend}.{name}"
+    return call
+
+
+def preload_backends() -> dict:
+    """
+    Imports every enabled backend now (DB_PRELOAD_BACKENDS=1), recording failures instead of raising.
+    """
+    for backend in get_enabled_backends():
+        try:
+            get_service(backend)
+        except Exception:
+            pass
+    return get_backend_report()
+
+
+def get_backend_report() -> dict:
+    """
+    Returns, per backend, whether it is enabled and loaded, and how long its import took.
+    """
+    return {
+        backend: {"enabled": is_enabled(backend), "loaded": is_loaded(backend), **_import_report.get(backend, {})}
+        for backend in BACKENDS
+    }
@@ -0,0 +1,213 @@
+# result_cache.py
+# Theodor Harmse - University of Liverpool
+# Optional in-process read-through cache of select-random records per backend, invalidated by writes
+
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from api_service.db.sampling import INDEX_STRATEGY
+
+# Off unless DB_RESULT_CACHE=1 (or DB_RESULT_CACHE_<BACKEND>=1), so raw engine latency stays the default
+RESULT_CACHE_ENABLED = os.environ.get("DB_RESULT_CACHE", "0") == "1"
+
+# Seconds a cached record is served before it is read from the database again
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get("DB_RESULT_CACHE_TTL_SECONDS", "5"))
+
+# Records kept per backend
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("DB_RESULT_CACHE_MAX_ENTRIES", "10000"))
+
+# 'lru' evicts the least recently used record; 'tinylfu' also only admits a new
+# record when it has been requested more often than the record it would evict
+RESULT_CACHE_POLICIES = ("lru", "tinylfu")
+RESULT_CACHE_POLICY = os.environ.get("DB_RESULT_CACHE_POLICY", "lru").lower()
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent request frequencies (4 rows of counters capped
+    at 15). Every counter is halved after 10 * capacity increments, so the
+    estimates follow recent traffic rather than all-time counts.
+    """
+
+    _DEPTH = 4
+    _MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        self._mask = (1 << max(4, (max(1, capacity) * 2 - 1).bit_length())) - 1
+        self._rows = [[0] * (self._mask + 1) for _ in range(self._DEPTH)]
+        self._sample_size = 10 * max(1, capacity)
+        self._additions = 0
+
+    def _slots(self, key):
+        return [(row, hash((row, key)) & self._mask) for row in range(self._DEPTH)]
+
+    def increment(self, key):
+        for row, slot in self._slots(key):
+            if self._rows[row][slot] < self._MAX_COUNT:
+                self._rows[row][slot] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            for counters in self._rows:
+                for slot, value in enumerate(counters):
+                    counters[slot] = value >> 1
+            self._additions //= 2
+
+    def estimate(self, key) -> int:
+        return min(self._rows[row][slot] for row, slot in self._slots(key))
+
+
+class ResultCache:
+    """
+    transaction_id -> record map with a TTL per entry and a bounded size.
+    Keys are compared case-insensitively, since some drivers return GUIDs in upper case.
+
+    Every invalidation bumps a generation counter and remembers it for the key, so a
+    reader that took version() before its database read cannot put back a record
+    that a concurrent update or delete has invalidated in the meantime.
+    """
+
+    def __init__(self, enabled: bool = RESULT_CACHE_ENABLED, ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+                 max_entries: int = RESULT_CACHE_MAX_ENTRIES, policy: str = RESULT_CACHE_POLICY):
+        self.enabled = enabled
+        self._ttl = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._policy = policy if policy in RESULT_CACHE_POLICIES else "lru"
+        self._sketch = FrequencySketch(self._max_entries) if self._policy == "tinylfu" else None
+        self._entries = OrderedDict()
+        # key -> generation of its latest invalidation, bounded like the entries;
+        # _floor is the newest generation forgotten, which puts older than it must assume
+        self._generation = 0
+        self._invalidated = OrderedDict()
+        self._floor = 0
+        self._lock = Lock()
+        self.stale_puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, transaction_id):
+        """
+        Returns the cached record for transaction_id, or None on a miss or an expired entry.
+        """
+        if not self.enabled or transaction_id is None:
+            return None
+        key = str(transaction_id).lower()
+        with self._lock:
+            if self._sketch is not None:
+                self._sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, record = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return record
+
+    def lookup(self, key_index, strategy: str):
+        """
+        Read-through lookup for select-random: with index sampling, draws a random key
+        from key_index and returns (key, cached record). A hit needs no connection; on a
+        miss the record is None and the caller looks the same key up in the database.
+        Returns (None, None) when the cache is off or another strategy is used.
+        """
+        if strategy != INDEX_STRATEGY or not self.enabled:
+            return None, None
+        key = key_index.random_key()
+        return key, self.get(key)
+
+    def version(self) -> int:
+        """
+        Returns a token to take before reading a record from the database and pass to put().
+        """
+        return self._generation
+
+    def put(self, transaction_id, record: dict, version: int = None):
+        """
+        Caches record, unless transaction_id was invalidated after version was taken.
+        """
+        if not self.enabled or transaction_id is None:
+            return
+        key = str(transaction_id).lower()
+        with self._lock:
+            if version is not None and max(self._floor, self._invalidated.get(key, 0)) > version:
+                self.stale_puts += 1
+                return
+            if key not in self._entries and len(self._entries) >= self._max_entries:
+                victim = next(iter(self._entries))
+                if self._sketch is not None and self._sketch.estimate(key) <= self._sketch.estimate(victim):
+                    self.rejections += 1
+                    return
+                del self._entries[victim]
+                self.evictions += 1
+            self._entries[key] = (time.monotonic() + self._ttl, record)
+            self._entries.move_to_end(key)
+
+    def invalidate(self, transaction_id):
+        if not self.enabled or transaction_id is None:
+            return
+        key = str(transaction_id).lower()
+        with self._lock:
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > self._max_entries:
+                _, self._floor = self._invalidated.popitem(last=False)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "policy": self._policy,
+            "ttl_seconds": self._ttl,
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts
+        }
+
+
+_caches = {}
+_caches_lock = Lock()
+
+
+def get_result_cache(backend: str) -> ResultCache:
+    cache = _caches.get(backend)
+    if cache is not None:
+        return cache
+    with _caches_lock:
+        if backend not in _caches:
+            enabled = os.environ.get(f"DB_RESULT_CACHE_{backend.upper()}", "1" if RESULT_CACHE_ENABLED else "0") == "1"
+            _caches[backend] = ResultCache(enabled=enabled)
+        return _caches[backend]
+
+
+def clear_result_caches():
+    for cache in _caches.values():
+        cache.clear()
+
+
+def get_result_cache_report() -> dict:
+    return {backend: cache.stats() for backend, cache in _caches.items()}
@@ -0,0 +1,50 @@
+# sample_data.py
+# Theodor Harmse - University of Liverpool
+# Random transaction_records rows for bulk seeding, generated lazily so memory stays bounded
+
+import uuid
+import random
+from datetime import datetime, timedelta
+
+CURRENCIES = ["USD", "EUR", "GBP"]
+PAYMENT_METHODS = ["CreditCard", "DebitCard", "PayPal", "ApplePay"]
+STATUSES = ["Completed", "Pending", "Failed", "Refunded"]
+
+# Column order used by the bulk loaders
+COLUMNS = (
+    "transaction_id", "user_id", "transaction_ts", "product_id",
+    "quantity", "unit_price", "total_amount", "currency",
+    "payment_method", "status"
+)
+
+
+def generate_sample_record() -> dict:
+    """
+    Returns one random transaction record with a new transaction_id,
+    using the same value ranges as the services' insert_transaction().
+    """
+    quantity = random.randint(1, 5)
+    unit_price = round(random.uniform(5.0, 100.0), 2)
+    total_amount = round(quantity * unit_price, 2)
+
+    return {
+        "transaction_id": str(uuid.uuid4()),
+        "user_id": f"user-{random.randint(100, 999)}",
+        "transaction_ts": (datetime.utcnow() - timedelta(days=random.randint(0, 30))).strftime('%Y-%m-%d %H:%M:%S'),
+        "product_id": f"product-{random.randint(1, 50)}",
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total_amount": total_amount,
+        "currency": random.choice(CURRENCIES),
+        "payment_method": random.choice(PAYMENT_METHODS),
+        "status": random.choice(STATUSES)
+    }
+
+
+def generate_sample_rows(count: int):
+    """
+    Yields count random rows as tuples in COLUMNS order.
+    """
+    for _ in range(count):
+        record = generate_sample_record()
+        yield tuple(record[column] for column in COLUMNS)
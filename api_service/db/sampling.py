@@ -0,0 +1,74 @@
+# sampling.py
+# Theodor Harmse - University of Liverpool
+# Database-side row sampling strategies for select-random, selectable per request
+
+import os
+import random
+import uuid
+
+# Percentage of the table (or of its pages) that TABLESAMPLE / SAMPLE strategies read
+SAMPLE_PERCENT = float(os.environ.get("DB_SAMPLE_PERCENT", "1"))
+
+# 'index' draws a random key from the in-process key index; every other
+# strategy is a query in the service's SAMPLING_QUERIES
+INDEX_STRATEGY = "index"
+
+
+def resolve_sampling(backend: str, requested: str, queries: dict, key_index=None) -> str:
+    """
+    Returns the sampling strategy for a request: the requested one, else
+    DB_SAMPLING_<BACKEND>, else DB_SAMPLING, else 'index'. An unsupported
+    requested strategy is an error; an unsupported configured default falls back to 'index'.
+    When key_index is given and still empty, the unconfigured default is 'seek'
+    (when supported), since 'index' would only fall back to the first row.
+    """
+    supported = (INDEX_STRATEGY, *queries)
+    if requested:
+        if requested not in supported:
+            raise ValueError(f"Unknown sampling strategy '{requested}', expected one of {', '.join(supported)}.")
+        return requested
+    default = os.environ.get(f"DB_SAMPLING_{backend.upper()}", os.environ.get("DB_SAMPLING"))
+    if default in supported:
+        return default
+    if key_index is not None and len(key_index) == 0 and "seek" in supported:
+        return "seek"
+    return INDEX_STRATEGY
+
+
+def sample_row(cursor, queries: dict, strategy: str, table: str):
+    """
+    Runs the strategy's query on a DB-API cursor and returns one row.
+    'seek' queries take a random UUID to range-seek from. When a sample comes
+    back empty (a small table, or a seek past the last key) the 'first' query is used.
+    """
+    query = queries[strategy].format(table=table, percent=SAMPLE_PERCENT)
+    if strategy == "seek":
+        cursor.execute(query, (str(uuid.uuid4()),))
+    else:
+        cursor.execute(query)
+    row = cursor.fetchone()
+    if not row and strategy != "first":
+        cursor.execute(queries["first"].format(table=table, percent=SAMPLE_PERCENT))
+        row = cursor.fetchone()
+    return row
+
+
+# Parallel-scan segments a DynamoDB 'segment' sample picks one from at random
+SCAN_SEGMENTS = int(os.environ.get("DYNAMODB_SCAN_SEGMENTS", "16"))
+
+# DynamoDB has no SQL sampling: 'first' scans from the start of the table,
+# 'segment' scans one random parallel-scan segment and 'seek' scans from a
+# random UUID ExclusiveStartKey, which lands at a random point of the hash order
+SCAN_STRATEGIES = ("first", "segment", "seek")
+
+
+def scan_sample_kwargs(strategy: str) -> dict:
+    """
+    Returns the Scan arguments that read one transaction_id for a DynamoDB strategy.
+    """
+    kwargs = {"Limit": 1, "ProjectionExpression": "transaction_id"}
+    if strategy == "segment":
+        kwargs.update(Segment=random.randrange(SCAN_SEGMENTS), TotalSegments=SCAN_SEGMENTS)
+    elif strategy == "seek":
+        kwargs["ExclusiveStartKey"] = {"transaction_id": str(uuid.uuid4())}
+    return kwargs
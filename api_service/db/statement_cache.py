@@ -0,0 +1,189 @@
+# statement_cache.py
+# Theodor Harmse - University of Liverpool
+# Prepared statements cached per pooled connection, with hit rate metrics per backend
+
+import os
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+
+# Set DB_PREPARED_STATEMENTS=0 to send every statement as unprepared text
+PREPARED_STATEMENTS_ENABLED = os.environ.get("DB_PREPARED_STATEMENTS", "1") != "0"
+
+# Prepared statements kept per physical connection (also the Oracle driver statement cache size)
+STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "64"))
+
+_stats = {}
+_stats_lock = Lock()
+
+# PostgreSQL prepared statement names only need to be unique per session
+_statement_names = count(1)
+
+
+def _record(backend: str, event: str):
+    with _stats_lock:
+        stats = _stats.setdefault(backend, {"hits": 0, "misses": 0, "evictions": 0})
+        stats[event] += 1
+
+
+class StatementCache:
+    """
+    LRU of prepared statements for one physical connection, kept in the pool's
+    connection info so it lives exactly as long as the connection. The driver
+    specific prepare and release functions are passed on each lookup.
+    """
+
+    def __init__(self, backend: str, size: int = STATEMENT_CACHE_SIZE):
+        self._backend = backend
+        self._size = max(1, size)
+        self._statements = OrderedDict()
+
+    def get(self, sql: str, prepare, release=None):
+        statement = self._statements.get(sql)
+        if statement is not None:
+            self._statements.move_to_end(sql)
+            _record(self._backend, "hits")
+            return statement
+        statement = prepare(sql)
+        self._statements[sql] = statement
+        _record(self._backend, "misses")
+        if len(self._statements) > self._size:
+            _, evicted = self._statements.popitem(last=False)
+            if release is not None:
+                release(evicted)
+            _record(self._backend, "evictions")
+        return statement
+
+
+def get_statement_cache(conn, backend: str) -> StatementCache:
+    cache = conn.info.get("statement_cache")
+    if cache is None:
+        cache = conn.info["statement_cache"] = StatementCache(backend)
+    return cache
+
+
+class _Db2Statement:
+    """
+    Cursor-like view of a prepared ibm_db statement handle: fetchone, rowcount and description.
+    """
+
+    def __init__(self, ibm_db, handle):
+        self._ibm_db = ibm_db
+        self._handle = handle
+
+    @property
+    def rowcount(self) -> int:
+        return self._ibm_db.num_rows(self._handle)
+
+    @property
+    def description(self) -> list:
+        return [(self._ibm_db.field_name(self._handle, i),) for i in range(self._ibm_db.num_fields(self._handle))]
+
+    def fetchone(self):
+        return self._ibm_db.fetch_tuple(self._handle) or None
+
+
+class _FetchedResult:
+    """
+    Cursor-like view of a result read in full: fetchone, rowcount and description.
+    """
+
+    def __init__(self, cursor):
+        self.rowcount = cursor.rowcount
+        self.description = cursor.description
+        self._rows = list(cursor.fetchall()) if cursor.description else []
+        while cursor.nextset():
+            pass
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+
+def _execute_postgresql(conn, cursor, backend: str, sql: str, params: tuple):
+    # PREPARE once per session, then EXECUTE name (...) skips parse and plan
+    def prepare(sql):
+        name = f"transaction_records_{next(_statement_names)}"
+        parts = sql.split("%s")
+        body = parts[0] + "".join(f"${i}{part}" for i, part in enumerate(parts[1:], 1))
+        cursor.execute(f"PREPARE {name} AS {body}")
+        return name
+
+    name = get_statement_cache(conn, backend).get(sql, prepare, lambda name: cursor.execute(f"DEALLOCATE {name}"))
+    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    return cursor
+
+
+def _execute_mssql(conn, cursor, backend: str, sql: str, params: tuple):
+    # pyodbc re-executes a cursor's prepared statement when the SQL text is unchanged,
+    # so each statement keeps its own cursor on the connection
+    statement_cursor = get_statement_cache(conn, backend).get(sql, lambda sql: conn.cursor(), lambda cursor: cursor.close())
+    statement_cursor.execute(sql, params)
+    # Without MARS a connection serves one pending result set at a time, so results
+    # are read (and remaining sets skipped) now, leaving every cached cursor idle
+    return _FetchedResult(statement_cursor)
+
+
+def _execute_oracle(conn, cursor, backend: str, sql: str, params: tuple):
+    # cx_Oracle reuses parsed statements from the connection's stmtcachesize cache
+    # (sized in the session initializer). The driver does not expose that cache's
+    # hits, so no hit rate is recorded for Oracle (see UNMEASURED_BACKENDS)
+    cursor.execute(sql, params)
+    return cursor
+
+
+def prepare_ibmdb2(conn, backend: str, sql: str):
+    """
+    Returns an ibm_db statement handle for sql, prepared once per pooled connection.
+    """
+    # ibm_db_dbi prepares on every execute, so statement handles are prepared once with ibm_db
+    import ibm_db
+
+    return get_statement_cache(conn, backend).get(
+        sql, lambda sql: ibm_db.prepare(conn.dbapi_connection.conn_handler, sql), ibm_db.free_stmt
+    )
+
+
+def _execute_ibmdb2(conn, cursor, backend: str, sql: str, params: tuple):
+    import ibm_db
+
+    handle = prepare_ibmdb2(conn, backend, sql)
+    ibm_db.execute(handle, tuple(params))
+    return _Db2Statement(ibm_db, handle)
+
+
+# Backends whose statement cache lives in the driver without hit counters
+UNMEASURED_BACKENDS = {"oracle": "cx_Oracle stmtcachesize (driver cache, hit rate not exposed)"}
+
+_EXECUTORS = {
+    "postgresql": _execute_postgresql,
+    "aurora_postgresql": _execute_postgresql,
+    "mssql": _execute_mssql,
+    "oracle": _execute_oracle,
+    "ibmdb2": _execute_ibmdb2
+}
+
+
+def execute_prepared(conn, cursor, backend: str, sql: str, params: tuple = ()):
+    """
+    Executes sql with a statement prepared once per pooled connection and
+    returns the cursor (or cursor-like statement) holding its results.
+    """
+    if not PREPARED_STATEMENTS_ENABLED:
+        cursor.execute(sql, params)
+        return cursor
+    return _EXECUTORS[backend](conn, cursor, backend, sql, params)
+
+
+def get_statement_cache_report() -> dict:
+    with _stats_lock:
+        stats = {backend: dict(counts) for backend, counts in _stats.items()}
+    for counts in stats.values():
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else None
+    for backend, cache in UNMEASURED_BACKENDS.items():
+        stats[backend] = {"cache": cache, "hits": None, "misses": None, "evictions": None, "hit_rate": None}
+    return {
+        "enabled": PREPARED_STATEMENTS_ENABLED,
+        "cache_size": STATEMENT_CACHE_SIZE,
+        "backends": stats
+    }
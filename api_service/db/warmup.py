@@ -0,0 +1,97 @@
+# warmup.py
+# Theodor Harmse - University of Liverpool
+# Connection pool warm-up at application startup, so the first wave of requests does not pay connection setup
+
+import asyncio
+import os
+import time
+
+from api_service.db.executor import run_blocking
+from api_service.db.pool_config import SQL_BACKENDS, get_pool_kwargs
+from api_service.db.registry import get_enabled_backends, get_service
+
+# Connections to pre-open per pool at startup. Unset, each pool is filled to its
+# pool_size; 0 disables warm-up. Override per backend with DB_WARMUP_CONNECTIONS_<BACKEND>.
+DEFAULT_WARMUP_CONNECTIONS = os.environ.get("DB_WARMUP_CONNECTIONS")
+
+_ready = False
+_report = {}
+
+
+def get_warmup_connections(backend: str) -> int:
+    """
+    Returns the number of connections to pre-open for the backend, at most
+    pool_size + max_overflow: holding more open at once would make the extra
+    checkouts wait out the pool timeout.
+    """
+    pool = get_pool_kwargs(backend)
+    configured = os.environ.get(f"DB_WARMUP_CONNECTIONS_{backend.upper()}", DEFAULT_WARMUP_CONNECTIONS)
+    requested = pool["pool_size"] if configured is None else int(configured)
+    return max(0, min(requested, pool["pool_size"] + pool["max_overflow"]))
+
+
+def _close_all(connections):
+    for conn in connections:
+        conn.close()
+
+
+async def _warm_up_backend(backend: str, connections: int) -> dict:
+    """
+    Opens the requested number of connections at the same time, so the pool has
+    to establish that many physical connections, then returns them to the pool.
+    """
+    start = time.perf_counter()
+    try:
+        # First use imports the backend's driver, so it runs off the event loop
+        service = await asyncio.to_thread(get_service, backend)
+        async_service = getattr(service, "_async_service", None)
+
+        if async_service is not None:
+            opened = await async_service.warm_up(connections)
+            errors = []
+        else:
+            results = await asyncio.gather(
+                *(run_blocking(backend, service.get_connection) for _ in range(connections)),
+                return_exceptions=True
+            )
+            held = [conn for conn in results if not isinstance(conn, Exception)]
+            errors = [str(e) for e in results if isinstance(e, Exception)]
+            await run_blocking(backend, _close_all, held)
+            opened = len(held)
+
+        result = {"requested": connections, "opened": opened}
+        if errors:
+            result["error"] = errors[0]
+    except Exception as e:
+        result = {"requested": connections, "opened": 0, "error": str(e)}
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+async def warm_up_pools() -> dict:
+    """
+    Creates the engines of the enabled backends and pre-opens their pools, in
+    parallel across backends. Marks the application ready when finished.
+    """
+    global _ready, _report
+    targets = {backend: get_warmup_connections(backend) for backend in get_enabled_backends(SQL_BACKENDS)}
+    targets = {backend: connections for backend, connections in targets.items() if connections > 0}
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(_warm_up_backend(backend, connections) for backend, connections in targets.items())
+    )
+    _report = {
+        "seconds": round(time.perf_counter() - start, 3),
+        "backends": dict(zip(targets, results))
+    }
+    _ready = True
+    return _report
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def get_warmup_report() -> dict:
+    return {"ready": _ready, **_report}
@@ -2,111 +2,157 @@
 # Theodor Harmse - University of Liverpool
 # FastAPI app exposing MySQL and Aurora MySQL transaction_records service endpoints
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional
-
-# Import MySQL service functions
-from api_service.db.mysql_service import (
-    initialize_table as mysql_initialize_table,
-    load_sample_data as mysql_load_sample_data,
-    select_transaction as mysql_select_transaction,
-    insert_transaction as mysql_insert_transaction,
-    update_random_transaction_status as mysql_update_random_transaction_status,
-    delete_random_transaction as mysql_delete_random_transaction
-)
-
-# Import Aurora MySQL service functions
-from api_service.db.aurora_mysql_service import (
-    initialize_table as aurora_initialize_table,
-    load_sample_data as aurora_load_sample_data,
-    select_transaction as aurora_select_transaction,
-    insert_transaction as aurora_insert_transaction,
-    update_random_transaction_status as aurora_update_random_transaction_status,
-    delete_random_transaction as aurora_delete_random_transaction
-)
-
-
-# Import PostgreSQL service functions
-from api_service.db.postgresql_service import (
-    initialize_table as postgresql_initialize_table,
-    load_sample_data as postgresql_load_sample_data,
-    select_transaction as postgresql_select_transaction,
-    insert_transaction as postgresql_insert_transaction,
-    update_random_transaction_status as postgresql_update_random_transaction_status,
-    delete_random_transaction as postgresql_delete_random_transaction
-)
-
-
-# Import Aurora PostgreSQL service functions
-from api_service.db.aurora_postgresql_service import (
-    initialize_table as aurora_postgresql_initialize_table,
-    load_sample_data as aurora_postgresql_load_sample_data,
-    select_transaction as aurora_postgresql_select_transaction,
-    insert_transaction as aurora_postgresql_insert_transaction,
-    update_random_transaction_status as aurora_postgresql_update_random_transaction_status,
-    delete_random_transaction as aurora_postgresql_delete_random_transaction
-)
-
-
-# Import MariaDB service functions
-from api_service.db.mariadb_service import (
-    initialize_table as mariadb_initialize_table,
-    load_sample_data as mariadb_load_sample_data,
-    select_transaction as mariadb_select_transaction,
-    insert_transaction as mariadb_insert_transaction,
-    update_random_transaction_status as mariadb_update_random_transaction_status,
-    delete_random_transaction as mariadb_delete_random_transaction
-)
-
-
-# Import Microsoft SQL Server service functions
-from api_service.db.mssql_service import (
-    initialize_table as mssql_initialize_table,
-    load_sample_data as mssql_load_sample_data,
-    select_transaction as mssql_select_transaction,
-    insert_transaction as mssql_insert_transaction,
-    update_random_transaction_status as mssql_update_random_transaction_status,
-    delete_random_transaction as mssql_delete_random_transaction
-)
-
-
-# Import Oracle service functions
-from api_service.db.oracle_service import (
-    initialize_table as oracle_initialize_table,
-    load_sample_data as oracle_load_sample_data,
-    select_transaction as oracle_select_transaction,
-    insert_transaction as oracle_insert_transaction,
-    update_random_transaction_status as oracle_update_random_transaction_status,
-    delete_random_transaction as oracle_delete_random_transaction
-)
-
-
-# Import DynamoDB service functions
-from api_service.db.dynamodb_service import (
-    initialize_table as dynamodb_initialize_table,
-    load_sample_data as dynamodb_load_sample_data,
-    select_transaction as dynamodb_select_transaction,
-    insert_transaction as dynamodb_insert_transaction,
-    update_random_transaction_status as dynamodb_update_random_transaction_status,
-    delete_random_transaction as dynamodb_delete_random_transaction
-)
-
-# Import IBM DB2 service functions
-from api_service.db.ibmdb2_service import (
-    initialize_table as ibmdb2_initialize_table,
-    load_sample_data as ibmdb2_load_sample_data,
-    select_transaction as ibmdb2_select_transaction,
-    insert_transaction as ibmdb2_insert_transaction,
-    update_random_transaction_status as ibmdb2_update_random_transaction_status,
-    delete_random_transaction as ibmdb2_delete_random_transaction
-)
+from typing import List, Optional
+
+from api_service.db.base import dispose_async_engines, get_lock_stats, reset_engines, use_async_engine
+from api_service.db.executor import get_executor_stats, shutdown_executors
+from api_service.db.key_index import get_key_index_report, refresh_key_indexes, run_key_index_refresher
+from api_service.db.pool_config import get_pool_report, rebalance as rebalance_pools
+from api_service.db.registry import PRELOAD_BACKENDS, get_backend_report, is_enabled, is_loaded, preload_backends, service_function
+from api_service.db.result_cache import clear_result_caches, get_result_cache_report
+from api_service.db.statement_cache import get_statement_cache_report
+from api_service.db.warmup import get_warmup_report, is_ready, warm_up_pools
+
+# MySQL service functions, imported on first use
+mysql_initialize_table = service_function("mysql", "initialize_table")
+mysql_load_sample_data = service_function("mysql", "load_sample_data")
+mysql_get_load_sample_data_status = service_function("mysql", "get_load_sample_data_status")
+mysql_select_transaction = service_function("mysql", "select_transaction")
+mysql_insert_transaction = service_function("mysql", "insert_transaction")
+mysql_insert_transactions_batch = service_function("mysql", "insert_transactions_batch")
+mysql_update_random_transaction_status = service_function("mysql", "update_random_transaction_status")
+mysql_delete_random_transaction = service_function("mysql", "delete_random_transaction")
+
+# Aurora MySQL service functions, imported on first use
+aurora_initialize_table = service_function("aurora_mysql", "initialize_table")
+aurora_load_sample_data = service_function("aurora_mysql", "load_sample_data")
+aurora_get_load_sample_data_status = service_function("aurora_mysql", "get_load_sample_data_status")
+aurora_select_transaction = service_function("aurora_mysql", "select_transaction")
+aurora_insert_transaction = service_function("aurora_mysql", "insert_transaction")
+aurora_insert_transactions_batch = service_function("aurora_mysql", "insert_transactions_batch")
+aurora_update_random_transaction_status = service_function("aurora_mysql", "update_random_transaction_status")
+aurora_delete_random_transaction = service_function("aurora_mysql", "delete_random_transaction")
+
+
+# PostgreSQL service functions, imported on first use
+postgresql_initialize_table = service_function("postgresql", "initialize_table")
+postgresql_load_sample_data = service_function("postgresql", "load_sample_data")
+postgresql_get_load_sample_data_status = service_function("postgresql", "get_load_sample_data_status")
+postgresql_bulk_load_sample_data = service_function("postgresql", "bulk_load_sample_data")
+postgresql_get_bulk_load_progress = service_function("postgresql", "get_bulk_load_progress")
+postgresql_select_transaction = service_function("postgresql", "select_transaction")
+postgresql_insert_transaction = service_function("postgresql", "insert_transaction")
+postgresql_insert_transactions_batch = service_function("postgresql", "insert_transactions_batch")
+postgresql_update_random_transaction_status = service_function("postgresql", "update_random_transaction_status")
+postgresql_delete_random_transaction = service_function("postgresql", "delete_random_transaction")
+
+
+# Aurora PostgreSQL service functions, imported on first use
+aurora_postgresql_initialize_table = service_function("aurora_postgresql", "initialize_table")
+aurora_postgresql_load_sample_data = service_function("aurora_postgresql", "load_sample_data")
+aurora_postgresql_get_load_sample_data_status = service_function("aurora_postgresql", "get_load_sample_data_status")
+aurora_postgresql_bulk_load_sample_data = service_function("aurora_postgresql", "bulk_load_sample_data")
+aurora_postgresql_get_bulk_load_progress = service_function("aurora_postgresql", "get_bulk_load_progress")
+aurora_postgresql_select_transaction = service_function("aurora_postgresql", "select_transaction")
+aurora_postgresql_insert_transaction = service_function("aurora_postgresql", "insert_transaction")
+aurora_postgresql_insert_transactions_batch = service_function("aurora_postgresql", "insert_transactions_batch")
+aurora_postgresql_update_random_transaction_status = service_function("aurora_postgresql", "update_random_transaction_status")
+aurora_postgresql_delete_random_transaction = service_function("aurora_postgresql", "delete_random_transaction")
+
+
+# MariaDB service functions, imported on first use
+mariadb_initialize_table = service_function("mariadb", "initialize_table")
+mariadb_load_sample_data = service_function("mariadb", "load_sample_data")
+mariadb_get_load_sample_data_status = service_function("mariadb", "get_load_sample_data_status")
+mariadb_select_transaction = service_function("mariadb", "select_transaction")
+mariadb_insert_transaction = service_function("mariadb", "insert_transaction")
+mariadb_insert_transactions_batch = service_function("mariadb", "insert_transactions_batch")
+mariadb_update_random_transaction_status = service_function("mariadb", "update_random_transaction_status")
+mariadb_delete_random_transaction = service_function("mariadb", "delete_random_transaction")
+
+
+# Microsoft SQL Server service functions, imported on first use
+mssql_initialize_table = service_function("mssql", "initialize_table")
+mssql_load_sample_data = service_function("mssql", "load_sample_data")
+mssql_get_load_sample_data_status = service_function("mssql", "get_load_sample_data_status")
+mssql_bulk_load_sample_data = service_function("mssql", "bulk_load_sample_data")
+mssql_benchmark_bulk_strategies = service_function("mssql", "benchmark_bulk_strategies")
+mssql_select_transaction = service_function("mssql", "select_transaction")
+mssql_insert_transaction = service_function("mssql", "insert_transaction")
+mssql_insert_transactions_batch = service_function("mssql", "insert_transactions_batch")
+mssql_update_random_transaction_status = service_function("mssql", "update_random_transaction_status")
+mssql_delete_random_transaction = service_function("mssql", "delete_random_transaction")
+
+
+# Oracle service functions, imported on first use
+oracle_initialize_table = service_function("oracle", "initialize_table")
+oracle_load_sample_data = service_function("oracle", "load_sample_data")
+oracle_get_load_sample_data_status = service_function("oracle", "get_load_sample_data_status")
+oracle_bulk_load_sample_data = service_function("oracle", "bulk_load_sample_data")
+oracle_select_transaction = service_function("oracle", "select_transaction")
+oracle_insert_transaction = service_function("oracle", "insert_transaction")
+oracle_insert_transactions_batch = service_function("oracle", "insert_transactions_batch")
+oracle_update_random_transaction_status = service_function("oracle", "update_random_transaction_status")
+oracle_delete_random_transaction = service_function("oracle", "delete_random_transaction")
+
+
+# DynamoDB service functions, imported on first use
+dynamodb_initialize_table = service_function("dynamodb", "initialize_table")
+dynamodb_load_sample_data = service_function("dynamodb", "load_sample_data")
+dynamodb_get_load_sample_data_status = service_function("dynamodb", "get_load_sample_data_status")
+dynamodb_bulk_load_sample_data = service_function("dynamodb", "bulk_load_sample_data")
+dynamodb_select_transaction = service_function("dynamodb", "select_transaction")
+dynamodb_insert_transaction = service_function("dynamodb", "insert_transaction")
+dynamodb_insert_transactions_batch = service_function("dynamodb", "insert_transactions_batch")
+dynamodb_update_random_transaction_status = service_function("dynamodb", "update_random_transaction_status")
+dynamodb_delete_random_transaction = service_function("dynamodb", "delete_random_transaction")
+dynamodb_start_async_client = service_function("dynamodb", "start_async_client")
+dynamodb_close_async_client = service_function("dynamodb", "close_async_client")
+
+# IBM DB2 service functions, imported on first use
+ibmdb2_initialize_table = service_function("ibmdb2", "initialize_table")
+ibmdb2_load_sample_data = service_function("ibmdb2", "load_sample_data")
+ibmdb2_get_load_sample_data_status = service_function("ibmdb2", "get_load_sample_data_status")
+ibmdb2_select_transaction = service_function("ibmdb2", "select_transaction")
+ibmdb2_insert_transaction = service_function("ibmdb2", "insert_transaction")
+ibmdb2_insert_transactions_batch = service_function("ibmdb2", "insert_transactions_batch")
+ibmdb2_bulk_load_sample_data = service_function("ibmdb2", "bulk_load_sample_data")
+ibmdb2_update_random_transaction_status = service_function("ibmdb2", "update_random_transaction_status")
+ibmdb2_delete_random_transaction = service_function("ibmdb2", "delete_random_transaction")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: optionally imports the enabled backends up front,
+    opens the asyncio DynamoDB client when enabled, warms up the connection
+    pools before serving requests and starts the background key scans for the
+    random-key indexes. Releases the per-backend driver thread pools and any
+    asyncio engine connection pools on shutdown.
+    """
+    if PRELOAD_BACKENDS:
+        await asyncio.to_thread(preload_backends)
+    if is_enabled("dynamodb") and use_async_engine("dynamodb"):
+        await dynamodb_start_async_client()
+    await warm_up_pools()
+    key_index_refresher = asyncio.create_task(run_key_index_refresher())
+    yield
+    key_index_refresher.cancel()
+    if is_loaded("dynamodb"):
+        await dynamodb_close_async_client()
+    shutdown_executors()
+    await dispose_async_engines()
 
 # Define FastAPI app
 app = FastAPI(
     title="University of Liverpool - Transaction Records API",
     description="API service for managing transaction_records table on both MySQL and Aurora MySQL RDS instances.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Pydantic model for insert request body
@@ -121,6 +167,112 @@ class TransactionRecord(BaseModel):
     payment_method: str
     status: str
 
+# -------------------------
+# Service Endpoints
+# -------------------------
+
+@app.get("/ready")
+async def api_ready():
+    """
+    Readiness check: 200 once connection pool warm-up has completed, 503 before.
+    Includes the warm-up time per backend.
+    """
+    return JSONResponse(status_code=200 if is_ready() else 503, content=get_warmup_report())
+
+
+@app.get("/backends")
+async def api_backend_report():
+    """
+    Report which backends are enabled and loaded, and the import time of each loaded backend.
+    """
+    return get_backend_report()
+
+
+@app.get("/executors")
+async def api_executor_stats():
+    """
+    Report the thread pool size configured for each database backend.
+    """
+    return get_executor_stats()
+
+
+@app.get("/locks")
+async def api_engine_lock_stats():
+    """
+    Report contention metrics for each engine initialization lock.
+    """
+    return get_lock_stats()
+
+
+@app.get("/pools")
+async def api_pool_allocation():
+    """
+    Report the connection budget allocated to each SQL backend, the resulting
+    per-worker pool settings and the observed pool demand.
+    """
+    return get_pool_report()
+
+
+@app.post("/pools/rebalance")
+async def api_pool_rebalance():
+    """
+    Recompute the allocation from observed demand (DB_POOL_ALLOCATION=demand)
+    and recreate the SQL engines and asyncio pools with the new pool sizes. Applies to the
+    worker process that receives the request only (see pool_config.rebalance).
+    """
+    try:
+        rebalance_pools()
+        await reset_engines()
+        return get_pool_report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/key-index")
+async def api_key_index_report():
+    """
+    Report the number of indexed transaction_ids, memory use and hit counts per backend.
+    """
+    return get_key_index_report()
+
+
+@app.post("/key-index/refresh")
+async def api_key_index_refresh():
+    """
+    Rebuild every enabled backend's key index from a key scan now.
+    """
+    try:
+        await refresh_key_indexes()
+        return get_key_index_report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/statement-cache")
+async def api_statement_cache_report():
+    """
+    Report prepared statement cache hits, misses, evictions and hit rate per backend.
+    """
+    return get_statement_cache_report()
+
+
+@app.get("/result-cache")
+async def api_result_cache_report():
+    """
+    Report select-random result cache hits, misses, evictions and invalidations per backend.
+    """
+    return get_result_cache_report()
+
+
+@app.post("/result-cache/clear")
+async def api_result_cache_clear():
+    """
+    Drop every cached record, e.g. before measuring a cold cache.
+    """
+    clear_result_caches()
+    return get_result_cache_report()
+
+
 # -------------------------
 # MySQL Endpoints
 # -------------------------
@@ -138,25 +290,39 @@ async def api_mysql_initialize_table():
 
 
 @app.post("/mysql/load-sample-data")
-async def api_mysql_load_sample_data():
+async def api_mysql_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Insert 20 randomly generated sample records into the MySQL table.
+    Insert count randomly generated sample records into the MySQL table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
     """
     try:
-        result = await mysql_load_sample_data()
+        result = await mysql_load_sample_data(count, batch_size, parallelism, wait)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/mysql/load-sample-data/status")
+async def api_mysql_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent MySQL sample data load.
+    """
+    return await mysql_get_load_sample_data_status()
+
+
 @app.get("/mysql/select-random")
-async def api_mysql_select_random_transaction():
+async def api_mysql_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the MySQL table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first' or 'seek'.
     """
     try:
-        result = await mysql_select_transaction()
+        result = await mysql_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -173,28 +339,46 @@ async def api_mysql_insert_transaction(record: TransactionRecord):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/mysql/insert-batch")
+async def api_mysql_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into MySQL using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await mysql_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/mysql/update-random-status")
-async def api_mysql_update_random_status():
+async def api_mysql_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in MySQL.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await mysql_update_random_transaction_status()
+        result = await mysql_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/mysql/delete-random")
-async def api_mysql_delete_random_transaction():
+async def api_mysql_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the MySQL table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await mysql_delete_random_transaction()
+        result = await mysql_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -216,25 +400,39 @@ async def api_aurora_initialize_table():
 
 
 @app.post("/AuroraMySQL/load-sample-data")
-async def api_aurora_load_sample_data():
+async def api_aurora_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Insert 20 randomly generated sample records into the Aurora MySQL table.
+    Insert count randomly generated sample records into the Aurora MySQL table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
     """
     try:
-        result = await aurora_load_sample_data()
+        result = await aurora_load_sample_data(count, batch_size, parallelism, wait)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/AuroraMySQL/load-sample-data/status")
+async def api_aurora_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent Aurora MySQL sample data load.
+    """
+    return await aurora_get_load_sample_data_status()
+
+
 @app.get("/AuroraMySQL/select-random")
-async def api_aurora_select_random_transaction():
+async def api_aurora_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the Aurora MySQL table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first' or 'seek'.
     """
     try:
-        result = await aurora_select_transaction()
+        result = await aurora_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -251,28 +449,46 @@ async def api_aurora_insert_transaction(record: TransactionRecord):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/AuroraMySQL/insert-batch")
+async def api_aurora_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into Aurora MySQL using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await aurora_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/AuroraMySQL/update-random-status")
-async def api_aurora_update_random_status():
+async def api_aurora_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in Aurora MySQL.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await aurora_update_random_transaction_status()
+        result = await aurora_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/AuroraMySQL/delete-random")
-async def api_aurora_delete_random_transaction():
+async def api_aurora_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the Aurora MySQL table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await aurora_delete_random_transaction()
+        result = await aurora_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -294,25 +510,61 @@ async def api_postgresql_initialize_table():
 
 
 @app.post("/postgresql/load-sample-data")
-async def api_postgresql_load_sample_data():
+async def api_postgresql_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Insert count randomly generated sample records into the PostgreSQL table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
+    """
+    try:
+        result = await postgresql_load_sample_data(count, batch_size, parallelism, wait)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/postgresql/load-sample-data/status")
+async def api_postgresql_load_sample_data_status():
     """
-    Insert 100 randomly generated sample records into the PostgreSQL table.
+    Report records loaded, elapsed time and throughput of the current or most recent PostgreSQL sample data load.
+    """
+    return await postgresql_get_load_sample_data_status()
+
+
+@app.post("/postgresql/bulk-load-sample-data")
+async def api_postgresql_bulk_load_sample_data(count: int = 100000, chunk_rows: Optional[int] = None, wait: bool = False):
+    """
+    Stream count randomly generated records into the PostgreSQL table using COPY FROM STDIN.
+    chunk_rows rows are copied and committed at a time. Runs in the background
+    (progress at /postgresql/bulk-load-sample-data/status) unless wait is set.
     """
     try:
-        result = await postgresql_load_sample_data()
+        result = await postgresql_bulk_load_sample_data(count, chunk_rows, wait)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/postgresql/bulk-load-sample-data/status")
+async def api_postgresql_bulk_load_status():
+    """
+    Report rows loaded, elapsed time and throughput of the current or most recent PostgreSQL bulk load.
+    """
+    return await postgresql_get_bulk_load_progress()
+
+
 @app.get("/postgresql/select-random")
-async def api_postgresql_select_random_transaction():
+async def api_postgresql_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the PostgreSQL table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first', 'seek', 'system' (TABLESAMPLE SYSTEM) or 'bernoulli' (TABLESAMPLE BERNOULLI).
     """
     try:
-        result = await postgresql_select_transaction()
+        result = await postgresql_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -326,31 +578,53 @@ async def api_postgresql_insert_transaction(record: TransactionRecord):
     try:
         result = await postgresql_insert_transaction(record.dict())
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/postgresql/insert-batch")
+async def api_postgresql_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into PostgreSQL using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await postgresql_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/postgresql/update-random-status")
-async def api_postgresql_update_random_status():
+async def api_postgresql_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in PostgreSQL.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await postgresql_update_random_transaction_status()
+        result = await postgresql_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/postgresql/delete-random")
-async def api_postgresql_delete_random_transaction():
+async def api_postgresql_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the PostgreSQL table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await postgresql_delete_random_transaction()
+        result = await postgresql_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -372,25 +646,61 @@ async def api_aurora_postgresql_initialize_table():
 
 
 @app.post("/AuroraPostgreSQL/load-sample-data")
-async def api_aurora_postgresql_load_sample_data():
+async def api_aurora_postgresql_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Insert 100 randomly generated sample records into the Aurora PostgreSQL table.
+    Insert count randomly generated sample records into the Aurora PostgreSQL table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
     """
     try:
-        result = await aurora_postgresql_load_sample_data()
+        result = await aurora_postgresql_load_sample_data(count, batch_size, parallelism, wait)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/AuroraPostgreSQL/load-sample-data/status")
+async def api_aurora_postgresql_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent Aurora PostgreSQL sample data load.
+    """
+    return await aurora_postgresql_get_load_sample_data_status()
+
+
+@app.post("/AuroraPostgreSQL/bulk-load-sample-data")
+async def api_aurora_postgresql_bulk_load_sample_data(count: int = 100000, chunk_rows: Optional[int] = None, wait: bool = False):
+    """
+    Stream count randomly generated records into the Aurora PostgreSQL table using COPY FROM STDIN.
+    chunk_rows rows are copied and committed at a time. Runs in the background
+    (progress at /AuroraPostgreSQL/bulk-load-sample-data/status) unless wait is set.
+    """
+    try:
+        result = await aurora_postgresql_bulk_load_sample_data(count, chunk_rows, wait)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/AuroraPostgreSQL/bulk-load-sample-data/status")
+async def api_aurora_postgresql_bulk_load_status():
+    """
+    Report rows loaded, elapsed time and throughput of the current or most recent Aurora PostgreSQL bulk load.
+    """
+    return await aurora_postgresql_get_bulk_load_progress()
+
+
 @app.get("/AuroraPostgreSQL/select-random")
-async def api_aurora_postgresql_select_random_transaction():
+async def api_aurora_postgresql_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the Aurora PostgreSQL table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first', 'seek', 'system' (TABLESAMPLE SYSTEM) or 'bernoulli' (TABLESAMPLE BERNOULLI).
     """
     try:
-        result = await aurora_postgresql_select_transaction()
+        result = await aurora_postgresql_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -404,31 +714,53 @@ async def api_aurora_postgresql_insert_transaction(record: TransactionRecord):
     try:
         result = await aurora_postgresql_insert_transaction(record.dict())
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/AuroraPostgreSQL/insert-batch")
+async def api_aurora_postgresql_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into Aurora PostgreSQL using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await aurora_postgresql_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/AuroraPostgreSQL/update-random-status")
-async def api_aurora_postgresql_update_random_status():
+async def api_aurora_postgresql_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in Aurora PostgreSQL.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await aurora_postgresql_update_random_transaction_status()
+        result = await aurora_postgresql_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/AuroraPostgreSQL/delete-random")
-async def api_aurora_postgresql_delete_random_transaction():
+async def api_aurora_postgresql_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the Aurora PostgreSQL table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await aurora_postgresql_delete_random_transaction()
+        result = await aurora_postgresql_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -450,25 +782,39 @@ async def api_mariadb_initialize_table():
 
 
 @app.post("/mariadb/load-sample-data")
-async def api_mariadb_load_sample_data():
+async def api_mariadb_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Insert 100 randomly generated sample records into the MariaDB table.
+    Insert count randomly generated sample records into the MariaDB table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
     """
     try:
-        result = await mariadb_load_sample_data()
+        result = await mariadb_load_sample_data(count, batch_size, parallelism, wait)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/mariadb/load-sample-data/status")
+async def api_mariadb_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent MariaDB sample data load.
+    """
+    return await mariadb_get_load_sample_data_status()
+
+
 @app.get("/mariadb/select-random")
-async def api_mariadb_select_random_transaction():
+async def api_mariadb_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the MariaDB table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first' or 'seek'.
     """
     try:
-        result = await mariadb_select_transaction()
+        result = await mariadb_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -485,28 +831,46 @@ async def api_mariadb_insert_transaction(record: TransactionRecord):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/mariadb/insert-batch")
+async def api_mariadb_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into MariaDB using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await mariadb_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/mariadb/update-random-status")
-async def api_mariadb_update_random_status():
+async def api_mariadb_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in MariaDB.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await mariadb_update_random_transaction_status()
+        result = await mariadb_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/mariadb/delete-random")
-async def api_mariadb_delete_random_transaction():
+async def api_mariadb_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the MariaDB table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await mariadb_delete_random_transaction()
+        result = await mariadb_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -528,25 +892,67 @@ async def api_mssql_initialize_table():
 
 
 @app.post("/mssql/load-sample-data")
-async def api_mssql_load_sample_data():
+async def api_mssql_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Insert count randomly generated sample records into the Microsoft SQL Server table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
+    """
+    try:
+        result = await mssql_load_sample_data(count, batch_size, parallelism, wait)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mssql/load-sample-data/status")
+async def api_mssql_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent Microsoft SQL Server sample data load.
+    """
+    return await mssql_get_load_sample_data_status()
+
+
+@app.post("/mssql/bulk-load-sample-data")
+async def api_mssql_bulk_load_sample_data(count: int = 100000, batch_size: Optional[int] = None, strategy: Optional[str] = None):
     """
-    Insert 100 randomly generated sample records into the Microsoft SQL Server table.
+    Insert count randomly generated records into the Microsoft SQL Server table.
+    strategy is 'fast_executemany' or 'tvp' (table-valued parameter).
     """
     try:
-        result = await mssql_load_sample_data()
+        result = await mssql_bulk_load_sample_data(count, batch_size, strategy)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/mssql/bulk-benchmark")
+async def api_mssql_bulk_benchmark(count: int = 10000, batch_size: Optional[int] = None):
+    """
+    Load count randomly generated records with each Microsoft SQL Server bulk
+    strategy in turn and compare their throughput.
+    """
+    try:
+        result = await mssql_benchmark_bulk_strategies(count, batch_size)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/mssql/select-random")
-async def api_mssql_select_random_transaction():
+async def api_mssql_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the Microsoft SQL Server table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first', 'seek' or 'system' (TABLESAMPLE SYSTEM).
     """
     try:
-        result = await mssql_select_transaction()
+        result = await mssql_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -563,28 +969,49 @@ async def api_mssql_insert_transaction(record: TransactionRecord):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/mssql/insert-batch")
+async def api_mssql_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None, strategy: Optional[str] = None):
+    """
+    Insert a list of transaction records into Microsoft SQL Server using multi-row inserts.
+    strategy is 'fast_executemany' or 'tvp' (table-valued parameter).
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await mssql_insert_transactions_batch([record.dict() for record in records], commit_size, strategy)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/mssql/update-random-status")
-async def api_mssql_update_random_status():
+async def api_mssql_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in Microsoft SQL Server.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await mssql_update_random_transaction_status()
+        result = await mssql_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/mssql/delete-random")
-async def api_mssql_delete_random_transaction():
+async def api_mssql_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the Microsoft SQL Server table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await mssql_delete_random_transaction()
+        result = await mssql_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -606,25 +1033,52 @@ async def api_oracle_initialize_table():
 
 
 @app.post("/oracle/load-sample-data")
-async def api_oracle_load_sample_data():
+async def api_oracle_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
     """
-    Insert 100 randomly generated sample records into the Oracle table.
+    Insert count randomly generated sample records into the Oracle table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
     """
     try:
-        result = await oracle_load_sample_data()
+        result = await oracle_load_sample_data(count, batch_size, parallelism, wait)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/oracle/load-sample-data/status")
+async def api_oracle_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent Oracle sample data load.
+    """
+    return await oracle_get_load_sample_data_status()
+
+
+@app.post("/oracle/bulk-load-sample-data")
+async def api_oracle_bulk_load_sample_data(count: int = 100000, batch_size: Optional[int] = None):
+    """
+    Insert count randomly generated records into the Oracle table using array DML.
+    batch_size rows are bound and committed per round trip; returns rows per second.
+    """
+    try:
+        result = await oracle_bulk_load_sample_data(count, batch_size)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/oracle/select-random")
-async def api_oracle_select_random_transaction():
+async def api_oracle_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the Oracle table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first', 'seek', 'sample' (SAMPLE) or 'sample_block' (SAMPLE BLOCK).
     """
     try:
-        result = await oracle_select_transaction()
+        result = await oracle_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -641,28 +1095,48 @@ async def api_oracle_insert_transaction(record: TransactionRecord):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/oracle/insert-batch")
+async def api_oracle_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into Oracle using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await oracle_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/oracle/update-random-status")
-async def api_oracle_update_random_status():
+async def api_oracle_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in Oracle.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await oracle_update_random_transaction_status()
+        result = await oracle_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/oracle/delete-random")
-async def api_oracle_delete_random_transaction():
+async def api_oracle_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the Oracle table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await oracle_delete_random_transaction()
+        result = await oracle_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -684,25 +1158,52 @@ async def api_dynamodb_initialize_table():
 
 
 @app.post("/dynamodb/load-sample-data")
-async def api_dynamodb_load_sample_data():
+async def api_dynamodb_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Insert count randomly generated sample records into the DynamoDB table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
+    """
+    try:
+        result = await dynamodb_load_sample_data(count, batch_size, parallelism, wait)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/dynamodb/load-sample-data/status")
+async def api_dynamodb_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent DynamoDB sample data load.
+    """
+    return await dynamodb_get_load_sample_data_status()
+
+
+@app.post("/dynamodb/bulk-load-sample-data")
+async def api_dynamodb_bulk_load_sample_data(count: int = 100000, workers: Optional[int] = None):
     """
-    Insert 100 randomly generated sample records into the DynamoDB table.
+    Insert count randomly generated records into the DynamoDB table using parallel
+    BatchWriteItem workers. Reports consumed write capacity and throttling events.
     """
     try:
-        result = await dynamodb_load_sample_data()
+        result = await dynamodb_bulk_load_sample_data(count, workers)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/dynamodb/select-random")
-async def api_dynamodb_select_random_transaction():
+async def api_dynamodb_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the DynamoDB table.
+    sampling is 'index' (random key from the key index, the default) or a
+    Scan strategy: 'first', 'segment' (random parallel-scan segment) or 'seek' (random start key).
     """
     try:
-        result = await dynamodb_select_transaction()
+        result = await dynamodb_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -719,28 +1220,46 @@ async def api_dynamodb_insert_transaction(record: TransactionRecord):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/dynamodb/insert-batch")
+async def api_dynamodb_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None):
+    """
+    Insert a list of transaction records into DynamoDB using multi-row inserts.
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await dynamodb_insert_transactions_batch([record.dict() for record in records], commit_size)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/dynamodb/update-random-status")
-async def api_dynamodb_update_random_status():
+async def api_dynamodb_update_random_status(sampling: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in DynamoDB.
-    No parameters required.
+    sampling is 'index' (random key from the key index, the default) or a
+    Scan strategy: 'first', 'segment' (random parallel-scan segment) or 'seek' (random start key).
     """
     try:
-        result = await dynamodb_update_random_transaction_status()
+        result = await dynamodb_update_random_transaction_status(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/dynamodb/delete-random")
-async def api_dynamodb_delete_random_transaction():
+async def api_dynamodb_delete_random_transaction(sampling: Optional[str] = None):
     """
     Delete one random transaction record from the DynamoDB table.
-    No parameters required.
+    sampling is 'index' (random key from the key index, the default) or a
+    Scan strategy: 'first', 'segment' (random parallel-scan segment) or 'seek' (random start key).
     """
     try:
-        result = await dynamodb_delete_random_transaction()
+        result = await dynamodb_delete_random_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -761,25 +1280,54 @@ async def api_ibmdb2_initialize_table():
 
 
 @app.post("/ibmdb2/load-sample-data")
-async def api_ibmdb2_load_sample_data():
+async def api_ibmdb2_load_sample_data(count: int = 1, batch_size: Optional[int] = None, parallelism: int = 1, wait: bool = False):
+    """
+    Insert count randomly generated sample records into the IBM Db2 table as a background job,
+    one commit per batch_size records with up to parallelism batches in flight.
+    Set wait to return the final report instead of the started job.
+    """
+    try:
+        result = await ibmdb2_load_sample_data(count, batch_size, parallelism, wait)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ibmdb2/load-sample-data/status")
+async def api_ibmdb2_load_sample_data_status():
+    """
+    Report records loaded, elapsed time and throughput of the current or most recent IBM Db2 sample data load.
+    """
+    return await ibmdb2_get_load_sample_data_status()
+
+
+@app.post("/ibmdb2/bulk-load-sample-data")
+async def api_ibmdb2_bulk_load_sample_data(count: int = 100000, batch_size: Optional[int] = None, method: Optional[str] = None):
     """
-    Insert 1 randomly generated sample record into the IBM Db2 table.
+    Insert count randomly generated records into the IBM Db2 table, one commit per batch.
+    method is 'array' (ibm_db array execution) or 'multirow' (INSERT ... VALUES (...), (...)).
     """
     try:
-        result = await ibmdb2_load_sample_data()
+        result = await ibmdb2_bulk_load_sample_data(count, batch_size, method)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/ibmdb2/select-random")
-async def api_ibmdb2_select_random_transaction():
+async def api_ibmdb2_select_random_transaction(sampling: Optional[str] = None):
     """
     Retrieve one random transaction record from the IBM Db2 table.
+    sampling is 'index' (random key from the key index, the default) or a
+    database-side strategy: 'first', 'seek', 'system' (TABLESAMPLE SYSTEM) or 'bernoulli' (TABLESAMPLE BERNOULLI).
     """
     try:
-        result = await ibmdb2_select_transaction()
+        result = await ibmdb2_select_transaction(sampling)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -797,27 +1345,68 @@ async def api_ibmdb2_insert_transaction(record: TransactionRecord):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ibmdb2/insert-batch")
+async def api_ibmdb2_insert_batch(records: List[TransactionRecord], commit_size: Optional[int] = None, method: Optional[str] = None):
+    """
+    Insert a list of transaction records into IBM Db2 using multi-row inserts.
+    method is 'array' (ibm_db array execution) or 'multirow' (INSERT ... VALUES (...), (...)).
+    commit_size rows are committed per batch; returns the timing of every batch.
+    """
+    try:
+        result = await ibmdb2_insert_transactions_batch([record.dict() for record in records], commit_size, method)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/ibmdb2/update-random-status")
-async def api_ibmdb2_update_random_status():
+async def api_ibmdb2_update_random_status(claim: Optional[str] = None):
     """
     Update the 'status' field of one random transaction record in IBM Db2.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await ibmdb2_update_random_transaction_status()
+        result = await ibmdb2_update_random_transaction_status(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/ibmdb2/delete-random")
-async def api_ibmdb2_delete_random_transaction():
+async def api_ibmdb2_delete_random_transaction(claim: Optional[str] = None):
     """
     Delete one random transaction record from the IBM Db2 table.
-    No parameters required.
+    claim is 'index' (random key from the key index, the default) or
+    'skip_locked' to claim a row no other transaction holds.
     """
     try:
-        result = await ibmdb2_delete_random_transaction()
+        result = await ibmdb2_delete_random_transaction(claim)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# Routes of backends left out of DB_ENABLED_BACKENDS are not served at all
+ROUTE_BACKENDS = {
+    "mysql": "mysql",
+    "AuroraMySQL": "aurora_mysql",
+    "postgresql": "postgresql",
+    "AuroraPostgreSQL": "aurora_postgresql",
+    "mariadb": "mariadb",
+    "mssql": "mssql",
+    "oracle": "oracle",
+    "dynamodb": "dynamodb",
+    "ibmdb2": "ibmdb2"
+}
+
+def _route_enabled(route) -> bool:
+    backend = ROUTE_BACKENDS.get(route.path.split("/")[1])
+    return backend is None or is_enabled(backend)
+
+app.router.routes = [route for route in app.router.routes if _route_enabled(route)]
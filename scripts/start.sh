@@ -7,6 +7,12 @@ cd /home/ec2-user/app
 # Activate virtual environment
 source venv/bin/activate
 
+# Number of uvicorn worker processes (defaults to one per vCPU).
+# Every worker opens its own connection pools, sized from the per-backend
+# connection budget (DB_MAX_CONNECTIONS / DB_MAX_CONNECTIONS_<BACKEND>) divided by DB_WORKERS.
+UVICORN_WORKERS=${UVICORN_WORKERS:-$(nproc)}
+export DB_WORKERS=$UVICORN_WORKERS
+
 # Kill any existing uvicorn on port 8000
 if lsof -i:8000; then
     echo "Stopping existing uvicorn process"
@@ -14,4 +20,4 @@ if lsof -i:8000; then
 fi
 
 # Start uvicorn in background
-nohup uvicorn api_service.main:app --host 127.0.0.1 --port 8000 > uvicorn.log 2>&1 &
+nohup uvicorn api_service.main:app --host 127.0.0.1 --port 8000 --workers "$UVICORN_WORKERS" > uvicorn.log 2>&1 &
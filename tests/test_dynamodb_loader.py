@@ -0,0 +1,111 @@
+# test_dynamodb_loader.py
+# Theodor Harmse - University of Liverpool
+# BatchWriteItem loader retry accounting, against a stubbed client
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("botocore")
+
+from botocore.exceptions import ClientError
+
+from api_service.db import dynamodb_loader
+from api_service.db.dynamodb_loader import BatchWriteLoader
+
+
+class StubClient:
+    """
+    Answers each batch_write_item call with the next scripted response: an int n
+    leaves the last n items unprocessed, an error code string raises ClientError.
+    Once the script is used up every item is processed.
+    """
+
+    def __init__(self, script=()):
+        self._script = list(script)
+        self.calls = []
+
+    def batch_write_item(self, RequestItems, ReturnConsumedCapacity):
+        (table_name, requests), = RequestItems.items()
+        self.calls.append(len(requests))
+        step = self._script.pop(0) if self._script else 0
+        if isinstance(step, str):
+            raise ClientError({"Error": {"Code": step, "Message": step}}, "BatchWriteItem")
+        processed = len(requests) - step
+        return {
+            "UnprocessedItems": {table_name: requests[processed:]} if step else {},
+            "ConsumedCapacity": [{"TableName": table_name, "CapacityUnits": float(processed)}]
+        }
+
+
+class StubKeyIndex:
+    def __init__(self):
+        self.keys = []
+
+    def add_many(self, transaction_ids):
+        self.keys.extend(transaction_ids)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(dynamodb_loader, "_backoff", lambda attempt: None)
+
+
+def test_unprocessed_items_are_retried_until_written():
+    client = StubClient([10, 4])
+    index = StubKeyIndex()
+    loader = BatchWriteLoader(client, "transaction_records", index)
+
+    report = loader.load(25, workers=1)
+
+    assert client.calls == [25, 10, 4]
+    assert report["written"] == 25
+    assert report["failed"] == 0
+    assert report["unprocessed_retries"] == 14
+    assert report["throttle_events"] == 2
+    assert report["consumed_wcu"] == 25.0
+    assert len(set(index.keys)) == 25
+
+
+def test_throttling_errors_are_retried():
+    client = StubClient(["ProvisionedThroughputExceededException"])
+    loader = BatchWriteLoader(client, "transaction_records")
+
+    report = loader.load(5, workers=1)
+
+    assert client.calls == [5, 5]
+    assert report["written"] == 5
+    assert report["throttle_events"] == 1
+    assert "error" not in report
+
+
+def test_items_still_unprocessed_after_max_attempts_are_failed(monkeypatch):
+    monkeypatch.setattr(dynamodb_loader, "MAX_ATTEMPTS", 2)
+    client = StubClient([3, 3])
+    loader = BatchWriteLoader(client, "transaction_records")
+
+    report = loader.load(10, workers=1)
+
+    assert report["written"] == 7
+    assert report["failed"] == 3
+    assert report["unprocessed_retries"] == 3
+
+
+def test_other_errors_fail_the_batch_and_are_reported():
+    client = StubClient(["ValidationException"])
+    loader = BatchWriteLoader(client, "transaction_records")
+
+    report = loader.load(5, workers=1)
+
+    assert report["written"] == 0
+    assert report["failed"] == 5
+    assert "ValidationException" in report["error"]
+
+
+def test_items_are_split_into_25_item_requests():
+    client = StubClient()
+    loader = BatchWriteLoader(client, "transaction_records")
+
+    report = loader.load(60, workers=2)
+
+    assert sorted(client.calls) == [10, 25, 25]
+    assert report["written"] == 60
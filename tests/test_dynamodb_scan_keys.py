@@ -0,0 +1,56 @@
+# test_dynamodb_scan_keys.py
+# Theodor Harmse - University of Liverpool
+# DynamoDB key scans used to fill the key index, against a stubbed Table
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("boto3")
+pytest.importorskip("sqlalchemy")
+
+from api_service.db import dynamodb_service
+
+
+class StubTable:
+    """
+    Serves transaction_ids in pages of page_size, like a paginated Scan.
+    """
+
+    def __init__(self, keys, page_size):
+        self._keys = keys
+        self._page_size = page_size
+        self.calls = []
+
+    def scan(self, **kwargs):
+        self.calls.append(kwargs)
+        start = kwargs.get("ExclusiveStartKey", {}).get("offset", 0)
+        page = self._keys[start:start + self._page_size]
+        response = {"Items": [{"transaction_id": key} for key in page]}
+        if start + self._page_size < len(self._keys):
+            response["LastEvaluatedKey"] = {"offset": start + self._page_size}
+        return response
+
+
+def test_scan_keys_reads_every_page(monkeypatch):
+    keys = [f"key-{i}" for i in range(25)]
+    table = StubTable(keys, page_size=10)
+    monkeypatch.setattr(dynamodb_service, "get_table", lambda: table)
+
+    sample = asyncio.run(dynamodb_service.scan_keys(100))
+
+    assert sorted(sample) == sorted(keys)
+    assert len(table.calls) == 3
+    assert all(call["ProjectionExpression"] == "transaction_id" for call in table.calls)
+
+
+def test_scan_keys_samples_up_to_limit(monkeypatch):
+    keys = [f"key-{i}" for i in range(50)]
+    monkeypatch.setattr(dynamodb_service, "get_table", lambda: StubTable(keys, page_size=7))
+
+    sample = asyncio.run(dynamodb_service.scan_keys(5))
+
+    assert len(sample) == 5
+    assert len(set(sample)) == 5
+    assert set(sample) <= set(keys)
@@ -0,0 +1,203 @@
+# test_key_index.py
+# Theodor Harmse - University of Liverpool
+# Key index: appends, tombstones and compaction, scan merges and reservoir sampling
+
+import uuid
+
+from api_service.db.key_index import KeyIndex, reservoir_sample, sample_keys
+
+
+def _keys(count):
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+def _contents(index):
+    """
+    Returns the live transaction_ids held in the index.
+    """
+    keys = set()
+    for offset in range(0, len(index._keys), 16):
+        key = bytes(index._keys[offset:offset + 16])
+        if key not in index._deleted:
+            keys.add(str(uuid.UUID(bytes=key)))
+    return keys
+
+
+def _draw_all(index, keys):
+    drawn = set()
+    while drawn != set(keys):
+        drawn.add(index.random_key())
+    return drawn
+
+
+class StubCursor:
+    def __init__(self, values):
+        self._rows = [(value,) for value in values]
+        self.fetches = 0
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+def test_random_key_returns_indexed_keys():
+    keys = _keys(10)
+    index = KeyIndex(capacity=100)
+    index.add_many(keys)
+
+    assert len(index) == 10
+    assert index.random_key() in keys
+    assert index.hits == 1
+
+
+def test_random_key_on_empty_index_is_a_miss():
+    index = KeyIndex(capacity=10)
+
+    assert index.random_key() is None
+    assert index.misses == 1
+
+
+def test_full_index_replaces_slots_and_stays_bounded():
+    index = KeyIndex(capacity=5)
+    index.add_many(_keys(50))
+
+    assert len(index) == 5
+    assert index.stats()["memory_bytes"] == 5 * 16
+
+
+def test_discard_ignores_keys_that_were_not_drawn():
+    keys = _keys(10)
+    index = KeyIndex(capacity=100)
+    index.add_many(keys)
+
+    index.discard(keys[0])
+    index.discard(str(uuid.uuid4()))
+
+    assert len(index) == 10
+
+
+def test_discard_tombstones_drawn_keys():
+    keys = _keys(10)
+    index = KeyIndex(capacity=100)
+    index.add_many(keys)
+
+    transaction_id = index.random_key()
+    index.discard(transaction_id)
+
+    assert len(index) == 9
+    assert transaction_id not in _contents(index)
+
+
+def test_compaction_keeps_drawn_keys_discardable():
+    keys = _keys(20)
+    index = KeyIndex(capacity=100)
+    index.add_many(keys)
+    drawn = sorted(_draw_all(index, keys))
+
+    # Tombstones reach a quarter of the slots on the fifth discard, which compacts the array
+    for transaction_id in drawn[:5]:
+        index.discard(transaction_id)
+    assert len(index._keys) == 15 * 16
+    assert not index._deleted
+
+    index.discard(drawn[5])
+
+    assert len(index) == 14
+    assert _contents(index) == set(drawn[6:])
+
+
+def test_candidates_prunes_a_key_without_a_row():
+    keys = _keys(1)
+    index = KeyIndex(capacity=10)
+    index.add_many(keys)
+
+    candidates = index.candidates(lambda: "fallback")
+
+    assert next(candidates) == keys[0]
+    assert next(candidates) == "fallback"
+    assert len(index) == 0
+
+
+def test_replace_loads_scanned_keys():
+    index = KeyIndex(capacity=100)
+    index.add_many(_keys(5))
+    scanned = _keys(10)
+
+    index.replace(scanned)
+
+    assert _contents(index) == set(scanned)
+
+
+def test_replace_keeps_keys_added_during_the_scan():
+    scanned = _keys(10)
+    added = _keys(3)
+    index = KeyIndex(capacity=100)
+
+    index.begin_scan()
+    index.add_many(added + scanned[:1])
+    index.replace(scanned)
+
+    assert _contents(index) == set(scanned + added)
+    # A key both scanned and added during the scan is held once
+    assert len(index) == 13
+
+
+def test_replace_drops_keys_discarded_during_the_scan():
+    scanned = _keys(10)
+    index = KeyIndex(capacity=100)
+    index.add_many(scanned)
+    deleted = index.random_key()
+
+    index.begin_scan()
+    index.discard(deleted)
+    index.replace(scanned)
+
+    assert _contents(index) == set(scanned) - {deleted}
+
+
+def test_end_scan_stops_tracking():
+    index = KeyIndex(capacity=100)
+    index.begin_scan()
+    index.end_scan()
+    index.add_many(_keys(3))
+    scanned = _keys(5)
+
+    index.replace(scanned)
+
+    assert _contents(index) == set(scanned)
+
+
+def test_reservoir_sample_keeps_everything_under_the_limit():
+    assert sorted(reservoir_sample(range(5), 10)) == list(range(5))
+
+
+def test_reservoir_sample_is_bounded_and_distinct():
+    sample = reservoir_sample(range(1000), 50)
+
+    assert len(sample) == 50
+    assert len(set(sample)) == 50
+    assert all(0 <= value < 1000 for value in sample)
+
+
+def test_reservoir_sample_reaches_the_end_of_the_input():
+    # A front-of-table sample would never include the last half
+    seen = set()
+    for _ in range(50):
+        seen.update(reservoir_sample(range(100), 10))
+
+    assert any(value >= 50 for value in seen)
+
+
+def test_reservoir_sample_with_zero_limit_is_empty():
+    assert reservoir_sample(range(10), 0) == []
+
+
+def test_sample_keys_streams_the_cursor_in_batches():
+    cursor = StubCursor(range(25))
+
+    sample = sample_keys(cursor, 100, batch_size=10)
+
+    assert sorted(sample) == list(range(25))
+    # Three full or partial batches and one empty fetch that ends the scan
+    assert cursor.fetches == 4
@@ -0,0 +1,123 @@
+# test_parameter_store.py
+# Theodor Harmse - University of Liverpool
+# Credential provider: single-flight fetches, background refresh and stale fallback
+
+import threading
+import time
+
+import pytest
+
+from api_service.aws.parameter_store import CredentialProvider, StaticSource
+
+
+class CountingSource:
+    """
+    Returns "<name>-<n>" for the n-th fetch; fetches block until release is set
+    and raise while fail is set.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def fetch(self, param_name):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("source unavailable")
+        return f"{param_name}-{self.calls}"
+
+
+def _expire(provider, param_name, seconds_ago):
+    entry = provider._entries[param_name]
+    entry.expires_at = entry.refresh_at = time.monotonic() - seconds_ago
+
+
+def test_static_source_is_fetched_once():
+    provider = CredentialProvider(StaticSource({"p": "value"}))
+
+    assert provider.get("p") == "value"
+    assert provider._entries["p"].expires_at == float("inf")
+
+
+def test_unknown_parameter_raises_key_error():
+    provider = CredentialProvider(StaticSource({}))
+
+    with pytest.raises(KeyError):
+        provider.get("missing")
+
+
+def test_concurrent_misses_share_one_fetch():
+    source = CountingSource()
+    source.release.clear()
+    provider = CredentialProvider(source, ttl=60)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(provider.get("p"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    source.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert source.calls == 1
+    assert results == ["p-1"] * 8
+
+
+def test_get_cached_never_fetches():
+    source = CountingSource()
+    provider = CredentialProvider(source, ttl=60)
+
+    assert provider.get_cached("p") is None
+    assert source.calls == 0
+    provider.get("p")
+    assert provider.get_cached("p") == "p-1"
+
+
+def test_expired_value_in_stale_window_is_served_and_refreshed():
+    source = CountingSource()
+    provider = CredentialProvider(source, ttl=60, max_stale=60)
+    provider.get("p")
+    _expire(provider, "p", 1)
+
+    assert provider.get("p") == "p-1"
+    for _ in range(50):
+        if provider._entries["p"].value == "p-2":
+            break
+        time.sleep(0.01)
+    assert provider.get("p") == "p-2"
+
+
+def test_failed_fetch_past_stale_window_serves_stale_value():
+    source = CountingSource()
+    provider = CredentialProvider(source, ttl=60, max_stale=1, retry_seconds=30)
+    provider.get("p")
+    _expire(provider, "p", 10)
+    source.fail = True
+
+    assert provider.get("p") == "p-1"
+    calls = source.calls
+    # Back in the stale window, so the next request does not fetch again
+    assert provider.get("p") == "p-1"
+    assert source.calls == calls
+
+
+def test_failed_first_fetch_raises():
+    source = CountingSource()
+    source.fail = True
+    provider = CredentialProvider(source, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        provider.get("p")
+
+
+def test_invalidate_forces_a_new_fetch():
+    source = CountingSource()
+    provider = CredentialProvider(source, ttl=60)
+    provider.get("p")
+    provider.invalidate("p")
+
+    assert provider.get("p") == "p-2"
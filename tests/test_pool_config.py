@@ -0,0 +1,64 @@
+# test_pool_config.py
+# Theodor Harmse - University of Liverpool
+# Connection budget allocation across backends and workers
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from api_service.db import pool_config
+from api_service.db.pool_config import allocate_budget
+
+
+def test_allocation_is_proportional_and_sums_to_total():
+    allocation = allocate_budget(100, {"mysql": 3, "oracle": 1})
+
+    assert allocation == {"mysql": 75, "oracle": 25}
+
+
+def test_remainders_go_to_the_largest_fractions():
+    allocation = allocate_budget(10, {"mysql": 1, "oracle": 1, "mssql": 1})
+
+    assert sum(allocation.values()) == 10
+    assert sorted(allocation.values()) == [3, 3, 4]
+
+
+def test_every_backend_gets_at_least_one_connection():
+    allocation = allocate_budget(2, {"mysql": 100, "oracle": 0, "mssql": 0})
+
+    assert all(connections >= 1 for connections in allocation.values())
+
+
+def test_zero_weights_split_evenly():
+    assert allocate_budget(4, {"mysql": 0, "oracle": 0}) == {"mysql": 2, "oracle": 2}
+
+
+def test_budget_is_split_across_enabled_backends_and_workers(monkeypatch):
+    monkeypatch.setenv("DB_ENABLED_BACKENDS", "mysql,oracle")
+    monkeypatch.setattr(pool_config, "TOTAL_CONNECTION_BUDGET", 120)
+    monkeypatch.setattr(pool_config, "ALLOCATION_MODE", "weight")
+    monkeypatch.setattr(pool_config, "WORKERS", 4)
+
+    assert pool_config.get_allocation() == {"mysql": 60, "oracle": 60}
+    assert pool_config.get_worker_connections("mysql") == 15
+    assert pool_config.get_worker_connections("postgresql") == 1
+
+
+def test_pool_kwargs_never_exceed_the_worker_allowance(monkeypatch):
+    monkeypatch.setenv("DB_ENABLED_BACKENDS", "mysql")
+    monkeypatch.setenv("DB_POOL_SIZE_MYSQL", "500")
+    monkeypatch.setattr(pool_config, "TOTAL_CONNECTION_BUDGET", 30)
+    monkeypatch.setattr(pool_config, "WORKERS", 1)
+
+    kwargs = pool_config.get_pool_kwargs("mysql")
+
+    assert kwargs["pool_size"] + kwargs["max_overflow"] <= 30
+    assert kwargs["pool_size"] == 30
+
+
+def test_budget_smaller_than_workers_is_reported(monkeypatch):
+    monkeypatch.setenv("DB_ENABLED_BACKENDS", "mysql")
+    monkeypatch.setattr(pool_config, "TOTAL_CONNECTION_BUDGET", 2)
+    monkeypatch.setattr(pool_config, "WORKERS", 4)
+
+    assert pool_config.get_budget_violations() == {"mysql": {"budget": 2, "opened_by_all_workers": 4}}
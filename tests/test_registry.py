@@ -0,0 +1,25 @@
+# test_registry.py
+# Theodor Harmse - University of Liverpool
+# DB_ENABLED_BACKENDS parsing
+
+from api_service.db.registry import BACKENDS, get_enabled_backends, is_enabled
+
+
+def test_all_backends_enabled_when_unset(monkeypatch):
+    monkeypatch.delenv("DB_ENABLED_BACKENDS", raising=False)
+
+    assert get_enabled_backends() == tuple(BACKENDS)
+
+
+def test_blank_setting_enables_all_backends(monkeypatch):
+    monkeypatch.setenv("DB_ENABLED_BACKENDS", "  ")
+
+    assert get_enabled_backends(("mysql", "oracle")) == ("mysql", "oracle")
+
+
+def test_listed_backends_are_enabled_in_declared_order(monkeypatch):
+    monkeypatch.setenv("DB_ENABLED_BACKENDS", " Oracle, mysql ,,unknown")
+
+    assert get_enabled_backends(("mysql", "postgresql", "oracle")) == ("mysql", "oracle")
+    assert is_enabled("oracle")
+    assert not is_enabled("postgresql")
@@ -0,0 +1,122 @@
+# test_result_cache.py
+# Theodor Harmse - University of Liverpool
+# Result cache: TTL, eviction, invalidation and the version check against stale puts
+
+import uuid
+
+from api_service.db.key_index import KeyIndex
+from api_service.db.result_cache import ResultCache
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(enabled=False)
+    cache.put("a", {"status": "Completed"})
+
+    assert cache.get("a") is None
+
+
+def test_get_returns_put_record_case_insensitively():
+    cache = ResultCache(enabled=True)
+    cache.put("ABC", {"status": "Completed"})
+
+    assert cache.get("abc") == {"status": "Completed"}
+    assert cache.hits == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResultCache(enabled=True, ttl_seconds=0)
+    cache.put("a", {"status": "Completed"})
+
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ResultCache(enabled=True, max_entries=2)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.get("a")
+    cache.put("c", {})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {}
+    assert cache.evictions == 1
+
+
+def test_invalidate_removes_the_entry():
+    cache = ResultCache(enabled=True)
+    cache.put("a", {"status": "Completed"})
+    cache.invalidate("A")
+
+    assert cache.get("a") is None
+    assert cache.invalidations == 1
+
+
+def test_put_after_invalidation_since_version_is_skipped():
+    cache = ResultCache(enabled=True)
+    version = cache.version()
+    # A concurrent update lands between the read and the put
+    cache.invalidate("a")
+    cache.put("a", {"status": "Pending"}, version)
+
+    assert cache.get("a") is None
+    assert cache.stale_puts == 1
+
+
+def test_put_with_current_version_is_stored():
+    cache = ResultCache(enabled=True)
+    cache.invalidate("a")
+    version = cache.version()
+    cache.put("a", {"status": "Pending"}, version)
+
+    assert cache.get("a") == {"status": "Pending"}
+
+
+def test_invalidation_of_another_key_does_not_block_put():
+    cache = ResultCache(enabled=True)
+    version = cache.version()
+    cache.invalidate("b")
+    cache.put("a", {}, version)
+
+    assert cache.get("a") == {}
+
+
+def test_forgotten_invalidations_block_older_puts():
+    cache = ResultCache(enabled=True, max_entries=2)
+    version = cache.version()
+    for key in ("a", "b", "c"):
+        cache.invalidate(key)
+    # "a" no longer has its own generation, so the put is refused conservatively
+    cache.put("a", {}, version)
+
+    assert cache.get("a") is None
+
+
+def test_lookup_draws_from_the_key_index():
+    transaction_id = str(uuid.uuid4())
+    index = KeyIndex(capacity=10)
+    index.add(transaction_id)
+    cache = ResultCache(enabled=True)
+
+    assert cache.lookup(index, "index") == (transaction_id, None)
+    cache.put(transaction_id, {"status": "Completed"})
+    assert cache.lookup(index, "index") == (transaction_id, {"status": "Completed"})
+
+
+def test_lookup_is_skipped_for_other_strategies_and_when_disabled():
+    index = KeyIndex(capacity=10)
+    index.add(str(uuid.uuid4()))
+
+    assert ResultCache(enabled=True).lookup(index, "first") == (None, None)
+    assert ResultCache(enabled=False).lookup(index, "index") == (None, None)
+
+
+def test_tinylfu_rejects_a_colder_record_when_full():
+    cache = ResultCache(enabled=True, max_entries=1, policy="tinylfu")
+    for _ in range(5):
+        cache.get("hot")
+    cache.put("hot", {})
+    cache.put("cold", {})
+
+    assert cache.get("hot") == {}
+    assert cache.rejections == 1